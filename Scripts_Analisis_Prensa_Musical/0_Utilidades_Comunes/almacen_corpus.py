@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacén comprimido del corpus
+Empaqueta miles de .txt sueltos en pocos fragmentos comprimidos (zstd con
+diccionario entrenado; zlib si no está instalado zstandard), con un índice de
+desplazamientos por documento. El lector permite recorrerlos en flujo o leer
+cualquier documento en O(1), y leer_texto()/abrir_texto()/listar_textos_corpus()
+hacen que los analizadores lo usen igual que el directorio original.
+Los .txt sueltos se leen antes que el almacén, así que tras empaquetar hay que
+borrarlos para que sirva de algo; los que se añadan después sueltos se siguen
+listando junto a los empaquetados
+
+Formato de un almacén <directorio>.lxc/:
+  indice_almacen.json   cabecera (versión, compresión) y [id, fragmento, desplazamiento,
+                        longitud, tamaño original, mtime] por documento
+  diccionario.zstd      diccionario compartido (solo zstd)
+  fragmento_NNNN.bin    documentos comprimidos de forma independiente, uno tras otro
+
+AlmacenContenidos guarda además cuerpos de texto por su huella SHA-1, para que
+los JSON de resultados lleven solo metadatos y referencias
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import io
+import os
+import sys
+import json
+import mmap
+import hashlib
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Sin zstandard se comprime con zlib (biblioteca estándar)
+    zstandard = None
+
+VERSION = 1
+EXTENSION_ALMACEN = '.lxc'
+ARCHIVO_INDICE = 'indice_almacen.json'
+ARCHIVO_DICCIONARIO = 'diccionario.zstd'
+TAM_FRAGMENTO = 64 << 20
+TAM_DICCIONARIO = 112640
+MUESTRAS_DICCIONARIO = 2000
+
+
+def ruta_almacen(directorio):
+    """Ruta del almacén empaquetado de un directorio"""
+    return os.path.abspath(directorio).rstrip(os.sep) + EXTENSION_ALMACEN
+
+
+def _listar_archivos(origen, extensiones, recursivo=True):
+    """Rutas relativas de los archivos con esas extensiones, en orden estable"""
+    relativas = []
+    for raiz, directorios, archivos in os.walk(origen):
+        directorios.sort()
+        for archivo in sorted(archivos):
+            if archivo.endswith(extensiones) and not archivo.startswith('.'):
+                relativas.append(os.path.relpath(os.path.join(raiz, archivo), origen).replace(os.sep, '/'))
+        if not recursivo:
+            break
+    return relativas
+
+
+def _clave_orden(relativa):
+    """Clave que ordena rutas relativas como _listar_archivos() (archivos antes que subdirectorios)"""
+    partes = relativa.split('/')
+    return tuple((1, parte) for parte in partes[:-1]) + ((0, partes[-1]),)
+
+
+def empaquetar_directorio(origen, destino=None, extensiones=('.txt',), tam_fragmento=TAM_FRAGMENTO,
+                          nivel=10, compresion=None):
+    """Empaqueta los textos de `origen` en un almacén; devuelve su ruta
+
+    compresion: 'zstd' (por defecto si está instalado) o 'zlib'.
+    """
+    origen = os.path.abspath(origen)
+    destino = destino or ruta_almacen(origen)
+    compresion = compresion or ('zstd' if zstandard else 'zlib')
+    if compresion == 'zstd' and zstandard is None:
+        raise RuntimeError("La compresión zstd requiere el paquete zstandard: pip install zstandard")
+    os.makedirs(destino, exist_ok=True)
+
+    relativas = _listar_archivos(origen, tuple(extensiones))
+    print(f"📦 Empaquetando {len(relativas)} documentos de {origen} ({compresion})")
+
+    compresor = None
+    if compresion == 'zstd':
+        diccionario = None
+        # Un diccionario entrenado con una muestra mejora mucho la razón en textos cortos
+        if len(relativas) >= 100:
+            paso = max(1, len(relativas) // MUESTRAS_DICCIONARIO)
+            muestras = []
+            for relativa in relativas[::paso]:
+                with open(os.path.join(origen, relativa), 'rb') as f:
+                    muestras.append(f.read(1 << 16))
+            try:
+                diccionario = zstandard.train_dictionary(TAM_DICCIONARIO, muestras)
+                with open(os.path.join(destino, ARCHIVO_DICCIONARIO), 'wb') as f:
+                    f.write(diccionario.as_bytes())
+            except zstandard.ZstdError as e:
+                print(f"  ⚠️  Sin diccionario: {e}")
+        compresor = zstandard.ZstdCompressor(level=nivel, dict_data=diccionario)
+
+    documentos = []
+    fragmento = -1
+    salida = None
+    tam_original = 0
+    try:
+        for relativa in relativas:
+            ruta = os.path.join(origen, relativa)
+            with open(ruta, 'rb') as f:
+                datos = f.read()
+            comprimido = compresor.compress(datos) if compresor else zlib.compress(datos, min(nivel, 9))
+
+            if salida is None or salida.tell() + len(comprimido) > tam_fragmento and salida.tell() > 0:
+                if salida:
+                    salida.close()
+                fragmento += 1
+                salida = open(os.path.join(destino, f"fragmento_{fragmento:04d}.bin"), 'wb')
+
+            documentos.append([relativa, fragmento, salida.tell(), len(comprimido), len(datos),
+                               os.path.getmtime(ruta)])
+            salida.write(comprimido)
+            tam_original += len(datos)
+    finally:
+        if salida:
+            salida.close()
+
+    indice = {
+        'version': VERSION,
+        'origen': origen,
+        'compresion': compresion,
+        'diccionario': os.path.exists(os.path.join(destino, ARCHIVO_DICCIONARIO)) and compresion == 'zstd',
+        'fragmentos': fragmento + 1,
+        'columnas': ['id', 'fragmento', 'desplazamiento', 'longitud', 'tamaño', 'mtime'],
+        'documentos': documentos
+    }
+    with open(os.path.join(destino, ARCHIVO_INDICE), 'w', encoding='utf-8') as f:
+        json.dump(indice, f, ensure_ascii=False, separators=(',', ':'))
+
+    tam_comprimido = sum(d[3] for d in documentos)
+    print(f"  ✅ {fragmento + 1} fragmentos, {tam_original / 1e6:.1f} MB → {tam_comprimido / 1e6:.1f} MB")
+    print(f"  🧹 Los .txt sueltos se siguen leyendo antes que el almacén: bórralos de {origen} para usarlo")
+    return destino
+
+
+class AlmacenCorpus:
+    """Lector de un almacén: iteración en flujo y acceso aleatorio por id"""
+
+    def __init__(self, ruta):
+        self.ruta = os.path.abspath(ruta)
+        with open(os.path.join(self.ruta, ARCHIVO_INDICE), 'r', encoding='utf-8') as f:
+            indice = json.load(f)
+        if indice['version'] != VERSION:
+            raise ValueError(f"Versión de almacén no soportada: {indice['version']}")
+        self.origen = indice['origen']
+        self.compresion = indice['compresion']
+        self.documentos = {doc[0]: doc for doc in indice['documentos']}
+        self._mapas = {}
+
+        self._descompresor = None
+        if self.compresion == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Este almacén usa zstd: pip install zstandard")
+            diccionario = None
+            if indice['diccionario']:
+                with open(os.path.join(self.ruta, ARCHIVO_DICCIONARIO), 'rb') as f:
+                    diccionario = zstandard.ZstdCompressionDict(f.read())
+            self._descompresor = zstandard.ZstdDecompressor(dict_data=diccionario)
+
+    def __len__(self):
+        return len(self.documentos)
+
+    def __contains__(self, id_documento):
+        return id_documento in self.documentos
+
+    def ids(self):
+        """Ids (rutas relativas) de los documentos, en el orden del almacén"""
+        return list(self.documentos)
+
+    def metadatos(self, id_documento):
+        _, fragmento, _, longitud, tamaño, mtime = self.documentos[id_documento]
+        return {'fragmento': fragmento, 'comprimido': longitud, 'tamaño': tamaño, 'mtime': mtime}
+
+    def _mapa(self, fragmento):
+        """Fragmento proyectado en memoria (se abre una sola vez)"""
+        if fragmento not in self._mapas:
+            with open(os.path.join(self.ruta, f"fragmento_{fragmento:04d}.bin"), 'rb') as f:
+                self._mapas[fragmento] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mapas[fragmento]
+
+    def _descomprimir(self, datos, tamaño):
+        if self._descompresor:
+            return self._descompresor.decompress(datos, max_output_size=tamaño)
+        return zlib.decompress(datos)
+
+    def leer_bytes(self, id_documento):
+        """Contenido original de un documento: un solo corte y una descompresión"""
+        _, fragmento, desplazamiento, longitud, tamaño, _ = self.documentos[id_documento]
+        return self._descomprimir(self._mapa(fragmento)[desplazamiento:desplazamiento + longitud], tamaño)
+
+    def leer(self, id_documento, errors='ignore'):
+        """Texto de un documento como lo da open() en modo texto: \\r\\n y \\r pasan a \\n"""
+        texto = self.leer_bytes(id_documento).decode('utf-8', errors=errors)
+        return texto.replace('\r\n', '\n').replace('\r', '\n')
+
+    def __iter__(self):
+        """(id, texto) de todos los documentos, leyendo cada fragmento de forma secuencial"""
+        for id_documento in sorted(self.documentos, key=lambda d: self.documentos[d][1:3]):
+            yield id_documento, self.leer(id_documento)
+
+    def cerrar(self):
+        for mapa in self._mapas.values():
+            mapa.close()
+        self._mapas = {}
+
+
+# Almacenes abiertos, por ruta del directorio original
+_almacenes = {}
+
+
+def almacen_de_directorio(directorio):
+    """Almacén empaquetado del directorio (o None si no existe)"""
+    directorio = os.path.abspath(directorio)
+    if directorio not in _almacenes:
+        ruta = ruta_almacen(directorio)
+        _almacenes[directorio] = AlmacenCorpus(ruta) if os.path.exists(os.path.join(ruta, ARCHIVO_INDICE)) else None
+    return _almacenes[directorio]
+
+
+def _localizar(ruta):
+    """(almacén, id) del archivo si no está en disco pero sí en el almacén de un directorio superior"""
+    ruta = os.path.abspath(ruta)
+    directorio = os.path.dirname(ruta)
+    while True:
+        almacen = almacen_de_directorio(directorio)
+        if almacen:
+            id_documento = os.path.relpath(ruta, directorio).replace(os.sep, '/')
+            if id_documento in almacen:
+                return almacen, id_documento
+        padre = os.path.dirname(directorio)
+        if padre == directorio:
+            return None, None
+        directorio = padre
+
+
+def leer_texto(ruta, errors='ignore'):
+    """Contenido de un texto, desde disco o desde el almacén que lo contiene"""
+    ruta = os.fspath(ruta)
+    if not os.path.exists(ruta):
+        almacen, id_documento = _localizar(ruta)
+        if almacen:
+            return almacen.leer(id_documento, errors=errors)
+    with open(ruta, 'r', encoding='utf-8', errors=errors) as f:
+        return f.read()
+
+
+def abrir_texto(ruta, errors='ignore'):
+    """Como open(ruta, 'r', encoding='utf-8'), pero también para documentos empaquetados"""
+    ruta = os.fspath(ruta)
+    if not os.path.exists(ruta):
+        almacen, id_documento = _localizar(ruta)
+        if almacen:
+            return io.StringIO(almacen.leer(id_documento, errors=errors))
+    return open(ruta, 'r', encoding='utf-8', errors=errors)
+
+
+def leer_bytes_texto(ruta):
+    """Bytes originales de un texto, desde disco o desde el almacén que lo contiene"""
+    ruta = os.fspath(ruta)
+    if not os.path.exists(ruta):
+        almacen, id_documento = _localizar(ruta)
+        if almacen:
+            return almacen.leer_bytes(id_documento)
+    with open(ruta, 'rb') as f:
+        return f.read()
+
+
+def leer_rango(ruta, inicio, fin, errors='strict'):
+    """Texto entre dos desplazamientos en bytes de un documento (referencia perezosa)"""
+    ruta = os.fspath(ruta)
+    if os.path.exists(ruta):
+        with open(ruta, 'rb') as f:
+            f.seek(inicio)
+            datos = f.read(fin - inicio)
+    else:
+        datos = leer_bytes_texto(ruta)[inicio:fin]
+    return datos.decode('utf-8', errors=errors)
+
+
+class AlmacenContenidos:
+    """Textos direccionados por contenido: <directorio>/<xx>/<sha1>.txt
+
+    Un mismo texto se guarda una sola vez y su huella no cambia entre ejecuciones,
+    así que los consumidores piden cada cuerpo cuando lo necesitan.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = os.path.abspath(directorio)
+
+    @staticmethod
+    def huella(datos):
+        return hashlib.sha1(datos).hexdigest()
+
+    def ruta(self, huella):
+        return os.path.join(self.directorio, huella[:2], huella + '.txt')
+
+    def __contains__(self, huella):
+        return os.path.exists(self.ruta(huella))
+
+    def guardar(self, texto):
+        """Guarda el texto (str o bytes UTF-8) si no estaba; devuelve su huella"""
+        datos = texto.encode('utf-8') if isinstance(texto, str) else texto
+        huella = self.huella(datos)
+        ruta = self.ruta(huella)
+        if not os.path.exists(ruta):
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            temporal = ruta + '.tmp'
+            with open(temporal, 'wb') as f:
+                f.write(datos)
+            os.replace(temporal, ruta)
+        return huella
+
+    def leer(self, huella):
+        with open(self.ruta(huella), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def eliminar_no_referenciados(self, vigentes):
+        """Borra los textos cuyas huellas ya no aparecen en `vigentes`; devuelve cuántos"""
+        vigentes = set(vigentes)
+        eliminados = 0
+        if not os.path.isdir(self.directorio):
+            return eliminados
+        for subdirectorio in os.listdir(self.directorio):
+            ruta_sub = os.path.join(self.directorio, subdirectorio)
+            if not os.path.isdir(ruta_sub):
+                continue
+            for nombre in os.listdir(ruta_sub):
+                if nombre.endswith('.txt') and nombre[:-4] not in vigentes:
+                    os.remove(os.path.join(ruta_sub, nombre))
+                    eliminados += 1
+        return eliminados
+
+
+def listar_textos_corpus(directorio, extension='.txt', recursivo=True):
+    """Rutas de los textos del directorio más las de su almacén, si está empaquetado
+
+    Los .txt sueltos añadidos después de empaquetar también aparecen. Las rutas
+    devueltas son las originales, así que sirven con leer_texto() y abrir_texto().
+    """
+    directorio = os.path.abspath(directorio)
+    relativas = _listar_archivos(directorio, (extension,), recursivo)
+    almacen = almacen_de_directorio(directorio)
+    if almacen:
+        empaquetadas = [id_documento for id_documento in almacen.ids()
+                        if id_documento.endswith(extension) and (recursivo or '/' not in id_documento)]
+        relativas = sorted(set(relativas).union(empaquetadas), key=_clave_orden)
+    return [os.path.join(directorio, *relativa.split('/')) for relativa in relativas]
+
+
+def iterar_textos(directorio, extension='.txt'):
+    """(ruta, texto) de todos los textos del directorio, en flujo"""
+    directorio = os.path.abspath(directorio)
+    almacen = almacen_de_directorio(directorio)
+    # Con textos sueltos junto al almacén se leen uno a uno: los sueltos tienen prioridad
+    if almacen and not _listar_archivos(directorio, (extension,)):
+        for id_documento, texto in almacen:
+            if id_documento.endswith(extension):
+                yield os.path.join(directorio, *id_documento.split('/')), texto
+    else:
+        for ruta in listar_textos_corpus(directorio, extension):
+            yield ruta, leer_texto(ruta)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python3 almacen_corpus.py <directorio> [<directorio> ...]")
+        print("Crea <directorio>.lxc junto a cada directorio de textos")
+        return
+    for directorio in sys.argv[1:]:
+        empaquetar_directorio(directorio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Banco de pruebas de rendimiento de los analizadores
+Genera (o reutiliza) un corpus sintético con corpus_sintetico.py y cronometra
+el punto de entrada principal de cada analizador sobre la disposición que le
+corresponde. Cada medición se hace en un proceso nuevo para que el pico de
+memoria y las cachés no se contaminen entre analizadores. Informa de MB/s,
+archivos/s y pico de memoria, y guarda los resultados en JSON para comparar
+antes y después de un cambio
+
+Con --metricas DIR cada analizador se ejecuta una vez más, instrumentado
+(instrumentacion.py, fuera de las mediciones de tiempo), y deja sus métricas
+por archivo y por método en DIR/<analizador>.jsonl
+
+Uso: python3 banco_pruebas.py [--corpus DIR] [--archivos 50] [--palabras 2000]
+                              [--repeticiones 3] [--solo el_sol,el_debate] [--salida banco.json]
+                              [--metricas DIR]
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: el pico se mide con tracemalloc (solo memoria de Python)
+    resource = None
+
+DIRECTORIO_SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus_sintetico import generar_corpus, LAYOUTS, SEMILLA_POR_DEFECTO
+from instrumentacion import Instrumentacion
+
+MARCA_RESULTADO = "RESULTADO_BANCO "
+
+# Instrumentación de la medición en curso (solo con --metricas)
+_instrumentacion = None
+
+
+def _importar(carpeta, modulo):
+    sys.path.insert(0, os.path.join(DIRECTORIO_SCRIPTS, carpeta))
+    modulo = __import__(modulo)
+    if _instrumentacion is not None:
+        _instrumentacion.instrumentar_modulo(modulo)
+    return modulo
+
+
+def _el_sol(directorio):
+    _importar('2_Analisis_Prensa', 'analizador_el_sol').AnalizadorElSol(directorio).procesar_todos_los_archivos()
+
+
+def _iberia_musical(directorio):
+    modulo = _importar('2_Analisis_Prensa', 'analizador_iberia_musical')
+    modulo.AnalizadorIberiaMusical(directorio).procesar_todos_archivos()
+
+
+def _el_artista(directorio):
+    _importar('2_Analisis_Prensa', 'analizador_el_artista').AnalizadorElArtista(directorio).analizar_corpus_completo()
+
+
+def _el_debate(directorio):
+    _importar('2_Analisis_Prensa', 'procesador_el_debate').ElDebateProcessor(directorio).process_all_files()
+
+
+def _boletin_musical(directorio):
+    modulo = _importar('1_Analisis_Revistas_Musicales', 'boletin_musical_analysis')
+    modulo.BoletinMusicalAnalyzer(directorio).analyze_all_files()
+
+
+def _revista_espana(directorio):
+    modulo = _importar('1_Analisis_Revistas_Musicales', 'analizador_revista_espana')
+    modulo.AnalizadorRevistaEspana(directorio).analizar_corpus()
+
+
+def _revista_espana_completo(directorio):
+    # El directorio está fijo en __init__
+    analizador = _importar('1_Analisis_Revistas_Musicales', 'analisis_revista_espana_completo').AnalizadorRevistaEspana()
+    analizador.directorio = directorio
+    analizador.procesar_todos_los_archivos()
+
+
+def _revistas_musicales(directorio):
+    # Bilbao e Hispanoamericana, con los directorios fijos sustituidos por los sintéticos
+    analizador = _importar('1_Analisis_Revistas_Musicales', 'analizador_revistas_musicales').AnalizadorRevistasMusicales()
+    analizador.revistas = [
+        ("Revista Musical de Bilbao", "Bilbao", os.path.join(directorio, "TXT - Revista Musical de Bilbao")),
+        ("Revista Musical Hispanoamericana", "Hispanoamericana",
+         os.path.join(directorio, "TXT - Revista Musical Hispanoamericana"))
+    ]
+    analizador.ejecutar_analisis_completo()
+
+
+def _spanish_magazines(directorio):
+    modulo = _importar('1_Analisis_Revistas_Musicales', 'spanish_magazines_analyzer')
+    # Instrumentado, en serie: en los trabajadores del pool no se mide
+    modulo.SpanishMagazineAnalyzer(directorio).run_analysis(processes=1 if _instrumentacion is not None else None)
+
+
+def _comprehensive(directorio):
+    modulo = _importar('1_Analisis_Revistas_Musicales', 'comprehensive_musical_magazines_analyzer')
+    modulo.ComprehensiveMusicalMagazinesAnalyzer(directorio).run_comprehensive_analysis()
+
+
+def _solo_txt(ruta):
+    return ruta.endswith('.txt')
+
+
+def _bilbao_e_hispanoamericana(ruta):
+    return ruta.startswith(("TXT - Revista Musical de Bilbao", "TXT - Revista Musical Hispanoamericana"))
+
+
+# nombre: (disposición del corpus sintético, función que ejecuta el punto de entrada,
+#          filtro de los archivos que lee sobre su ruta relativa, o None si los lee todos)
+ANALIZADORES = {
+    'el_sol': ('el_sol', _el_sol, None),
+    'iberia_musical': ('iberia_musical', _iberia_musical, None),
+    'el_artista': ('el_artista', _el_artista, None),
+    'el_debate': ('el_debate', _el_debate, None),
+    'boletin_musical': ('boletin_musical', _boletin_musical, None),
+    'revista_espana': ('revista_espana', _revista_espana, None),
+    'revista_espana_completo': ('revista_espana', _revista_espana_completo, None),
+    'revistas_musicales': ('revistas', _revistas_musicales, _bilbao_e_hispanoamericana),
+    'spanish_magazines': ('revistas', _spanish_magazines, None),
+    'comprehensive': ('revistas', _comprehensive, _solo_txt),
+}
+
+
+def pico_memoria_mb():
+    """Pico de memoria residente del proceso y sus hijos (los pools de procesos cuentan)"""
+    pico = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss va en KB en Linux y en bytes en macOS
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def medir(nombre, directorio, metricas=None):
+    """Ejecuta un analizador en este proceso; devuelve segundos y memoria"""
+    global _instrumentacion
+    _, ejecutar, _ = ANALIZADORES[nombre]
+    if metricas:
+        _instrumentacion = Instrumentacion(metricas)
+    if resource is None:
+        import tracemalloc
+        tracemalloc.start()
+    memoria_inicial = pico_memoria_mb() if resource is not None else 0.0
+
+    with open(os.devnull, 'w') as nulo, redirect_stdout(nulo):
+        inicio = time.perf_counter()
+        ejecutar(directorio)
+        segundos = time.perf_counter() - inicio
+    if _instrumentacion is not None:
+        _instrumentacion.cerrar(mostrar=0)
+
+    if resource is None:
+        pico = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        return {'segundos': segundos, 'pico_mb': pico, 'incremento_mb': pico}
+    pico = pico_memoria_mb()
+    return {'segundos': segundos, 'pico_mb': pico, 'incremento_mb': pico - memoria_inicial}
+
+
+def tamaño_entrada(directorio, filtro=None):
+    """(bytes, archivos) de los textos bajo un directorio que pasan el filtro"""
+    total_bytes = total_archivos = 0
+    for raiz, _, archivos in os.walk(directorio):
+        for archivo in archivos:
+            ruta = os.path.join(raiz, archivo)
+            if not archivo.startswith('.') and (filtro is None or filtro(os.path.relpath(ruta, directorio))):
+                total_bytes += os.path.getsize(ruta)
+                total_archivos += 1
+    return total_bytes, total_archivos
+
+
+def medir_en_subproceso(nombre, directorio, metricas=None):
+    """Lanza una medición en un proceso nuevo, con los resultados del analizador en un temporal"""
+    orden = [sys.executable, os.path.abspath(__file__), '--medir', nombre, os.path.abspath(directorio)]
+    if metricas:
+        orden.append(os.path.abspath(metricas))
+    with tempfile.TemporaryDirectory(prefix='banco_') as trabajo:
+        proceso = subprocess.run(
+            orden, cwd=trabajo, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+    for linea in reversed(proceso.stdout.splitlines()):
+        if linea.startswith(MARCA_RESULTADO):
+            return json.loads(linea[len(MARCA_RESULTADO):])
+    error = proceso.stderr.strip().splitlines()
+    raise RuntimeError(error[-1] if error else f"código de salida {proceso.returncode}")
+
+
+def ejecutar_banco(corpus, nombres, repeticiones=3, metricas=None):
+    """Mide cada analizador; de las repeticiones se queda con la más rápida"""
+    resultados = []
+    for nombre in nombres:
+        layout, _, filtro = ANALIZADORES[nombre]
+        directorio = os.path.join(corpus, layout)
+        bytes_entrada, archivos = tamaño_entrada(directorio, filtro)
+        try:
+            mediciones = [medir_en_subproceso(nombre, directorio) for _ in range(repeticiones)]
+            if metricas:
+                os.makedirs(metricas, exist_ok=True)
+                medir_en_subproceso(nombre, directorio, os.path.join(metricas, f"{nombre}.jsonl"))
+        except RuntimeError as e:
+            print(f"  ❌ {nombre}: {e}")
+            resultados.append({'analizador': nombre, 'error': str(e)})
+            continue
+
+        mejor = min(mediciones, key=lambda m: m['segundos'])
+        segundos = max(mejor['segundos'], 1e-9)
+        resultado = {
+            'analizador': nombre,
+            'disposicion': layout,
+            'archivos': archivos,
+            'mb_entrada': round(bytes_entrada / 1e6, 3),
+            'segundos': round(mejor['segundos'], 4),
+            'mb_por_segundo': round(bytes_entrada / 1e6 / segundos, 3),
+            'archivos_por_segundo': round(archivos / segundos, 2),
+            'pico_memoria_mb': round(max(m['pico_mb'] for m in mediciones), 1),
+            'incremento_memoria_mb': round(max(m['incremento_mb'] for m in mediciones), 1),
+        }
+        resultados.append(resultado)
+        print(f"  ⏱️  {nombre:<24} {resultado['segundos']:>8.3f} s {resultado['mb_por_segundo']:>8.2f} MB/s "
+              f"{resultado['archivos_por_segundo']:>9.1f} arch/s {resultado['pico_memoria_mb']:>8.1f} MB pico")
+    return resultados
+
+
+def main():
+    argumentos = sys.argv[1:]
+    if argumentos[:1] == ['--medir']:
+        print(MARCA_RESULTADO + json.dumps(medir(*argumentos[1:4])))
+        return
+
+    opciones = {'--corpus': None, '--archivos': '50', '--palabras': '2000', '--semilla': str(SEMILLA_POR_DEFECTO),
+                '--repeticiones': '3', '--solo': ','.join(ANALIZADORES), '--salida': 'banco_rendimiento.json', '--metricas': None}
+    for opcion in opciones:
+        if opcion in argumentos:
+            posicion = argumentos.index(opcion)
+            opciones[opcion] = argumentos[posicion + 1]
+            del argumentos[posicion:posicion + 2]
+
+    nombres = [nombre.strip() for nombre in opciones['--solo'].split(',') if nombre.strip()]
+    desconocidos = [nombre for nombre in nombres if nombre not in ANALIZADORES]
+    if argumentos or desconocidos:
+        print(__doc__.split('\n\n')[1].strip())
+        print(f"Analizadores: {', '.join(ANALIZADORES)}")
+        return
+
+    corpus = opciones['--corpus']
+    temporal = None
+    if corpus is None:
+        temporal = corpus = tempfile.mkdtemp(prefix='corpus_sintetico_')
+    layouts = [layout for layout in LAYOUTS if any(ANALIZADORES[n][0] == layout for n in nombres)]
+    if temporal or not all(os.path.isdir(os.path.join(corpus, layout)) for layout in layouts):
+        print(f"📝 Generando corpus sintético ({opciones['--archivos']} archivos × {opciones['--palabras']} palabras)")
+        generar_corpus(corpus, int(opciones['--archivos']), int(opciones['--palabras']),
+                       int(opciones['--semilla']), layouts)
+
+    print(f"\n🏁 Banco de pruebas: {len(nombres)} analizadores, mejor de {opciones['--repeticiones']}")
+    try:
+        resultados = ejecutar_banco(corpus, nombres, int(opciones['--repeticiones']), opciones['--metricas'])
+    finally:
+        if temporal:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+    informe = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'corpus': {'archivos': int(opciones['--archivos']), 'palabras': int(opciones['--palabras']),
+                   'semilla': int(opciones['--semilla'])},
+        'resultados': resultados
+    }
+    with open(opciones['--salida'], 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Resultados guardados en {opciones['--salida']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Catálogo del corpus en SQLite
+Indexa una sola vez cada PDF, imagen y texto con su huella de contenido,
+publicación, número, fecha, página y número de páginas, y enlaza los
+artefactos derivados (páginas rasterizadas, textos OCR) con su PDF de origen.
+Reúne en analizar_nombre() el análisis de fechas en nombres de archivo que
+cada analizador hacía con su propia expresión regular
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import re
+import sqlite3
+import hashlib
+
+try:
+    import fitz
+except ImportError:  # Sin PyMuPDF no se cuentan las páginas de los PDF
+    fitz = None
+
+CATALOGO_POR_DEFECTO = os.path.expanduser('~/leximus_catalogo.sqlite')
+
+TIPOS = {
+    '.pdf': 'pdf',
+    '.txt': 'texto',
+    '.jpg': 'imagen', '.jpeg': 'imagen', '.png': 'imagen', '.tif': 'imagen', '.tiff': 'imagen', '.webp': 'imagen'
+}
+
+# Patrones de nombre de archivo, del más específico al más general
+PATRONES_NOMBRE = [
+    # Boletin-musical-Madrid-DD-MM-YYYY.txt
+    (re.compile(r'Boletin-musical-Madrid-(?P<dia>\d{1,2})-(?P<mes>\d{1,2})-(?P<año>\d{4})'),
+     'Boletín Musical de Madrid'),
+    # Ondas: O-YYYY-MM-DD.txt
+    (re.compile(r'(?:^|[/_])O-(?P<año>\d{4})-(?P<mes>\d{1,2})-(?P<dia>\d{1,2})'), 'Ondas'),
+    # Descargas originales: Revista-musical-Bilbao-<mes>-<año>-n-o-<número>.pdf
+    (re.compile(r'Revista-musical-(?P<ciudad>[A-Za-z-]+?)-(?P<mes>\d{1,2})(?:-\d{1,2})?-(?P<año>\d{4})-n-o-(?P<numero>\d+)'),
+     None),
+    # La Iberia Musical y prensa diaria: YYYY_MM_DD (antes que las renombradas,
+    # que también empiezan por YYYY_NN_)
+    (re.compile(r'(?P<año>\d{4})_(?P<mes>\d{2})_(?P<dia>\d{2})'), None),
+    # Renombradas: YYYY_NN_Revista-Musical-Bilbao.pdf
+    (re.compile(r'^(?P<año>\d{4})_(?P<numero>\d{2})(?:-\d{2})?_(?P<publicacion>[^\d.][^.]*)'), None),
+    # YYYY-MM-DD
+    (re.compile(r'(?<!\d)(?P<año>\d{4})-(?P<mes>\d{1,2})-(?P<dia>\d{1,2})(?!\d)'), None),
+    # Fecha compacta: El_Sol_YYYYMMDD.txt
+    (re.compile(r'(?<!\d)(?P<año>1[6-9]\d\d|20\d\d)(?P<mes>0[1-9]|1[0-2])(?P<dia>0[1-9]|[12]\d|3[01])(?!\d)'),
+     None),
+    # El_Debate_textos_YYYY.txt
+    (re.compile(r'El_Debate_textos_(?P<año>\d{4})'), 'El Debate'),
+    # Revistas musicales: YYYY-M-Revista...
+    (re.compile(r'(?<!\d)(?P<año>\d{4})-(?P<mes>\d{1,2})-'), None),
+    # Solo el año
+    (re.compile(r'(?<!\d)(?P<año>1[6-9]\d\d|20\d\d)(?!\d)'), None),
+]
+PATRON_PAGINA = re.compile(r'_pagina_(\d+)')
+
+
+def analizar_nombre(nombre):
+    """Metadatos de un nombre de archivo: publicacion, numero, año, mes, dia, fecha y pagina
+
+    Los valores que no se pueden deducir quedan a None; fecha es ISO parcial (YYYY, YYYY-MM o YYYY-MM-DD).
+    """
+    datos = {'publicacion': None, 'numero': None, 'año': None, 'mes': None, 'dia': None,
+             'fecha': None, 'pagina': None}
+
+    for patron, publicacion in PATRONES_NOMBRE:
+        coincidencia = patron.search(nombre)
+        if not coincidencia:
+            continue
+        grupos = coincidencia.groupdict()
+        datos['año'] = int(grupos['año'])
+        datos['mes'] = int(grupos['mes']) if grupos.get('mes') else None
+        datos['dia'] = int(grupos['dia']) if grupos.get('dia') else None
+        datos['numero'] = int(grupos['numero']) if grupos.get('numero') else None
+        if grupos.get('ciudad'):
+            # Mismo nombre que el de los archivos renombrados (Revista-Musical-Bilbao)
+            publicacion = f"Revista Musical {grupos['ciudad'].replace('-', ' ').title()}"
+        elif grupos.get('publicacion'):
+            publicacion = grupos['publicacion'].replace('-', ' ')
+        datos['publicacion'] = publicacion
+        break
+
+    if datos['mes'] is not None and not 1 <= datos['mes'] <= 12:
+        datos['mes'] = datos['dia'] = None
+    if datos['año']:
+        partes = [str(datos['año'])] + [f"{v:02d}" for v in (datos['mes'], datos['dia']) if v is not None]
+        datos['fecha'] = '-'.join(partes)
+
+    pagina = PATRON_PAGINA.search(nombre)
+    if pagina:
+        datos['pagina'] = int(pagina.group(1))
+    return datos
+
+
+def condicion_directorio(directorio):
+    """Condición SQL (y sus parámetros) para un directorio y todos sus subdirectorios
+
+    El prefijo del LIKE se escapa: un '_' o '%' en el nombre no debe casar con
+    directorios hermanos.
+    """
+    prefijo = directorio.rstrip(os.sep) + os.sep
+    prefijo = prefijo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return "(directorio = ? OR directorio LIKE ? ESCAPE '\\')", (directorio, prefijo + '%')
+
+
+def huella_archivo(ruta, tam_bloque=1 << 20):
+    """Huella BLAKE2b del contenido del archivo"""
+    h = hashlib.blake2b(digest_size=20)
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def contar_paginas(ruta):
+    """Número de páginas de un PDF (None si no se puede abrir o falta PyMuPDF)"""
+    if fitz is None:
+        return None
+    try:
+        with fitz.open(ruta) as doc:
+            return len(doc)
+    except Exception:
+        return None
+
+
+def base_documento(nombre):
+    """Nombre base común a un PDF y sus derivados (sin extensión, _pagina_NNN ni _OCR)"""
+    base = os.path.splitext(nombre)[0]
+    base = PATRON_PAGINA.split(base)[0]
+    return re.sub(r'_OCR$', '', base)
+
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY,
+    ruta TEXT UNIQUE NOT NULL,
+    nombre TEXT NOT NULL,
+    directorio TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    tamaño INTEGER,
+    mtime REAL,
+    huella TEXT,
+    publicacion TEXT,
+    numero INTEGER,
+    año INTEGER,
+    mes INTEGER,
+    dia INTEGER,
+    fecha TEXT,
+    pagina INTEGER,
+    paginas INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_documentos_huella ON documentos(huella);
+CREATE INDEX IF NOT EXISTS idx_documentos_publicacion ON documentos(publicacion, año);
+CREATE INDEX IF NOT EXISTS idx_documentos_directorio ON documentos(directorio, tipo);
+CREATE TABLE IF NOT EXISTS derivados (
+    origen INTEGER NOT NULL REFERENCES documentos(id) ON DELETE CASCADE,
+    derivado INTEGER NOT NULL REFERENCES documentos(id) ON DELETE CASCADE,
+    relacion TEXT NOT NULL,
+    PRIMARY KEY (origen, derivado)
+);
+"""
+
+
+class CatalogoCorpus:
+    """Catálogo SQLite de los archivos del corpus"""
+
+    def __init__(self, ruta_db=CATALOGO_POR_DEFECTO):
+        self.ruta_db = ruta_db
+        self.conexion = sqlite3.connect(ruta_db)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute('PRAGMA foreign_keys = ON')
+        self.conexion.executescript(ESQUEMA)
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def _registrar(self, ruta, stat, huella, paginas=None):
+        """Inserta o actualiza la fila de un archivo"""
+        nombre = os.path.basename(ruta)
+        tipo = TIPOS[os.path.splitext(nombre)[1].lower()]
+        if tipo == 'pdf' and paginas is None:
+            paginas = contar_paginas(ruta)
+        datos = analizar_nombre(nombre)
+        if not datos['publicacion']:
+            datos['publicacion'] = os.path.basename(os.path.dirname(ruta))
+        self.conexion.execute("""
+            INSERT INTO documentos (ruta, nombre, directorio, tipo, tamaño, mtime, huella, publicacion,
+                                    numero, año, mes, dia, fecha, pagina, paginas)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(ruta) DO UPDATE SET
+                nombre = excluded.nombre, directorio = excluded.directorio, tipo = excluded.tipo,
+                tamaño = excluded.tamaño, mtime = excluded.mtime, huella = excluded.huella,
+                publicacion = excluded.publicacion, numero = excluded.numero, año = excluded.año,
+                mes = excluded.mes, dia = excluded.dia, fecha = excluded.fecha,
+                pagina = excluded.pagina, paginas = excluded.paginas
+        """, (ruta, nombre, os.path.dirname(ruta), tipo, stat.st_size, stat.st_mtime, huella,
+              datos['publicacion'], datos['numero'], datos['año'], datos['mes'], datos['dia'],
+              datos['fecha'], datos['pagina'], paginas))
+
+    def indexar(self, directorio):
+        """Recorre el directorio y registra los archivos nuevos o modificados
+
+        Los archivos con igual tamaño y fecha de modificación no se vuelven a leer.
+        Devuelve (nuevos o modificados, sin cambios, eliminados).
+        """
+        directorio = os.path.abspath(directorio)
+        condicion, parametros = condicion_directorio(directorio)
+        conocidos = {
+            fila['ruta']: (fila['tamaño'], fila['mtime'])
+            for fila in self.conexion.execute(f"SELECT ruta, tamaño, mtime FROM documentos WHERE {condicion}",
+                                              parametros)
+        }
+        vistos = set()
+        actualizados = sin_cambios = 0
+
+        for raiz, _, archivos in os.walk(directorio):
+            for nombre in archivos:
+                if os.path.splitext(nombre)[1].lower() not in TIPOS:
+                    continue
+                ruta = os.path.join(raiz, nombre)
+                stat = os.stat(ruta)
+                vistos.add(ruta)
+                if conocidos.get(ruta) == (stat.st_size, stat.st_mtime):
+                    sin_cambios += 1
+                    continue
+                self._registrar(ruta, stat, huella_archivo(ruta))
+                actualizados += 1
+
+        eliminados = [ruta for ruta in conocidos if ruta not in vistos]
+        self.conexion.executemany("DELETE FROM documentos WHERE ruta = ?", [(ruta,) for ruta in eliminados])
+        self.enlazar_derivados(directorio)
+        self.conexion.commit()
+        print(f"📚 Catálogo: {actualizados} nuevos o modificados, {sin_cambios} sin cambios, "
+              f"{len(eliminados)} eliminados ({directorio})")
+        return actualizados, sin_cambios, len(eliminados)
+
+    def enlazar_derivados(self, directorio=None):
+        """Enlaza cada PDF con las imágenes de página y los textos que comparten su nombre base"""
+        condicion, parametros = '', ()
+        if directorio:
+            condicion, parametros = condicion_directorio(directorio)
+            condicion = f"WHERE {condicion}"
+        filas = self.conexion.execute(f"SELECT id, nombre, directorio, tipo FROM documentos {condicion}",
+                                      parametros).fetchall()
+
+        pdfs = {(fila['directorio'], base_documento(fila['nombre'])): fila['id']
+                for fila in filas if fila['tipo'] == 'pdf'}
+        enlaces = []
+        for fila in filas:
+            if fila['tipo'] == 'pdf':
+                continue
+            origen = pdfs.get((fila['directorio'], base_documento(fila['nombre'])))
+            if origen:
+                relacion = 'pagina' if fila['tipo'] == 'imagen' else (
+                    'ocr' if '_OCR' in fila['nombre'] else 'texto')
+                enlaces.append((origen, fila['id'], relacion))
+        self.conexion.executemany("INSERT OR REPLACE INTO derivados VALUES (?, ?, ?)", enlaces)
+
+    def buscar(self, publicacion=None, tipo=None, año_desde=None, año_hasta=None, directorio=None):
+        """Filas del catálogo que cumplen los filtros, ordenadas por fecha y nombre"""
+        condiciones, parametros = [], []
+        if publicacion:
+            condiciones.append("publicacion = ?")
+            parametros.append(publicacion)
+        if tipo:
+            condiciones.append("tipo = ?")
+            parametros.append(tipo)
+        if año_desde is not None:
+            condiciones.append("año >= ?")
+            parametros.append(año_desde)
+        if año_hasta is not None:
+            condiciones.append("año <= ?")
+            parametros.append(año_hasta)
+        if directorio:
+            condicion, parametros_directorio = condicion_directorio(os.path.abspath(directorio))
+            condiciones.append(condicion)
+            parametros.extend(parametros_directorio)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+        consulta = f"SELECT * FROM documentos {where} ORDER BY fecha, nombre"
+        return [dict(fila) for fila in self.conexion.execute(consulta, parametros)]
+
+    def rutas(self, **filtros):
+        """Solo las rutas de buscar()"""
+        return [fila['ruta'] for fila in self.buscar(**filtros)]
+
+    def por_huella(self, huella):
+        """Todas las copias registradas de un mismo contenido"""
+        return [dict(fila) for fila in self.conexion.execute(
+            "SELECT * FROM documentos WHERE huella = ?", (huella,))]
+
+    def derivados(self, ruta_pdf):
+        """Artefactos derivados de un PDF: [(relacion, ruta)]"""
+        return [(fila['relacion'], fila['ruta']) for fila in self.conexion.execute("""
+            SELECT d.relacion, doc.ruta FROM derivados d
+            JOIN documentos doc ON doc.id = d.derivado
+            JOIN documentos pdf ON pdf.id = d.origen
+            WHERE pdf.ruta = ? ORDER BY doc.nombre""", (os.path.abspath(ruta_pdf),))]
+
+    def renombrar(self, ruta_actual, ruta_nueva):
+        """Renombra el archivo y actualiza su fila (sin volver a leer el contenido)"""
+        ruta_actual, ruta_nueva = os.path.abspath(ruta_actual), os.path.abspath(ruta_nueva)
+        fila = self.conexion.execute("SELECT huella, paginas FROM documentos WHERE ruta = ?",
+                                     (ruta_actual,)).fetchone()
+        os.rename(ruta_actual, ruta_nueva)
+        if fila:
+            self.conexion.execute("DELETE FROM documentos WHERE ruta = ?", (ruta_nueva,))
+            self.conexion.execute("UPDATE documentos SET ruta = ? WHERE ruta = ?", (ruta_nueva, ruta_actual))
+            self._registrar(ruta_nueva, os.stat(ruta_nueva), fila['huella'], fila['paginas'])
+        else:
+            self._registrar(ruta_nueva, os.stat(ruta_nueva), huella_archivo(ruta_nueva))
+        self.conexion.commit()
+
+
+def abrir_catalogo(catalogo):
+    """Acepta un CatalogoCorpus, una ruta a la base de datos o None"""
+    if catalogo is None or isinstance(catalogo, CatalogoCorpus):
+        return catalogo
+    return CatalogoCorpus(catalogo)
+
+
+def main():
+    import sys
+    directorios = sys.argv[1:]
+    if not directorios:
+        print("Uso: python3 catalogo_corpus.py <directorio> [<directorio> ...]")
+        return
+    with CatalogoCorpus() as catalogo:
+        for directorio in directorios:
+            catalogo.indexar(directorio)
+        total = catalogo.conexion.execute(
+            "SELECT tipo, COUNT(*) AS n FROM documentos GROUP BY tipo").fetchall()
+        print("Total: " + ', '.join(f"{fila['n']} {fila['tipo']}" for fila in total))
+        print(f"Base de datos: {catalogo.ruta_db}")
+
+
+if __name__ == "__main__":
+    main()
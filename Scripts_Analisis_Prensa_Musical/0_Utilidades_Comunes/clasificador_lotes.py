@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Clasificador de contenido por lotes
+Construye una matriz hasheada de recuentos de tokens (unigramas y bigramas)
+para miles de artículos y puntúa todas las categorías con un único producto
+matricial contra una matriz de pesos de palabras clave. Por defecto una
+palabra clave cuenta aunque aparezca dentro de otra, como `clave in texto`:
+'concierto' acierta en 'conciertos' y 'teatro' en 'anfiteatro'
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import re
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # Sin NumPy se usa el cálculo en Python puro
+    np = None
+
+PATRON_TOKEN = re.compile(r'\w+')
+
+
+def indice_hash(termino, dimension):
+    """Columna de la matriz para un término (hash estable entre ejecuciones)"""
+    return zlib.crc32(termino.encode('utf-8')) % dimension
+
+
+def rasgos(texto, bigramas=True):
+    """Unigramas (y bigramas) del texto en minúsculas"""
+    tokens = PATRON_TOKEN.findall(texto.lower())
+    if not bigramas:
+        return tokens
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class ClasificadorPorLotes:
+    """Puntúa lotes de textos contra categorías de palabras clave ponderadas"""
+
+    def __init__(self, categorias, etiqueta_por_defecto='general', regla='maximo',
+                 binario=True, dimension=2 ** 18, subcadenas=True):
+        """
+        categorias: dict ordenado {etiqueta: lista de palabras clave o dict {clave: peso}}
+        regla: 'maximo' (mayor puntuación) o 'prioridad' (primera categoría con aciertos)
+        binario: cuenta presencia de cada rasgo en lugar de su frecuencia
+        subcadenas: las claves se buscan como subcadenas del texto en minúsculas;
+            con False solo cuentan tokens y bigramas completos
+        """
+        if regla not in ('maximo', 'prioridad'):
+            raise ValueError(f"Regla desconocida: {regla}")
+        self.etiquetas = list(categorias.keys())
+        self.etiqueta_por_defecto = etiqueta_por_defecto
+        self.regla = regla
+        self.binario = binario
+        self.dimension = dimension
+        self.subcadenas = subcadenas
+
+        # Matriz de pesos dispersa: columna hash -> [peso por categoría]
+        self.pesos = {}
+        # Con pesos de palabras clave solo se cuentan los términos exactos,
+        # así las colisiones del hash no generan aciertos falsos
+        self.vocabulario = set()
+        for j, etiqueta in enumerate(self.etiquetas):
+            claves = categorias[etiqueta]
+            if not isinstance(claves, dict):
+                claves = {clave: 1.0 for clave in claves}
+            for clave, peso in claves.items():
+                if subcadenas:
+                    termino = clave.lower()
+                else:
+                    termino = ' '.join(PATRON_TOKEN.findall(clave.lower()))
+                self.vocabulario.add(termino)
+                fila = self.pesos.setdefault(indice_hash(termino, dimension), [0.0] * len(self.etiquetas))
+                fila[j] += peso
+        self._matriz_pesos = None
+
+        # Búsqueda de subcadenas en una pasada: en cada posición la alternancia
+        # (de mayor a menor longitud) da la clave más larga que empieza ahí; las
+        # más cortas que empiezan en la misma posición son prefijos suyos, y se
+        # recuperan con las claves contenidas en cada clave encontrada
+        self._patron_claves = None
+        self._contenidas = {}
+        terminos = sorted((t for t in self.vocabulario if t), key=len, reverse=True)
+        if subcadenas and terminos:
+            self._patron_claves = re.compile('(?=(' + '|'.join(map(re.escape, terminos)) + '))')
+            self._contenidas = {t: [u for u in terminos if u in t] for t in terminos}
+
+    def establecer_pesos(self, matriz):
+        """Sustituye los pesos por una matriz (dimension x categorías), p. ej. aprendida"""
+        if np is None:
+            raise RuntimeError("establecer_pesos requiere NumPy")
+        matriz = np.asarray(matriz, dtype=np.float32)
+        if matriz.shape != (self.dimension, len(self.etiquetas)):
+            raise ValueError(f"Se esperaba una matriz {self.dimension}x{len(self.etiquetas)}")
+        self._matriz_pesos = matriz
+        self.vocabulario = None
+        self._patron_claves = None
+        filas = np.nonzero(matriz.any(axis=1))[0]
+        self.pesos = {int(i): matriz[i].tolist() for i in filas}
+
+    def matriz_pesos(self):
+        """Matriz densa de pesos (dimension x categorías)"""
+        if self._matriz_pesos is None:
+            self._matriz_pesos = np.zeros((self.dimension, len(self.etiquetas)), dtype=np.float32)
+            for indice, fila in self.pesos.items():
+                self._matriz_pesos[indice] = fila
+        return self._matriz_pesos
+
+    def claves_contenidas(self, texto):
+        """Palabras clave presentes como subcadena del texto en minúsculas (repetidas por aparición si no es binario)"""
+        texto = texto.lower()
+        encontradas = set()
+        for coincidencia in self._patron_claves.finditer(texto):
+            encontradas.update(self._contenidas[coincidencia.group(1)])
+        if self.binario:
+            return list(encontradas)
+        return [clave for clave in encontradas for _ in range(texto.count(clave))]
+
+    def vectorizar(self, textos):
+        """Matriz dispersa de recuentos en formato CSR: (indptr, indices, datos)"""
+        bigramas = self.vocabulario is None or any(' ' in t for t in self.vocabulario)
+        indptr = [0]
+        indices = []
+        datos = []
+        for texto in textos:
+            recuentos = {}
+            vistos = set()
+            if self._patron_claves is not None:
+                candidatos = self.claves_contenidas(texto)
+            else:
+                candidatos = rasgos(texto, bigramas)
+            for rasgo in candidatos:
+                if self.vocabulario is not None and rasgo not in self.vocabulario:
+                    continue
+                columna = indice_hash(rasgo, self.dimension)
+                if columna in self.pesos:  # solo interesan columnas con peso
+                    if self.binario:
+                        # Presencia de cada rasgo: dos claves que comparten columna cuentan las dos
+                        if rasgo in vistos:
+                            continue
+                        vistos.add(rasgo)
+                    recuentos[columna] = recuentos.get(columna, 0) + 1
+            indices.extend(recuentos.keys())
+            datos.extend(recuentos.values())
+            indptr.append(len(indices))
+        return indptr, indices, datos
+
+    def puntuar(self, textos):
+        """Puntuaciones (documentos x categorías) con un producto matricial"""
+        indptr, indices, datos = self.vectorizar(textos)
+        n_categorias = len(self.etiquetas)
+
+        if np is not None:
+            pesos = self.matriz_pesos()
+            indptr = np.asarray(indptr, dtype=np.int64)
+            contribuciones = np.asarray(datos, dtype=np.float32)[:, None] * pesos[np.asarray(indices, dtype=np.int64)]
+            puntuaciones = np.zeros((len(indptr) - 1, n_categorias), dtype=np.float32)
+            no_vacios = indptr[:-1] < indptr[1:]
+            if contribuciones.size:
+                puntuaciones[no_vacios] = np.add.reduceat(contribuciones, indptr[:-1][no_vacios], axis=0)
+            return puntuaciones
+
+        puntuaciones = []
+        for d in range(len(indptr) - 1):
+            fila = [0.0] * n_categorias
+            for k in range(indptr[d], indptr[d + 1]):
+                for j, peso in enumerate(self.pesos[indices[k]]):
+                    fila[j] += datos[k] * peso
+            puntuaciones.append(fila)
+        return puntuaciones
+
+    def clasificar(self, textos):
+        """Etiqueta de cada texto según la regla de decisión"""
+        etiquetas = []
+        for fila in self.puntuar(textos):
+            fila = list(fila)
+            if self.regla == 'prioridad':
+                etiqueta = next((self.etiquetas[j] for j, valor in enumerate(fila) if valor > 0),
+                                self.etiqueta_por_defecto)
+            else:
+                mejor = max(range(len(fila)), key=lambda j: fila[j]) if fila else None
+                etiqueta = self.etiquetas[mejor] if mejor is not None and fila[mejor] > 0 else self.etiqueta_por_defecto
+            etiquetas.append(etiqueta)
+        return etiquetas
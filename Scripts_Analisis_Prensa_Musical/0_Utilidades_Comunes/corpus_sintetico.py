@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador determinista de un corpus sintético de prensa histórica
+Reproduce los nombres de archivo y la disposición de cada fuente real (El Sol,
+La Iberia Musical, Boletín Musical, El Debate, El Artista, Revista ESPAÑA y
+los directorios de revistas) con texto en español que contiene el léxico que
+buscan los analizadores. Con la misma semilla y tamaños el corpus es idéntico
+byte a byte, así que sirve para medir el rendimiento sin los directorios
+privados
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import sys
+import random
+from datetime import date, timedelta
+
+SEMILLA_POR_DEFECTO = 1788
+
+FUNCIONALES = (
+    'de la que el en y a los se del las un por con no una su para es al lo como más pero sus le ya o '
+    'fue este ha sí porque esta son entre cuando muy sin sobre también me hasta hay donde quien desde '
+    'todo nos durante todos uno les ni contra otros ese eso ante ellos e esto antes algunos qué unos '
+    'otro otras otra él tanto esa estos mucho quienes nada muchos cual poco ella estar estas algunas algo'
+).split()
+
+LEXICO_MUSICAL = (
+    'música musical concierto conciertos orquesta sinfonía sinfónica ópera óperas zarzuela zarzuelas '
+    'opereta sonata cuarteto cuartetos quinteto trío sexteto cámara música de cámara piano pianista '
+    'violín violinista violonchelo violoncello viola contrabajo flauta oboe clarinete fagot trompa '
+    'trompeta trombón tuba arpa guitarra órgano bandurria castañuelas coro orfeón banda canción '
+    'cantante tenor soprano barítono contralto maestro director compositor compositora intérprete '
+    'melodía armonía ritmo compás tonalidad acorde escala tempo allegro andante adagio crescendo '
+    'conservatorio teatro auditorio ateneo liceo casino salón estreno función temporada programa '
+    'partitura obra obras jota flamenco bolero vals mazurka marcha himno copla saeta fandango '
+    'crítica crónica aplausos público ovación éxito velada audición solista virtuoso concertista'
+).split()
+
+LEXICO_GENERAL = (
+    'ayer noche tarde día año mes semana ciudad Madrid Barcelona Sevilla Bilbao Valencia España '
+    'gobierno pueblo nación señor señora señorita don doña familia casa calle plaza iglesia misa '
+    'novena circo espectáculo baile drama comedia anuncio precio venta redacción editorial noticia '
+    'artista artistas arte bellas artes escuela enseñanza estudio historia crítica juicio juventud '
+    'gran grande nuevo nueva hermoso hermosa notable brillante admirable excelente digno digna '
+    'celebró celebrará asistió asistieron interpretó interpretaron cantó dirigió compuso escribió '
+    'merece merecen obtuvo alcanzó mereció mostró presentó ejecutó fueron estaban había habían'
+).split()
+
+COMPOSITORES = (
+    'Falla Albéniz Granados Turina Bretón Chapí Barbieri Usandizaga Guridi Vives Serrano Arrieta '
+    'Beethoven Mozart Bach Wagner Verdi Puccini Rossini Chopin Liszt Debussy Ravel Stravinsky '
+    'Brahms Schumann Schubert Mendelssohn Donizetti Bellini Gounod Massenet Saint-Saëns Sarasate Arbós'
+).split()
+
+NOMBRES_MASCULINOS = 'Manuel Joaquín Enrique Isaac Tomás Ruperto Federico Pablo Adolfo Juan José Luis Antonio'.split()
+NOMBRES_FEMENINOS = 'María Carmen Pilar Dolores Elena Teresa Rosario Isabel Conchita Lucrecia Amparo Ángeles'.split()
+APELLIDOS = 'García Pérez López Martínez Sánchez Gómez Fernández Ruiz Díaz Moreno Álvarez Romero Salazar'.split()
+TRATAMIENTOS = 'Sr. Sra. Srta. Don Doña maestro maestra señor señora'.split()
+TERMINOS_DIVERSIDAD = 'gitano gitana gitanos negro negra moro mora indio india judío judía mulato criollo'.split()
+
+MESES = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio', 'agosto', 'septiembre',
+         'octubre', 'noviembre', 'diciembre']
+
+# Directorios de revistas: (directorio, años, nombre de archivo a partir de fecha y número)
+REVISTAS = [
+    ("TXT - ONDAS año mes dia", (1925, 1935), lambda f, n: f"O-{f.year}-{f.month:02d}-{f.day:02d}.txt"),
+    ("TXT - Revista Musical Hispanoamericana", (1914, 1918),
+     lambda f, n: f"{f.year}-{f.month}-Revista-Musical-Hispanoamericana-n-{n}.txt"),
+    ("TXT - Revista Musical de Bilbao", (1909, 1913),
+     lambda f, n: f"{f.year}-{f.month}-Revista-Musical-de-Bilbao-n-{n}.txt"),
+    ("TXT -RevistaTriunfo", (1962, 1982), lambda f, n: f"RTXIX~N{n}~P{2 * n}-{2 * n + 1}"),
+]
+
+LAYOUTS = ('el_sol', 'iberia_musical', 'boletin_musical', 'el_debate', 'el_artista', 'revista_espana', 'revistas')
+
+
+class GeneradorTexto:
+    """Texto con una distribución de frecuencias parecida a la de la prensa (tipo Zipf)"""
+
+    def __init__(self, aleatorio):
+        self.aleatorio = aleatorio
+        self.vocabulario = FUNCIONALES + LEXICO_GENERAL + LEXICO_MUSICAL
+        pesos = [1.0 / (rango + 1) for rango in range(len(self.vocabulario))]
+        self.acumulados = []
+        total = 0.0
+        for peso in pesos:
+            total += peso
+            self.acumulados.append(total)
+
+    def nombre_propio(self):
+        a = self.aleatorio
+        if a.random() < 0.5:
+            return a.choice(COMPOSITORES)
+        nombre = a.choice(NOMBRES_FEMENINOS if a.random() < 0.3 else NOMBRES_MASCULINOS)
+        return f"{a.choice(TRATAMIENTOS).capitalize()} {nombre} {a.choice(APELLIDOS)}"
+
+    def frase(self, palabras):
+        a = self.aleatorio
+        elegidas = a.choices(self.vocabulario, cum_weights=self.acumulados, k=palabras)
+        # Nombres propios y términos de diversidad salpicados, como en las crónicas
+        for _ in range(max(1, palabras // 12)):
+            posicion = a.randrange(len(elegidas))
+            elegidas[posicion] = self.nombre_propio() if a.random() < 0.9 else a.choice(TERMINOS_DIVERSIDAD)
+        elegidas[0] = elegidas[0].capitalize()
+        return ' '.join(elegidas) + a.choice(('.', '.', '.', ';', ':'))
+
+    def parrafo(self, palabras):
+        frases = []
+        while palabras > 0:
+            longitud = min(palabras, self.aleatorio.randint(8, 30))
+            frases.append(self.frase(longitud))
+            palabras -= longitud
+        return ' '.join(frases)
+
+    def articulo(self, palabras, titulo=True):
+        """Cabecera en mayúsculas, firma y párrafos"""
+        a = self.aleatorio
+        partes = []
+        if titulo:
+            partes.append(' '.join(a.choice(LEXICO_MUSICAL) for _ in range(a.randint(2, 5))).upper())
+        restantes = palabras
+        while restantes > 0:
+            longitud = min(restantes, a.randint(40, 160))
+            partes.append(self.parrafo(longitud))
+            restantes -= longitud
+        if a.random() < 0.4:
+            partes.append(f"POR {a.choice(NOMBRES_MASCULINOS + NOMBRES_FEMENINOS)} {a.choice(APELLIDOS)}")
+        return '\n\n'.join(partes)
+
+
+def fechas(aleatorio, inicio, fin, cantidad):
+    """`cantidad` fechas distintas y ordenadas entre dos años"""
+    primer_dia = date(inicio, 1, 1)
+    dias = (date(fin, 12, 31) - primer_dia).days + 1
+    if cantidad >= dias:
+        elegidos = [d % dias for d in range(cantidad)]
+    else:
+        elegidos = aleatorio.sample(range(dias), cantidad)
+    return [primer_dia + timedelta(days=d) for d in sorted(elegidos)]
+
+
+def fecha_larga(fecha):
+    return f"{fecha.day} de {MESES[fecha.month - 1]} de {fecha.year}"
+
+
+def _escribir(ruta, texto):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    return len(texto.encode('utf-8'))
+
+
+def _diario(generador, directorio, plantilla, años, archivos, palabras, articulos=(3, 8)):
+    """Un número de periódico por archivo: varios artículos con cabecera"""
+    a = generador.aleatorio
+    for fecha in fechas(a, años[0], años[1], archivos):
+        numero = a.randint(*articulos)
+        texto = [f"{fecha_larga(fecha).upper()}"]
+        texto += [generador.articulo(max(20, palabras // numero)) for _ in range(numero)]
+        _escribir(os.path.join(directorio, plantilla.format(f=fecha)), '\n\n'.join(texto) + '\n')
+
+
+def generar_layout(layout, destino, archivos=50, palabras=2000, semilla=SEMILLA_POR_DEFECTO):
+    """Genera una de las disposiciones de LAYOUTS dentro de `destino`; devuelve su directorio"""
+    generador = GeneradorTexto(random.Random(f"{semilla}-{layout}"))
+    a = generador.aleatorio
+    directorio = os.path.join(destino, layout)
+    os.makedirs(directorio, exist_ok=True)
+
+    if layout == 'el_sol':
+        _diario(generador, directorio, "El_Sol_{f.year}_{f.month:02d}_{f.day:02d}.txt", (1917, 1936),
+                archivos, palabras)
+    elif layout == 'iberia_musical':
+        _diario(generador, directorio, "La_Iberia_Musical_{f.year}_{f.month:02d}_{f.day:02d}.txt", (1842, 1855),
+                archivos, palabras, articulos=(2, 5))
+    elif layout == 'boletin_musical':
+        _diario(generador, directorio, "Boletin-musical-Madrid-{f.day:02d}-{f.month:02d}-{f.year}.txt",
+                (1893, 1918), archivos, palabras, articulos=(2, 6))
+    elif layout == 'el_artista':
+        _diario(generador, directorio, "El_Artista_{f.year}_{f.month:02d}_{f.day:02d}.txt", (1866, 1867),
+                archivos, palabras, articulos=(2, 5))
+    elif layout == 'el_debate':
+        # Un archivo por año con un artículo por línea
+        for año in range(1910, 1910 + archivos):
+            lineas = []
+            restantes = palabras
+            while restantes > 0:
+                longitud = min(restantes, a.randint(30, 200))
+                lineas.append(generador.parrafo(longitud))
+                restantes -= longitud
+            _escribir(os.path.join(directorio, f"El_Debate_textos_{año}.txt"), '\n'.join(lineas) + '\n')
+    elif layout == 'revista_espana':
+        # Transcripciones numeradas con la fecha dentro del texto
+        for numero, fecha in enumerate(fechas(a, 1915, 1924, archivos), 1):
+            cabecera = f"ESPAÑA\nSEMANARIO DE LA VIDA NACIONAL\nMADRID, {fecha_larga(fecha)}\n"
+            _escribir(os.path.join(directorio, f"transcripcion_musical_espana_{numero}.txt"),
+                      cabecera + '\n' + generador.articulo(palabras) + '\n')
+    elif layout == 'revistas':
+        for nombre_directorio, años, nombre_archivo in REVISTAS:
+            subdirectorio = os.path.join(directorio, nombre_directorio)
+            os.makedirs(subdirectorio, exist_ok=True)
+            for numero, fecha in enumerate(fechas(a, años[0], años[1], archivos), 1):
+                _escribir(os.path.join(subdirectorio, nombre_archivo(fecha, numero)),
+                          generador.articulo(palabras) + '\n')
+    else:
+        raise ValueError(f"Disposición desconocida: {layout} (disponibles: {', '.join(LAYOUTS)})")
+    return directorio
+
+
+def generar_corpus(destino, archivos=50, palabras=2000, semilla=SEMILLA_POR_DEFECTO, layouts=LAYOUTS):
+    """Genera todas las disposiciones pedidas; devuelve {layout: directorio}"""
+    directorios = {}
+    for layout in layouts:
+        directorios[layout] = generar_layout(layout, destino, archivos, palabras, semilla)
+        print(f"  📝 {layout}: {directorios[layout]}")
+    return directorios
+
+
+def main():
+    argumentos = sys.argv[1:]
+    opciones = {'--archivos': '50', '--palabras': '2000', '--semilla': str(SEMILLA_POR_DEFECTO)}
+    for opcion in opciones:
+        if opcion in argumentos:
+            posicion = argumentos.index(opcion)
+            opciones[opcion] = ''.join(argumentos[posicion + 1:posicion + 2])
+            del argumentos[posicion:posicion + 2]
+
+    # Un único destino que no parezca una opción (p. ej. --help no crea un directorio)
+    if (len(argumentos) != 1 or argumentos[0].startswith('-')
+            or not all(valor.isdigit() for valor in opciones.values())):
+        print("Uso: python3 corpus_sintetico.py <destino> [--archivos 50] [--palabras 2000] [--semilla 1788]")
+        return
+    opciones = {opcion: int(valor) for opcion, valor in opciones.items()}
+    print(f"Generando corpus sintético en {argumentos[0]}")
+    generar_corpus(argumentos[0], opciones['--archivos'], opciones['--palabras'], opciones['--semilla'])
+
+
+if __name__ == "__main__":
+    main()
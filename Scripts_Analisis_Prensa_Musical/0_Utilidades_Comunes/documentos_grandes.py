@@ -0,0 +1,581 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modo de documentos grandes: transcripciones mapeadas en memoria como bytes
+Los volcados de un año entero o los *_OCR.txt de libros completos ocupan
+decenas de megas y, leídos como str, se copian varias veces más (.lower(),
+NFKD, split...). DocumentoMapeado abre el archivo con mmap y los detectores de
+registro_patrones buscan directamente sobre sus bytes: las expresiones str se
+traducen a expresiones bytes equivalentes sobre UTF-8 (\\b, \\s, \\w y
+mayúsculas con los mismos criterios Unicode que `re`) y solo se decodifican
+los fragmentos que se devuelven: grupos, términos y contextos. Lo que no tiene
+equivalente en bytes, como los recuentos sobre el texto normalizado con NFKD,
+se calcula por ventanas de líneas de tamaño acotado.
+
+Uso: python3 documentos_grandes.py archivo.txt "expresión" [--ignorar-mayusculas]
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import re
+import sys
+import mmap
+import time
+import codecs
+from collections import Counter
+from functools import lru_cache
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+UMBRAL_DOCUMENTO_GRANDE = 16 << 20
+TAM_VENTANA = 1 << 20
+
+CONTINUACION = frozenset(range(0x80, 0xc0))
+# Primer byte de los caracteres de 2, 3 y 4 bytes
+INICIALES = {2: r'[\xc2-\xdf]', 3: r'[\xe0-\xef]', 4: r'[\xf0-\xf4]'}
+CUALQUIER_CARACTER = r'(?:[\x00-\x7f]|[\xc2-\xdf][\x80-\xbf]|[\xe0-\xef][\x80-\xbf]{2}|[\xf0-\xf4][\x80-\xbf]{3})'
+
+
+def umbral_documento_grande():
+    """Tamaño a partir del cual un documento se mapea (LEXIMUS_UMBRAL_DOCUMENTO_GRANDE, en bytes)"""
+    return int(os.environ.get('LEXIMUS_UMBRAL_DOCUMENTO_GRANDE', UMBRAL_DOCUMENTO_GRANDE))
+
+
+def es_documento_grande(ruta):
+    """True si el archivo está en disco y alcanza el umbral de documento grande"""
+    ruta = os.fspath(ruta)
+    return os.path.isfile(ruta) and os.path.getsize(ruta) >= umbral_documento_grande()
+
+
+# --- Tablas Unicode (se calculan una vez, solo si se usa el modo) ---
+
+def _todos_los_caracteres():
+    return (chr(codigo) for codigo in range(0x110000) if not 0xd800 <= codigo < 0xe000)
+
+
+@lru_cache(maxsize=None)
+def _categorias():
+    """Caracteres de \\w, \\s y \\d en las expresiones str de `re`"""
+    palabra, espacio, digito = [], [], []
+    for caracter in _todos_los_caracteres():
+        if caracter.isalnum() or caracter == '_':
+            palabra.append(caracter)
+        if caracter.isspace():
+            espacio.append(caracter)
+        if caracter.isdecimal():
+            digito.append(caracter)
+    return {'palabra': frozenset(palabra), 'espacio': frozenset(espacio), 'digito': frozenset(digito)}
+
+
+@lru_cache(maxsize=None)
+def _con_mayusculas():
+    """Caracteres que cambian con lower() o upper() (unos pocos miles)"""
+    return [c for c in map(chr, range(0x110000)) if c.lower() != c or c.upper() != c]
+
+
+@lru_cache(maxsize=None)
+def _por_minuscula():
+    """Minúscula (una o varias letras) → caracteres distintos de ella que la dan con str.lower()"""
+    tabla = {}
+    for caracter in _con_mayusculas():
+        if caracter.lower() != caracter:
+            tabla.setdefault(caracter.lower(), []).append(caracter)
+    return tabla
+
+
+def _con_minuscula(minuscula):
+    """Caracteres cuyo str.lower() es `minuscula`"""
+    propios = [minuscula] if len(minuscula) == 1 and minuscula.lower() == minuscula else []
+    return propios + _por_minuscula().get(minuscula, [])
+
+
+@lru_cache(maxsize=None)
+def _candidatos_mayusculas():
+    """Primera letra de la minúscula o la mayúscula → caracteres con mayúsculas"""
+    tabla = {}
+    for caracter in _con_mayusculas():
+        for clave in {caracter.lower()[:1], caracter.upper()[:1]}:
+            tabla.setdefault(clave, []).append(caracter)
+    return tabla
+
+
+@lru_cache(maxsize=None)
+def variantes_mayusculas(caracter, flags=re.IGNORECASE):
+    """Caracteres que `re` con IGNORECASE (y las demás marcas) considera iguales a este"""
+    candidatos, vistas, claves = {caracter}, set(), {caracter}
+    while claves:  # cierre: ı → I → i → İ
+        clave = claves.pop()
+        vistas.add(clave)
+        for candidato in _candidatos_mayusculas().get(clave, ()):
+            candidatos.add(candidato)
+            claves.update({candidato.lower()[:1], candidato.upper()[:1]} - vistas)
+    patron = re.compile(re.escape(caracter), flags)
+    return sorted(c for c in candidatos if patron.fullmatch(c))
+
+
+# --- Fragmentos de expresión bytes sobre UTF-8 ---
+
+def _escapar(datos):
+    return ''.join(chr(b) if chr(b).isalnum() and b < 0x80 else f'\\x{b:02x}' for b in datos)
+
+
+def _clase_bytes(valores):
+    valores = sorted(set(valores))
+    if len(valores) == 1:
+        return _escapar(valores)
+    tramos = []
+    for valor in valores:
+        if tramos and valor == tramos[-1][1] + 1:
+            tramos[-1][1] = valor
+        else:
+            tramos.append([valor, valor])
+    partes = [f'\\x{a:02x}' if a == b else f'\\x{a:02x}-\\x{b:02x}' for a, b in tramos]
+    return '[' + ''.join(partes) + ']'
+
+
+def _alternativas(caracteres):
+    """{anchura en bytes: [alternativas]} que reconocen exactamente esos caracteres en UTF-8"""
+    finales = {}
+    for caracter in caracteres:
+        codigo = caracter.encode('utf-8')
+        finales.setdefault(codigo[:-1], set()).add(codigo[-1])
+    completos = {}
+    por_anchura = {}
+    for prefijo, ultimos in finales.items():
+        if prefijo and ultimos == CONTINUACION:
+            completos.setdefault(prefijo[:-1], set()).add(prefijo[-1])
+        else:
+            por_anchura.setdefault(len(prefijo) + 1, []).append(_escapar(prefijo) + _clase_bytes(ultimos))
+    for prefijo, penultimos in completos.items():
+        por_anchura.setdefault(len(prefijo) + 2, []).append(_escapar(prefijo) + _clase_bytes(penultimos) + r'[\x80-\xbf]')
+    return {anchura: sorted(por_anchura[anchura]) for anchura in sorted(por_anchura)}
+
+
+def clase_utf8(caracteres):
+    """Expresión bytes que consume uno de los caracteres"""
+    alternativas = [a for lista in _alternativas(caracteres).values() for a in lista]
+    if not alternativas:
+        return '(?!)'
+    if len(alternativas) == 1:
+        return alternativas[0]
+    return '(?:' + '|'.join(alternativas) + ')'
+
+
+def _precedido_por(caracteres):
+    """Aserción: el carácter anterior es uno de estos (lookbehind de anchura fija por tamaño)"""
+    partes = []
+    for anchura, alternativas in _alternativas(caracteres).items():
+        detras = '(?<=' + '|'.join(alternativas) + ')'
+        if anchura > 1:
+            detras = f'(?<={INICIALES[anchura]}[\\x80-\\xbf]{{{anchura - 1}}})' + detras
+        partes.append(detras)
+    return '(?:' + '|'.join(partes) + ')' if partes else '(?!)'
+
+
+@lru_cache(maxsize=None)
+def _limites(solo_ascii):
+    palabra = _conjunto('palabra', solo_ascii)
+    detras = _precedido_por(palabra)
+    delante = clase_utf8(palabra)
+    limite = f'(?:{detras}(?!{delante})|(?!{detras})(?={delante}))'
+    no_limite = f'(?:{detras}(?={delante})|(?!{detras})(?!{delante}))'
+    return limite, no_limite
+
+
+def _conjunto(nombre, solo_ascii=False):
+    conjunto = _categorias()[nombre]
+    return frozenset(c for c in conjunto if c < '\x80') if solo_ascii else conjunto
+
+
+# --- Traducción de expresiones str a expresiones bytes ---
+
+_OP = sre_constants
+_CATEGORIAS = {
+    _OP.CATEGORY_WORD: ('palabra', False), _OP.CATEGORY_NOT_WORD: ('palabra', True),
+    _OP.CATEGORY_SPACE: ('espacio', False), _OP.CATEGORY_NOT_SPACE: ('espacio', True),
+    _OP.CATEGORY_DIGIT: ('digito', False), _OP.CATEGORY_NOT_DIGIT: ('digito', True),
+}
+
+
+class _Traductor:
+    def __init__(self, flags, nombres):
+        self.ignorar = bool(flags & re.IGNORECASE)
+        self.marcas_mayusculas = flags & (re.IGNORECASE | re.ASCII)
+        self.punto_todo = bool(flags & re.DOTALL)
+        self.solo_ascii = bool(flags & re.ASCII)
+        self.nombres = nombres
+
+    def literal(self, codigo):
+        caracter = chr(codigo)
+        if self.ignorar:
+            return clase_utf8(variantes_mayusculas(caracter, self.marcas_mayusculas))
+        return _escapar(caracter.encode('utf-8'))
+
+    def clase(self, elementos):
+        """[...]: alternancia de los caracteres incluidos y, si hay negaciones, de lo que no excluyen"""
+        caracteres, negadas, negar = set(), [], False
+        for op, valor in elementos:
+            if op is _OP.NEGATE:
+                negar = True
+            elif op is _OP.LITERAL:
+                caracteres.update(variantes_mayusculas(chr(valor), self.marcas_mayusculas) if self.ignorar else chr(valor))
+            elif op is _OP.RANGE:
+                for codigo in range(valor[0], valor[1] + 1):
+                    caracteres.update(variantes_mayusculas(chr(codigo), self.marcas_mayusculas) if self.ignorar else chr(codigo))
+            elif op is _OP.CATEGORY:
+                nombre, negada = _CATEGORIAS[valor]
+                if negada:
+                    negadas.append(clase_utf8(_conjunto(nombre, self.solo_ascii)))
+                else:
+                    caracteres.update(_conjunto(nombre, self.solo_ascii))
+            else:
+                raise ValueError(f'Elemento de clase no traducible a bytes: {op}')
+        partes = [clase_utf8(caracteres)] if caracteres else []
+        partes += [f'(?!{excluidos}){CUALQUIER_CARACTER}' for excluidos in negadas]
+        positiva = '(?:' + '|'.join(partes) + ')' if partes else '(?!)'
+        return f'(?!{positiva}){CUALQUIER_CARACTER}' if negar else positiva
+
+    def secuencia(self, subpatron):
+        return ''.join(self.elemento(op, valor) for op, valor in subpatron)
+
+    def elemento(self, op, valor):
+        if op is _OP.LITERAL:
+            return self.literal(valor)
+        if op is _OP.NOT_LITERAL:
+            return f'(?!{self.literal(valor)}){CUALQUIER_CARACTER}'
+        if op is _OP.ANY:
+            return CUALQUIER_CARACTER if self.punto_todo else r'(?!\n)' + CUALQUIER_CARACTER
+        if op is _OP.IN:
+            return self.clase(valor)
+        if op is _OP.BRANCH:
+            return '(?:' + '|'.join(self.secuencia(rama) for rama in valor[1]) + ')'
+        if op is _OP.SUBPATTERN:
+            grupo, añadidos, quitados, subpatron = valor
+            if añadidos or quitados:
+                raise ValueError('Las marcas locales (?i:...) no se traducen a bytes')
+            if grupo is None:
+                return '(?:' + self.secuencia(subpatron) + ')'
+            nombre = self.nombres.get(grupo)
+            return (f'(?P<{nombre}>' if nombre else '(') + self.secuencia(subpatron) + ')'
+        if op in (_OP.MAX_REPEAT, _OP.MIN_REPEAT):
+            minimo, maximo, subpatron = valor
+            cuantificador = {(0, _OP.MAXREPEAT): '*', (1, _OP.MAXREPEAT): '+', (0, 1): '?'}.get(
+                (minimo, maximo), '{%d,%s}' % (minimo, '' if maximo == _OP.MAXREPEAT else maximo))
+            perezoso = '?' if op is _OP.MIN_REPEAT else ''
+            return '(?:' + self.secuencia(subpatron) + ')' + cuantificador + perezoso
+        if op is _OP.AT:
+            if valor in (_OP.AT_BOUNDARY, _OP.AT_NON_BOUNDARY):
+                limite, no_limite = _limites(self.solo_ascii)
+                return limite if valor is _OP.AT_BOUNDARY else no_limite
+            return {_OP.AT_BEGINNING: '^', _OP.AT_BEGINNING_STRING: r'\A',
+                    _OP.AT_END: '$', _OP.AT_END_STRING: r'\Z'}[valor]
+        if op is _OP.GROUPREF:
+            return f'(?:\\{valor})'
+        if op in (_OP.ASSERT, _OP.ASSERT_NOT):
+            direccion, subpatron = valor
+            return ('(?' + ('<' if direccion < 0 else '') + ('=' if op is _OP.ASSERT else '!')
+                    + self.secuencia(subpatron) + ')')
+        raise ValueError(f'Construcción no traducible a bytes: {op}')
+
+
+@lru_cache(maxsize=None)
+def expresion_bytes(expresion, flags=0):
+    """Expresión bytes compilada que reconoce sobre UTF-8 lo mismo que la expresión str
+
+    Las posiciones de las coincidencias son desplazamientos en bytes.
+    """
+    arbol = sre_parse.parse(expresion, flags)
+    flags = arbol.state.flags
+    nombres = {grupo: nombre for nombre, grupo in arbol.state.groupdict.items()}
+    traduccion = _Traductor(flags, nombres).secuencia(arbol)
+    return re.compile(traduccion.encode('ascii'), flags & re.MULTILINE)
+
+
+def _es_palabra(caracter):
+    return caracter.isalnum() or caracter == '_'
+
+
+def hay_limite_bytes(datos, posicion):
+    """\\b de las expresiones str en un desplazamiento de bytes UTF-8"""
+    izquierda = derecha = False
+    if posicion > 0:
+        inicio = posicion - 1
+        while inicio > 0 and posicion - inicio < 4 and datos[inicio] in CONTINUACION:
+            inicio -= 1
+        izquierda = _es_palabra(bytes(datos[inicio:posicion]).decode('utf-8', 'replace')[-1:])
+    if posicion < len(datos):
+        derecha = _es_palabra(bytes(datos[posicion:posicion + 4]).decode('utf-8', 'replace')[:1])
+    return izquierda != derecha
+
+
+# --- Documentos mapeados ---
+
+class CoincidenciaDecodificada:
+    """Coincidencia sobre los bytes de un documento: posiciones en bytes, grupos como str"""
+
+    def __init__(self, coincidencia):
+        self.coincidencia = coincidencia
+        self.lastindex = coincidencia.lastindex
+        self.lastgroup = coincidencia.lastgroup
+
+    def _decodificar(self, valor):
+        return valor.decode('utf-8') if valor is not None else None
+
+    def group(self, *grupos):
+        valores = self.coincidencia.group(*grupos)
+        if len(grupos) > 1:
+            return tuple(self._decodificar(valor) for valor in valores)
+        return self._decodificar(valores)
+
+    def __getitem__(self, grupo):
+        return self.group(grupo)
+
+    def groups(self, default=None):
+        return tuple(self._decodificar(valor) if valor is not None else default
+                     for valor in self.coincidencia.groups())
+
+    def groupdict(self, default=None):
+        return {nombre: self._decodificar(valor) if valor is not None else default
+                for nombre, valor in self.coincidencia.groupdict().items()}
+
+    def start(self, grupo=0):
+        return self.coincidencia.start(grupo)
+
+    def end(self, grupo=0):
+        return self.coincidencia.end(grupo)
+
+    def span(self, grupo=0):
+        return self.coincidencia.span(grupo)
+
+
+class RecuentosNormalizados:
+    """Lo que se pregunta al texto normalizado (in, count) para un vocabulario fijo"""
+
+    def __init__(self, recuentos):
+        self.recuentos = recuentos
+
+    def __contains__(self, termino):
+        return self.count(termino) > 0
+
+    def count(self, termino):
+        return self.recuentos[termino]  # KeyError: el término no estaba en el vocabulario
+
+
+class DocumentoMapeado:
+    """Transcripción en disco mapeada con mmap; se usa como el str que sustituye
+
+    Los detectores de registro_patrones lo aceptan en lugar del texto y devuelven
+    posiciones en bytes; documento[inicio:fin] decodifica solo ese tramo.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = os.fspath(ruta)
+        self._archivo = open(self.ruta, 'rb')
+        tamaño = os.fstat(self._archivo.fileno()).st_size
+        self.datos = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ) if tamaño else b''
+        self._primeras = {}
+        self._normalizados = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        if isinstance(self.datos, mmap.mmap):
+            self.datos.close()
+        self._archivo.close()
+
+    def __len__(self):
+        """Tamaño en bytes"""
+        return len(self.datos)
+
+    def __getitem__(self, tramo):
+        if not isinstance(tramo, slice):
+            raise TypeError('Un DocumentoMapeado solo se recorta con [inicio:fin] en bytes')
+        return self.decodificar(*tramo.indices(len(self.datos))[:2])
+
+    def decodificar(self, inicio, fin):
+        return self.datos[inicio:fin].decode('utf-8')
+
+    def utf8_valido(self):
+        """True si todo el archivo es UTF-8 válido (se comprueba por ventanas, sin copiarlo)"""
+        decodificador = codecs.getincrementaldecoder('utf-8')('strict')
+        try:
+            for inicio in range(0, len(self.datos), TAM_VENTANA):
+                decodificador.decode(self.datos[inicio:inicio + TAM_VENTANA])
+            decodificador.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return False
+        return True
+
+    def sin_retornos(self):
+        """True si el archivo no tiene '\\r'
+
+        Solo entonces sus bytes coinciden con la lectura en modo texto, que convierte
+        \\r\\n y \\r en \\n y desplaza contextos y posiciones.
+        """
+        return self.datos.find(b'\r') == -1
+
+    def _inicio_caracter(self, posicion):
+        while 0 < posicion < len(self.datos) and self.datos[posicion] in CONTINUACION:
+            posicion -= 1
+        return posicion
+
+    def retroceder(self, posicion, caracteres):
+        """Desplazamiento en bytes `caracteres` caracteres antes (o 0)
+
+        Más allá del final (ver buscar_minusculas) cada byte cuenta como un carácter.
+        """
+        exceso = posicion - len(self.datos)
+        if exceso > 0:
+            if caracteres <= exceso:
+                return posicion - caracteres
+            posicion, caracteres = len(self.datos), caracteres - exceso
+        if caracteres <= 0:
+            return posicion
+        inicio = self._inicio_caracter(max(0, posicion - 4 * caracteres))
+        tramo = self.decodificar(inicio, posicion)
+        return posicion - len(tramo[-caracteres:].encode('utf-8'))
+
+    def _avanzar(self, posicion, caracteres):
+        """(desplazamiento, caracteres que no caben antes del final)"""
+        fin = min(len(self.datos), posicion + 4 * caracteres)
+        if fin < len(self.datos):
+            fin = self._inicio_caracter(fin)
+        tramo = self.decodificar(posicion, fin)[:caracteres] if caracteres > 0 else ''
+        return posicion + len(tramo.encode('utf-8')), max(0, caracteres - len(tramo))
+
+    def avanzar(self, posicion, caracteres):
+        """Desplazamiento en bytes `caracteres` caracteres después (o el final)"""
+        if posicion >= len(self.datos):
+            return len(self.datos)
+        return self._avanzar(posicion, caracteres)[0]
+
+    def ventanas(self, tamaño=TAM_VENTANA):
+        """Texto decodificado en ventanas de líneas completas de unos `tamaño` bytes"""
+        inicio, total = 0, len(self.datos)
+        while inicio < total:
+            fin = min(total, inicio + tamaño)
+            if fin < total:
+                corte = self.datos.rfind(b'\n', inicio, fin)
+                if corte == -1:
+                    corte = self.datos.find(b'\n', fin)
+                fin = total if corte == -1 else corte + 1
+            yield self.decodificar(inicio, fin)
+            inicio = fin
+
+    def normalizado(self, normalizar, vocabulario):
+        """Recuentos de los términos en normalizar(texto), calculados por ventanas de líneas
+
+        Sirve para normalizaciones que actúan carácter a carácter sin cruzar saltos
+        de línea (NFKD, lower) y para términos sin saltos de línea.
+        """
+        clave = (normalizar, frozenset(vocabulario))
+        if clave not in self._normalizados:
+            recuentos = Counter({termino: 0 for termino in vocabulario})
+            for ventana in self.ventanas():
+                ventana = normalizar(ventana)
+                for termino in vocabulario:
+                    recuentos[termino] += ventana.count(termino)
+            self._normalizados[clave] = RecuentosNormalizados(recuentos)
+        return self._normalizados[clave]
+
+    def buscar_minusculas(self, termino):
+        """Como texto.lower().find(termino.lower()), en bytes y sobre el texto original
+
+        El índice de texto.lower() se traslada al original igual que hacía el
+        código con str: desplazado si antes hay letras como la İ, cuya minúscula
+        ocupa dos caracteres, y por eso puede quedar más allá del final.
+        """
+        buscado = termino.lower()
+        if buscado not in self._primeras:
+            if not buscado:
+                self._primeras[buscado] = 0
+            else:
+                posicion, desfase = -1, 0
+                for patron, desfase_patron in _patrones_minusculas(buscado):
+                    coincidencia = patron.search(self.datos)
+                    if coincidencia and (posicion == -1 or coincidencia.start() < posicion):
+                        posicion, desfase = coincidencia.start(), desfase_patron
+                if posicion != -1:
+                    largas = dict(_minusculas_largas())
+                    extra = sum(len(largas[c.group().decode('utf-8')]) - 1
+                                for c in _patron_minusculas_largas().finditer(self.datos, 0, posicion))
+                    posicion, exceso = self._avanzar(posicion, extra + desfase)
+                    posicion += exceso
+                self._primeras[buscado] = posicion
+        return self._primeras[buscado]
+
+
+@lru_cache(maxsize=None)
+def _minusculas_largas():
+    return tuple((caracter, minuscula) for minuscula, caracteres in _por_minuscula().items()
+                 if len(minuscula) > 1 for caracter in caracteres)
+
+
+@lru_cache(maxsize=None)
+def _patron_minusculas_largas():
+    return re.compile(clase_utf8(caracter for caracter, _ in _minusculas_largas()).encode('ascii'))
+
+
+@lru_cache(maxsize=1024)
+def _patrones_minusculas(buscado):
+    """[(patrón, desfase)]: bytes del original cuya minúscula contiene `buscado`
+
+    El desfase (en caracteres de la minúscula) es distinto de 0 cuando la
+    coincidencia empieza a mitad de la minúscula de una letra como la İ.
+    """
+    @lru_cache(maxsize=None)
+    def desde(i):
+        if i == len(buscado):
+            return ''
+        ramas = [clase_utf8(_con_minuscula(buscado[i])) + desde(i + 1)]
+        for caracter, minuscula in _minusculas_largas():
+            if buscado.startswith(minuscula, i):
+                ramas.append(_escapar(caracter.encode('utf-8')) + desde(i + len(minuscula)))
+            elif minuscula.startswith(buscado[i:]):
+                ramas.append(_escapar(caracter.encode('utf-8')))
+        return ramas[0] if len(ramas) == 1 else '(?:' + '|'.join(ramas) + ')'
+
+    patrones = [(desde(0), 0)]
+    for caracter, minuscula in _minusculas_largas():
+        for desfase in range(1, len(minuscula)):
+            resto = minuscula[desfase:]
+            if buscado.startswith(resto):
+                patrones.append((_escapar(caracter.encode('utf-8')) + desde(len(resto)), desfase))
+            elif resto.startswith(buscado):
+                patrones.append((_escapar(caracter.encode('utf-8')), desfase))
+    return [(re.compile(expresion.encode('ascii')), desfase) for expresion, desfase in patrones]
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Uso: python3 documentos_grandes.py archivo.txt \"expresión\" [--ignorar-mayusculas]")
+        return
+    ruta, expresion = sys.argv[1], sys.argv[2]
+    flags = re.IGNORECASE if '--ignorar-mayusculas' in sys.argv[3:] else 0
+    inicio = time.perf_counter()
+    patron = expresion_bytes(expresion, flags)
+    print(f"🔧 Expresión traducida a bytes en {time.perf_counter() - inicio:.2f} s")
+    with DocumentoMapeado(ruta) as documento:
+        if not documento.utf8_valido():
+            print("❌ El archivo no es UTF-8 válido")
+            return
+        inicio = time.perf_counter()
+        coincidencias = [CoincidenciaDecodificada(c) for c in patron.finditer(documento.datos)]
+        segundos = time.perf_counter() - inicio
+        print(f"🔎 {len(coincidencias)} coincidencias en {len(documento) / 1e6:.1f} MB ({segundos:.2f} s)")
+        for coincidencia in coincidencias[:10]:
+            print(f"  {coincidencia.start():>10}  {coincidencia.group(0)!r}")
+
+
+if __name__ == "__main__":
+    main()
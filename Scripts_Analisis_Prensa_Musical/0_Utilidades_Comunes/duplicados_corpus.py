@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detección de documentos casi duplicados en el corpus (MinHash + LSH)
+Las repeticiones de OCR y las descargas repetidas dejan transcripciones casi
+idénticas (p. ej. *_OCR.txt junto a la salida de pdfminer) que inflan los
+recuentos. Se calcula una firma MinHash de los shingles de palabras de cada
+texto, el LSH por bandas propone candidatos sin comparar todos con todos y
+los grupos confirmados se guardan en un mapa de documentos canónicos que los
+analizadores respetan con filtrar_canonicos()
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import re
+import sys
+import json
+import zlib
+import random
+import unicodedata
+from array import array
+from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from almacen_corpus import leer_texto, listar_textos_corpus
+
+try:
+    import numpy as np
+except ImportError:  # Sin NumPy las firmas se calculan en Python puro (mismo resultado)
+    np = None
+
+MAPA_POR_DEFECTO = os.path.expanduser('~/leximus_canonicos.json')
+
+PERMUTACIONES = 128
+BANDAS = 16            # 16 bandas de 8 filas: candidatos a partir de ~0.7 de similitud
+TAM_SHINGLE = 5
+UMBRAL = 0.8
+SEMILLA = 1788
+
+PRIMO = (1 << 61) - 1
+MASCARA = 0xFFFFFFFF
+
+PATRON_PALABRA = re.compile(r'[a-z0-9]+')
+
+# Coeficientes de las permutaciones: a·h + b < 2^61, así que el cálculo es exacto
+# tanto en Python como en uint64 de NumPy
+_aleatorio = random.Random(SEMILLA)
+COEF_A = [_aleatorio.randrange(1, 1 << 29) for _ in range(PERMUTACIONES)]
+COEF_B = [_aleatorio.randrange(0, 1 << 29) for _ in range(PERMUTACIONES)]
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes: las variantes de OCR difieren sobre todo en diacríticos"""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def shingles(texto, k=TAM_SHINGLE):
+    """Conjunto de hashes de 32 bits de las secuencias de k palabras"""
+    palabras = PATRON_PALABRA.findall(normalizar(texto))
+    if not palabras:
+        return set()
+    if len(palabras) <= k:
+        return {zlib.crc32(' '.join(palabras).encode('utf-8'))}
+    return {zlib.crc32(' '.join(palabras[i:i + k]).encode('utf-8')) for i in range(len(palabras) - k + 1)}
+
+
+def firma_minhash(hashes):
+    """Firma MinHash (PERMUTACIONES valores de 32 bits) de un conjunto de shingles"""
+    if np is not None:
+        valores = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        a = np.array(COEF_A, dtype=np.uint64)[:, None]
+        b = np.array(COEF_B, dtype=np.uint64)[:, None]
+        minimos = np.full(PERMUTACIONES, MASCARA, dtype=np.uint64)
+        # Por tramos, para no crear una matriz enorme con los textos largos
+        for inicio in range(0, len(valores), 4096):
+            tramo = valores[inicio:inicio + 4096][None, :]
+            permutados = ((a * tramo + b) % PRIMO) & MASCARA
+            minimos = np.minimum(minimos, permutados.min(axis=1))
+        return array('I', minimos.astype(np.uint32).tolist())
+    return array('I', [min(((a * h + b) % PRIMO) & MASCARA for h in hashes)
+                       for a, b in zip(COEF_A, COEF_B)])
+
+
+def similitud(firma_a, firma_b):
+    """Estimación de la similitud de Jaccard: fracción de posiciones iguales"""
+    return sum(1 for x, y in zip(firma_a, firma_b) if x == y) / len(firma_a)
+
+
+def _firmar_lote(rutas):
+    """Función de trabajo: (ruta, longitud, firma) de un lote de textos"""
+    resultado = []
+    for ruta in rutas:
+        try:
+            texto = leer_texto(ruta)
+        except Exception as e:
+            print(f"Error leyendo {ruta}: {e}")
+            continue
+        hashes = shingles(texto)
+        if hashes:
+            resultado.append((ruta, len(texto), firma_minhash(hashes)))
+    return resultado
+
+
+class DetectorDuplicados:
+    """Firmas MinHash en memoria e índice LSH por bandas"""
+
+    def __init__(self, umbral=UMBRAL, bandas=BANDAS):
+        if PERMUTACIONES % bandas:
+            raise ValueError(f"El número de bandas debe dividir {PERMUTACIONES}")
+        self.umbral = umbral
+        self.bandas = bandas
+        self.filas = PERMUTACIONES // bandas
+        self.rutas = []
+        self.longitudes = []
+        self.firmas = []
+        self.cubos = [defaultdict(list) for _ in range(bandas)]
+
+    def añadir(self, ruta, longitud, firma):
+        indice = len(self.rutas)
+        self.rutas.append(ruta)
+        self.longitudes.append(longitud)
+        self.firmas.append(firma)
+        for banda in range(self.bandas):
+            inicio = banda * self.filas
+            self.cubos[banda][bytes(firma[inicio:inicio + self.filas])].append(indice)
+
+    def firmar(self, rutas, procesos=None, archivos_por_lote=200):
+        """Calcula en paralelo las firmas de todos los textos y las indexa"""
+        rutas = sorted(os.path.abspath(r) for r in rutas)
+        lotes = [rutas[i:i + archivos_por_lote] for i in range(0, len(rutas), archivos_por_lote)]
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            for i, resultado in enumerate(ejecutor.map(_firmar_lote, lotes), 1):
+                for ruta, longitud, firma in resultado:
+                    self.añadir(ruta, longitud, firma)
+                print(f"  Firmados: {min(i * archivos_por_lote, len(rutas))}/{len(rutas)}")
+
+    def grupos(self):
+        """Grupos de casi duplicados (listas de índices), confirmados con la firma completa"""
+        padre = list(range(len(self.rutas)))
+
+        def raiz(i):
+            while padre[i] != i:
+                padre[i] = padre[padre[i]]
+                i = padre[i]
+            return i
+
+        for cubos in self.cubos:
+            for miembros in cubos.values():
+                if len(miembros) < 2:
+                    continue
+                # Cada miembro se compara con los representantes del cubo, no con todos los
+                # demás: un cubo grande de textos repetidos no se vuelve cuadrático
+                representantes = []
+                for i in miembros:
+                    for r in representantes:
+                        if raiz(i) == raiz(r) or similitud(self.firmas[i], self.firmas[r]) >= self.umbral:
+                            padre[raiz(i)] = raiz(r)
+                            break
+                    else:
+                        representantes.append(i)
+
+        grupos = defaultdict(list)
+        for i in range(len(self.rutas)):
+            grupos[raiz(i)].append(i)
+        return [miembros for miembros in grupos.values() if len(miembros) > 1]
+
+    def mapa_canonicos(self):
+        """Mapa con los grupos; el canónico de cada grupo es el texto más completo"""
+        grupos = []
+        canonico = {}
+        for miembros in self.grupos():
+            rutas = [self.rutas[i] for i in sorted(miembros, key=lambda i: (-self.longitudes[i], self.rutas[i]))]
+            grupos.append(rutas)
+            for ruta in rutas[1:]:
+                canonico[ruta] = rutas[0]
+        grupos.sort()
+        return {
+            'generado': datetime.now().isoformat(),
+            'umbral': self.umbral,
+            'permutaciones': PERMUTACIONES,
+            'bandas': self.bandas,
+            'tam_shingle': TAM_SHINGLE,
+            'documentos': len(self.rutas),
+            'grupos': grupos,
+            'canonico': canonico
+        }
+
+
+def detectar_duplicados(directorios, archivo_mapa=MAPA_POR_DEFECTO, umbral=UMBRAL, procesos=None):
+    """Analiza los textos de uno o varios directorios y guarda el mapa de canónicos"""
+    rutas = []
+    for directorio in directorios:
+        rutas.extend(listar_textos_corpus(directorio))
+    print(f"🔎 Buscando casi duplicados en {len(rutas)} textos (umbral {umbral})")
+
+    detector = DetectorDuplicados(umbral=umbral)
+    detector.firmar(rutas, procesos=procesos)
+    mapa = detector.mapa_canonicos()
+
+    with open(archivo_mapa, 'w', encoding='utf-8') as f:
+        json.dump(mapa, f, ensure_ascii=False, indent=2)
+    print(f"  ✅ {len(mapa['grupos'])} grupos, {len(mapa['canonico'])} duplicados → {archivo_mapa}")
+    return mapa
+
+
+_mapas = {}
+
+
+def cargar_mapa(archivo_mapa=MAPA_POR_DEFECTO):
+    """Mapa de canónicos guardado (None si todavía no se ha generado)"""
+    if archivo_mapa not in _mapas:
+        mapa = None
+        if os.path.exists(archivo_mapa):
+            with open(archivo_mapa, 'r', encoding='utf-8') as f:
+                mapa = json.load(f)
+        _mapas[archivo_mapa] = mapa
+    return _mapas[archivo_mapa]
+
+
+def filtrar_canonicos(rutas, archivo_mapa=MAPA_POR_DEFECTO):
+    """Deja un solo documento por grupo de duplicados entre las rutas dadas
+
+    Se conserva el canónico si está entre ellas y, si no, el primer miembro del
+    grupo que aparezca: un analizador que solo lee un directorio no pierde un
+    documento cuyo canónico está en otra publicación. Sin mapa, no filtra nada.
+    """
+    mapa = cargar_mapa(archivo_mapa)
+    if not mapa or not mapa['canonico']:
+        return list(rutas)
+
+    rutas = list(rutas)
+    absolutas = {os.path.abspath(r) for r in rutas}
+    vistos = set()
+    resultado = []
+    for ruta in rutas:
+        absoluta = os.path.abspath(ruta)
+        canonico = mapa['canonico'].get(absoluta, absoluta)
+        if absoluta != canonico and canonico in absolutas:
+            continue
+        if canonico in vistos:
+            continue
+        vistos.add(canonico)
+        resultado.append(ruta)
+
+    if len(resultado) < len(rutas):
+        print(f"  ♻️  {len(rutas) - len(resultado)} casi duplicados omitidos")
+    return resultado
+
+
+def main():
+    argumentos = sys.argv[1:]
+    archivo_mapa = MAPA_POR_DEFECTO
+    umbral = UMBRAL
+    if '-o' in argumentos:
+        posicion = argumentos.index('-o')
+        archivo_mapa = argumentos[posicion + 1]
+        del argumentos[posicion:posicion + 2]
+    if '--umbral' in argumentos:
+        posicion = argumentos.index('--umbral')
+        umbral = float(argumentos[posicion + 1])
+        del argumentos[posicion:posicion + 2]
+
+    if not argumentos:
+        print("Uso: python3 duplicados_corpus.py <directorio> [<directorio> ...] [-o mapa.json] [--umbral 0.8]")
+        return
+    detectar_duplicados(argumentos, archivo_mapa=archivo_mapa, umbral=umbral)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentación ligera de los analizadores
+Envuelve los métodos de las clases de un script (analizar_compositores,
+analizar_genero_social, count_musical_elements, procesar_archivo...) con
+cronómetros y contadores: tiempo total y propio (sin los métodos anidados,
+así el de procesar_archivo es casi todo lectura), llamadas y coincidencias de
+expresiones regulares (el `re` del script se sustituye por uno que cuenta, y
+los detectores de registro_patrones.py informan de las suyas).
+Cada llamada cuyo primer argumento es un archivo existente es una unidad por
+archivo y deja una línea JSON con bytes, coincidencias y milisegundos. El
+perfil con cProfile y las asignaciones con tracemalloc van aparte, con su
+opción. Los scripts no cambian: el ejecutor importa el script, lo instrumenta
+y llama a su main()
+
+Uso: python3 instrumentacion.py [--metricas metricas.jsonl] [--cprofile perfil.prof]
+                                [--tracemalloc] <script.py> [argumentos del script...]
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import inspect
+import functools
+import importlib.util
+from pathlib import Path
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from registro_patrones import REGISTRO
+
+
+class PatronContado:
+    """Expresión compilada que suma sus coincidencias a la instrumentación"""
+
+    def __init__(self, patron, instrumentacion):
+        self.patron_compilado = patron
+        self.instrumentacion = instrumentacion
+
+    def __getattr__(self, nombre):
+        return getattr(self.patron_compilado, nombre)
+
+    def _una(self, coincidencia):
+        if coincidencia is not None:
+            self.instrumentacion.contar(1)
+        return coincidencia
+
+    def search(self, *argumentos, **opciones):
+        return self._una(self.patron_compilado.search(*argumentos, **opciones))
+
+    def match(self, *argumentos, **opciones):
+        return self._una(self.patron_compilado.match(*argumentos, **opciones))
+
+    def fullmatch(self, *argumentos, **opciones):
+        return self._una(self.patron_compilado.fullmatch(*argumentos, **opciones))
+
+    def findall(self, *argumentos, **opciones):
+        coincidencias = self.patron_compilado.findall(*argumentos, **opciones)
+        self.instrumentacion.contar(len(coincidencias))
+        return coincidencias
+
+    def finditer(self, *argumentos, **opciones):
+        for coincidencia in self.patron_compilado.finditer(*argumentos, **opciones):
+            self.instrumentacion.contar(1)
+            yield coincidencia
+
+    def subn(self, *argumentos, **opciones):
+        resultado = self.patron_compilado.subn(*argumentos, **opciones)
+        self.instrumentacion.contar(resultado[1])
+        return resultado
+
+    def sub(self, *argumentos, **opciones):
+        return self.subn(*argumentos, **opciones)[0]
+
+
+class ReContado:
+    """Sustituto del módulo re cuyas expresiones cuentan sus coincidencias"""
+
+    def __init__(self, instrumentacion):
+        self.instrumentacion = instrumentacion
+
+    def __getattr__(self, nombre):
+        return getattr(re, nombre)
+
+    def compile(self, patron, flags=0):
+        if isinstance(patron, PatronContado):
+            return patron
+        return PatronContado(re.compile(patron, flags), self.instrumentacion)
+
+    def search(self, patron, cadena, flags=0):
+        return self.compile(patron, flags).search(cadena)
+
+    def match(self, patron, cadena, flags=0):
+        return self.compile(patron, flags).match(cadena)
+
+    def fullmatch(self, patron, cadena, flags=0):
+        return self.compile(patron, flags).fullmatch(cadena)
+
+    def findall(self, patron, cadena, flags=0):
+        return self.compile(patron, flags).findall(cadena)
+
+    def finditer(self, patron, cadena, flags=0):
+        return self.compile(patron, flags).finditer(cadena)
+
+    def sub(self, patron, reemplazo, cadena, count=0, flags=0):
+        return self.compile(patron, flags).sub(reemplazo, cadena, count)
+
+    def subn(self, patron, reemplazo, cadena, count=0, flags=0):
+        return self.compile(patron, flags).subn(reemplazo, cadena, count)
+
+    def split(self, patron, cadena, maxsplit=0, flags=0):
+        return re.split(getattr(patron, 'patron_compilado', patron), cadena, maxsplit, flags)
+
+
+class Instrumentacion:
+    """Tiempos, llamadas y coincidencias por método y registro por archivo
+
+    Solo mide en el proceso que la creó: los trabajadores de un pool que
+    heredan las clases envueltas ejecutan los métodos sin medir.
+    """
+
+    def __init__(self, metricas=None):
+        self.total_ms = defaultdict(float)
+        self.propio_ms = defaultdict(float)
+        self.llamadas = Counter()
+        self.coincidencias = Counter()
+        self.pila = []  # [nombre, milisegundos de los hijos] de cada llamada abierta
+        self.archivo = None  # registro del archivo en curso
+        self.archivos = 0
+        self.bytes = 0
+        self.pid = os.getpid()
+        self.salida = open(metricas, 'w', encoding='utf-8') if metricas else None
+
+    def _emitir(self, registro):
+        if self.salida:
+            self.salida.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+    @staticmethod
+    def _ruta_archivo(argumentos):
+        """Primer argumento (tras self en los métodos) si es un archivo existente"""
+        for argumento in argumentos[:2]:
+            if isinstance(argumento, (str, Path)):
+                ruta = str(argumento)
+                return ruta if len(ruta) < 4096 and os.path.isfile(ruta) else None
+        return None
+
+    def contar(self, coincidencias):
+        """Suma coincidencias al método en curso y al archivo en curso"""
+        if coincidencias and self.pila and os.getpid() == self.pid:
+            self.coincidencias[self.pila[-1][0]] += coincidencias
+            if self.archivo is not None:
+                self.archivo['coincidencias'] += coincidencias
+
+    def _abrir(self, nombre):
+        self.pila.append([nombre, 0.0])
+        return time.perf_counter()
+
+    def _cerrar(self, nombre, inicio):
+        ms = (time.perf_counter() - inicio) * 1000
+        _, hijos = self.pila.pop()
+        if self.pila:
+            self.pila[-1][1] += ms
+        self.total_ms[nombre] += ms
+        self.propio_ms[nombre] += ms - hijos
+        self.llamadas[nombre] += 1
+        if self.archivo is not None:
+            self.archivo['metodos'][nombre] += ms - hijos
+        return ms
+
+    def llamar(self, nombre, funcion, argumentos=(), opciones=None):
+        """Ejecuta y mide una llamada; si es la de un archivo, emite su registro"""
+        if os.getpid() != self.pid:
+            return funcion(*argumentos, **(opciones or {}))
+
+        ruta = self._ruta_archivo(argumentos) if self.archivo is None else None
+        if ruta:
+            self.archivo = {'tipo': 'archivo', 'archivo': ruta, 'bytes': os.path.getsize(ruta),
+                            'ms': 0.0, 'coincidencias': 0, 'metodos': defaultdict(float)}
+
+        inicio = self._abrir(nombre)
+        try:
+            resultado = funcion(*argumentos, **(opciones or {}))
+        finally:
+            ms = self._cerrar(nombre, inicio)
+            if ruta and sys.exc_info()[0] is not None:
+                self.archivo = None
+
+        if ruta:
+            registro, self.archivo = self.archivo, None
+            registro['ms'] = round(ms, 3)
+            registro['metodos'] = {metodo: round(t, 3) for metodo, t in registro['metodos'].items()}
+            self.archivos += 1
+            self.bytes += registro['bytes']
+            self._emitir(registro)
+        return resultado
+
+    @contextmanager
+    def etapa(self, nombre):
+        """Mide un bloque que no es un método (lectura, volcado JSON...)"""
+        if os.getpid() != self.pid:
+            yield
+            return
+        inicio = self._abrir(nombre)
+        try:
+            yield
+        finally:
+            self._cerrar(nombre, inicio)
+
+    def envolver(self, nombre, funcion):
+        @functools.wraps(funcion)
+        def envuelta(*argumentos, **opciones):
+            return self.llamar(nombre, funcion, argumentos, opciones)
+        return envuelta
+
+    def instrumentar_clase(self, clase, metodos=None):
+        """Envuelve los métodos de una clase (todos los que no son especiales, o los indicados)"""
+        for nombre, atributo in list(vars(clase).items()):
+            if inspect.isfunction(atributo) and not nombre.startswith('__') and (metodos is None or nombre in metodos):
+                setattr(clase, nombre, self.envolver(f"{clase.__name__}.{nombre}", atributo))
+
+    def instrumentar_modulo(self, modulo):
+        """Envuelve las clases y funciones definidas en un módulo, salvo main(), y cuenta sus regex"""
+        if getattr(modulo, 're', None) is re:
+            modulo.re = ReContado(self)
+        # Los detectores del registro cuentan por su cuenta y avisan de sus coincidencias
+        REGISTRO.medir = True
+        REGISTRO.observador = self.contar
+        for nombre, atributo in list(vars(modulo).items()):
+            if isinstance(atributo, re.Pattern):
+                setattr(modulo, nombre, PatronContado(atributo, self))
+                continue
+            if getattr(atributo, '__module__', None) != modulo.__name__ or nombre == 'main':
+                continue
+            if inspect.isclass(atributo):
+                self.instrumentar_clase(atributo)
+            elif inspect.isfunction(atributo) and not nombre.startswith('_'):
+                setattr(modulo, nombre, self.envolver(nombre, atributo))
+
+    def resumen(self):
+        metodos = [{'metodo': nombre, 'llamadas': self.llamadas[nombre],
+                    'ms_total': round(self.total_ms[nombre], 3), 'ms_propio': round(self.propio_ms[nombre], 3),
+                    'coincidencias': self.coincidencias[nombre]}
+                   for nombre in sorted(self.propio_ms, key=self.propio_ms.get, reverse=True)]
+        return {'tipo': 'resumen', 'archivos': self.archivos, 'bytes': self.bytes, 'metodos': metodos,
+                'patrones': REGISTRO.estadisticas()}
+
+    def cerrar(self, mostrar=15):
+        """Emite el resumen y lo imprime con los métodos más costosos"""
+        resumen = self.resumen()
+        self._emitir(resumen)
+        if self.salida:
+            self.salida.close()
+            self.salida = None
+        print(f"\n⏱️  Instrumentación: {resumen['archivos']} archivos, {resumen['bytes'] / 1e6:.2f} MB", file=sys.stderr)
+        for metodo in resumen['metodos'][:mostrar]:
+            print(f"  {metodo['ms_propio']:>10.1f} ms propios {metodo['ms_total']:>10.1f} ms total "
+                  f"{metodo['llamadas']:>7} llamadas {metodo['coincidencias']:>8} coinc.  {metodo['metodo']}",
+                  file=sys.stderr)
+        if mostrar and resumen['patrones']:
+            print(REGISTRO.informe(mostrar), file=sys.stderr)
+        return resumen
+
+
+def cargar_script(ruta):
+    """Importa un script como módulo (no como __main__, para que su main() no se ejecute)"""
+    ruta = os.path.abspath(ruta)
+    nombre = Path(ruta).stem
+    sys.path.insert(0, os.path.dirname(ruta))
+    especificacion = importlib.util.spec_from_file_location(nombre, ruta)
+    modulo = importlib.util.module_from_spec(especificacion)
+    sys.modules[nombre] = modulo  # los pools de procesos buscan sus funciones por el nombre del módulo
+    especificacion.loader.exec_module(modulo)
+    return modulo
+
+
+def ejecutar_con_perfil(funcion, cprofile=None, memoria=False, mostrar=20):
+    """Ejecuta una función con cProfile (volcado en `cprofile`) y/o tracemalloc"""
+    if memoria:
+        import tracemalloc
+        tracemalloc.start(10)
+    perfil = None
+    if cprofile:
+        import cProfile
+        perfil = cProfile.Profile()
+        perfil.enable()
+    try:
+        return funcion()
+    finally:
+        if perfil is not None:
+            perfil.disable()
+        if memoria:
+            # La instantánea va antes del informe de cProfile, sin las asignaciones de los perfiladores
+            _, pico = tracemalloc.get_traced_memory()
+            instantanea = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '*/cProfile.py'),
+                tracemalloc.Filter(False, '*/pstats.py'),
+            ])
+            tracemalloc.stop()
+            print(f"\n💾 Pico de memoria de Python: {pico / (1024 * 1024):.1f} MB; líneas que más retienen:",
+                  file=sys.stderr)
+            for estadistica in instantanea.statistics('lineno')[:mostrar]:
+                print(f"  {estadistica}", file=sys.stderr)
+        if perfil is not None:
+            import pstats
+            perfil.dump_stats(cprofile)
+            print(f"\n📊 Perfil guardado en {cprofile} (por tiempo acumulado):", file=sys.stderr)
+            pstats.Stats(perfil, stream=sys.stderr).sort_stats('cumulative').print_stats(mostrar)
+
+
+def main():
+    argumentos = sys.argv[1:]
+    opciones = {'--metricas': None, '--cprofile': None}
+    memoria = False
+    # Las opciones propias van antes del script; lo que sigue es del script
+    while argumentos and argumentos[0].startswith('--'):
+        if argumentos[0] == '--tracemalloc':
+            memoria = True
+            argumentos = argumentos[1:]
+        elif argumentos[0] in opciones and len(argumentos) > 1:
+            opciones[argumentos[0]] = argumentos[1]
+            argumentos = argumentos[2:]
+        else:
+            break
+
+    if not argumentos or not argumentos[0].endswith('.py'):
+        print(__doc__.split('\n\n')[1].strip())
+        return
+
+    script = argumentos[0]
+    sys.argv = argumentos
+    modulo = cargar_script(script)
+    if not hasattr(modulo, 'main'):
+        print(f"❌ {script} no tiene main()")
+        sys.exit(1)
+
+    instrumentacion = Instrumentacion(opciones['--metricas'])
+    instrumentacion.instrumentar_modulo(modulo)
+    json.dump = instrumentacion.envolver('json.dump', json.dump)  # volcado de resultados
+    try:
+        ejecutar_con_perfil(modulo.main, opciones['--cprofile'], memoria)
+    finally:
+        instrumentacion.cerrar()
+        if opciones['--metricas']:
+            print(f"📈 Métricas en {opciones['--metricas']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estadística de n-gramas y colocaciones del léxico musical en memoria acotada
+Cuenta n-gramas (1-4) con un count-min sketch y poda de términos frecuentes,
+y calcula colocaciones (PMI y log-likelihood) alrededor de términos semilla
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import re
+import json
+import math
+import hashlib
+import operator
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from almacen_corpus import abrir_texto, listar_textos_corpus
+from duplicados_corpus import filtrar_canonicos
+
+PATRON_TOKEN = re.compile(r'[a-záéíóúüñ]+')
+
+# Palabras gramaticales que no aportan como colocados
+PALABRAS_VACIAS = {
+    'el', 'la', 'los', 'las', 'un', 'una', 'unos', 'unas', 'de', 'del', 'al',
+    'a', 'en', 'y', 'e', 'o', 'u', 'que', 'por', 'para', 'con', 'sin', 'se',
+    'su', 'sus', 'lo', 'le', 'les', 'es', 'son', 'fue', 'ha', 'han', 'como',
+    'más', 'mas', 'muy', 'pero', 'no', 'ni', 'ya', 'este', 'esta', 'estos',
+    'estas', 'ese', 'esa', 'sobre', 'entre', 'sr', 'd'
+}
+
+# Semillas por defecto: los seis temas musicales del proyecto
+SEMILLAS_POR_DEFECTO = [
+    'cuarteto', 'música de cámara', 'música instrumental', 'sonata',
+    'música sabia', 'música clásica'
+]
+
+
+def tokenizar(texto):
+    """Devuelve las palabras del texto en minúsculas"""
+    return PATRON_TOKEN.findall(texto.lower())
+
+
+def semillas_desde_patrones(patrones):
+    """Convierte patrones literales (p. ej. los de temas_musicales) en semillas"""
+    semillas = []
+    for patron in patrones:
+        termino = patron.replace(r'\b', '').replace(r'\s+', ' ').strip()
+        if not termino or re.search(r'[\[\]()?*+|\\{}.^$]', termino):
+            continue
+        if termino.lower() not in semillas:
+            semillas.append(termino.lower())
+    return semillas
+
+
+class CountMinSketch:
+    """Count-min sketch con hash estable entre procesos"""
+
+    def __init__(self, anchura=2 ** 19, profundidad=4):
+        self.anchura = anchura
+        self.profundidad = profundidad
+        self.tablas = [array('I', bytes(4 * anchura)) for _ in range(profundidad)]
+
+    def _indices(self, clave):
+        resumen = hashlib.blake2b(clave.encode('utf-8'), digest_size=4 * self.profundidad).digest()
+        return [int.from_bytes(resumen[4 * i:4 * i + 4], 'little') % self.anchura
+                for i in range(self.profundidad)]
+
+    def incrementar(self, clave, cantidad=1):
+        """Suma la cantidad y devuelve la estimación actualizada"""
+        estimacion = None
+        for tabla, indice in zip(self.tablas, self._indices(clave)):
+            tabla[indice] += cantidad
+            if estimacion is None or tabla[indice] < estimacion:
+                estimacion = tabla[indice]
+        return estimacion
+
+    def estimar(self, clave):
+        """Estimación (cota superior) de la frecuencia de la clave"""
+        return min(tabla[indice] for tabla, indice in zip(self.tablas, self._indices(clave)))
+
+    def fusionar(self, otro):
+        """Suma otro sketch de las mismas dimensiones"""
+        if (otro.anchura, otro.profundidad) != (self.anchura, self.profundidad):
+            raise ValueError("Los sketches deben tener las mismas dimensiones")
+        for i, (tabla, tabla_otra) in enumerate(zip(self.tablas, otro.tablas)):
+            self.tablas[i] = array('I', map(operator.add, tabla, tabla_otra))
+
+
+class ContadorNgramas:
+    """Contador de n-gramas y colocaciones en flujo con memoria acotada"""
+
+    def __init__(self, semillas=None, n_max=4, capacidad=5000, ventana=5,
+                 anchura_sketch=2 ** 19, profundidad_sketch=4):
+        self.n_max = n_max
+        self.capacidad = capacidad
+        self.ventana = ventana
+        self.sketch = CountMinSketch(anchura_sketch, profundidad_sketch)
+        self.candidatos = {n: {} for n in range(1, n_max + 1)}
+        self.totales = Counter()
+
+        self.semillas = [tuple(tokenizar(s)) for s in (semillas or SEMILLAS_POR_DEFECTO)]
+        self.semillas = [s for s in self.semillas if s]
+        self.semillas_por_inicio = {}
+        for semilla in self.semillas:
+            self.semillas_por_inicio.setdefault(semilla[0], []).append(semilla)
+        self.long_max_semilla = max((len(s) for s in self.semillas), default=1)
+        self.frecuencia_semillas = Counter()
+        self.coocurrencias = {' '.join(s): Counter() for s in self.semillas}
+
+    def _registrar(self, n, ngrama):
+        estimacion = self.sketch.incrementar(ngrama)
+        candidatos = self.candidatos[n]
+        candidatos[ngrama] = estimacion
+        if len(candidatos) > 2 * self.capacidad:
+            self._podar(n)
+
+    def _podar(self, n):
+        """Conserva solo los candidatos más frecuentes según el sketch"""
+        candidatos = self.candidatos[n]
+        for ngrama in candidatos:
+            candidatos[ngrama] = self.sketch.estimar(ngrama)
+        mejores = sorted(candidatos.items(), key=lambda x: x[1], reverse=True)[:self.capacidad]
+        self.candidatos[n] = dict(mejores)
+
+    def _podar_coocurrencias(self):
+        limite = 2 * self.capacidad
+        for clave, contador in self.coocurrencias.items():
+            if len(contador) > limite:
+                self.coocurrencias[clave] = Counter(dict(contador.most_common(self.capacidad)))
+
+    def procesar_tokens(self, tokens):
+        """Procesa un flujo de tokens sin cargarlo entero en memoria"""
+        ultimos = deque(maxlen=self.n_max)
+        ancho_buffer = 2 * self.ventana + self.long_max_semilla
+        buffer = deque([None] * self.ventana, maxlen=ancho_buffer)
+
+        def examinar():
+            if len(buffer) < ancho_buffer:
+                return
+            centro = buffer[self.ventana]
+            if centro is None or centro not in self.semillas_por_inicio:
+                return
+            elementos = list(buffer)
+            for semilla in self.semillas_por_inicio[centro]:
+                fin = self.ventana + len(semilla)
+                if tuple(elementos[self.ventana:fin]) != semilla:
+                    continue
+                clave = ' '.join(semilla)
+                self.frecuencia_semillas[clave] += 1
+                # La propia semilla no cuenta como colocado suyo ("ópera ... ópera")
+                contexto = set(elementos[:self.ventana] + elementos[fin:fin + self.ventana]) - set(semilla)
+                for palabra in contexto:
+                    if palabra and palabra not in PALABRAS_VACIAS and len(palabra) > 2:
+                        self.coocurrencias[clave][palabra] += 1
+
+        for token in tokens:
+            ultimos.append(token)
+            for n in range(1, len(ultimos) + 1):
+                self.totales[n] += 1
+                self._registrar(n, ' '.join(list(ultimos)[-n:]))
+            buffer.append(token)
+            examinar()
+
+        for _ in range(ancho_buffer - self.ventana - 1):
+            buffer.append(None)
+            examinar()
+        self._podar_coocurrencias()
+
+    def procesar_archivo(self, ruta_archivo):
+        """Procesa un archivo de texto línea a línea"""
+        def tokens_archivo():
+            with abrir_texto(ruta_archivo) as f:
+                for linea in f:
+                    yield from tokenizar(linea)
+
+        self.procesar_tokens(tokens_archivo())
+
+    def fusionar(self, otro):
+        """Incorpora los contadores parciales de otro proceso"""
+        self.sketch.fusionar(otro.sketch)
+        self.totales.update(otro.totales)
+        for n in self.candidatos:
+            self.candidatos[n].update(otro.candidatos.get(n, {}))
+            self._podar(n)
+        self.frecuencia_semillas.update(otro.frecuencia_semillas)
+        for clave, contador in otro.coocurrencias.items():
+            self.coocurrencias.setdefault(clave, Counter()).update(contador)
+        self._podar_coocurrencias()
+
+    def ngramas_frecuentes(self, n, limite=50):
+        """Top de n-gramas de orden n con su frecuencia estimada"""
+        estimados = [(ngrama, self.sketch.estimar(ngrama)) for ngrama in self.candidatos[n]]
+        return sorted(estimados, key=lambda x: x[1], reverse=True)[:limite]
+
+    def colocaciones(self, semilla, limite=25, frecuencia_minima=3):
+        """Colocados de una semilla ordenados por log-likelihood, con su PMI"""
+        clave = ' '.join(tokenizar(semilla))
+        total = self.totales[1]
+        frecuencia_semilla = self.frecuencia_semillas[clave]
+        if not total or not frecuencia_semilla:
+            return []
+
+        resultados = []
+        for palabra, conjunta in self.coocurrencias.get(clave, {}).items():
+            if conjunta < frecuencia_minima:
+                continue
+            frecuencia_palabra = max(self.sketch.estimar(palabra), conjunta)
+            pmi = math.log2(conjunta * total / (frecuencia_semilla * frecuencia_palabra))
+            resultados.append({
+                'colocado': palabra,
+                'frecuencia_conjunta': conjunta,
+                'frecuencia_colocado': frecuencia_palabra,
+                'pmi': round(pmi, 4),
+                'log_likelihood': round(log_likelihood(conjunta, frecuencia_semilla,
+                                                       frecuencia_palabra, total), 4)
+            })
+
+        resultados.sort(key=lambda x: x['log_likelihood'], reverse=True)
+        return resultados[:limite]
+
+    def generar_informe(self, limite=50):
+        """Resumen serializable de n-gramas y colocaciones"""
+        return {
+            'totales_por_orden': {str(n): self.totales[n] for n in sorted(self.totales)},
+            'ngramas': {str(n): self.ngramas_frecuentes(n, limite) for n in self.candidatos},
+            'semillas': dict(self.frecuencia_semillas),
+            'colocaciones': {clave: self.colocaciones(clave) for clave in self.coocurrencias}
+        }
+
+
+def log_likelihood(k11, frecuencia_a, frecuencia_b, total):
+    """Estadístico G² de Dunning para la tabla de contingencia 2x2"""
+    k12 = max(frecuencia_a - k11, 0)
+    k21 = max(frecuencia_b - k11, 0)
+    k22 = max(total - k11 - k12 - k21, 0)
+
+    def entropia(*valores):
+        suma = sum(valores)
+        return sum(v * math.log(v / suma) for v in valores if v > 0)
+
+    return 2 * (entropia(k11, k12, k21, k22)
+                - entropia(k11 + k12, k21 + k22)
+                - entropia(k11 + k21, k12 + k22))
+
+
+def _procesar_lote(argumentos):
+    """Función de trabajo: cuenta un lote de archivos en un proceso aparte"""
+    rutas, parametros = argumentos
+    contador = ContadorNgramas(**parametros)
+    for ruta in rutas:
+        try:
+            contador.procesar_archivo(ruta)
+        except Exception as e:
+            print(f"Error procesando {ruta}: {e}")
+    return contador
+
+
+def contar_en_paralelo(rutas, procesos=None, archivos_por_lote=25, **parametros):
+    """Reparte los archivos entre procesos y fusiona los contadores parciales"""
+    rutas = sorted(str(r) for r in rutas)
+    lotes = [rutas[i:i + archivos_por_lote] for i in range(0, len(rutas), archivos_por_lote)]
+    contador = ContadorNgramas(**parametros)
+    if not lotes:
+        return contador
+
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        for i, parcial in enumerate(ejecutor.map(_procesar_lote, [(lote, parametros) for lote in lotes]), 1):
+            contador.fusionar(parcial)
+            print(f"Lotes fusionados: {i}/{len(lotes)}")
+
+    return contador
+
+
+def contar_en_flujo(rutas, archivo_salida, **parametros):
+    """Cuenta los textos a medida que llegan (p. ej. desde la extracción) y guarda el informe"""
+    contador = ContadorNgramas(**parametros)
+    procesados = 0
+    for ruta in rutas:
+        if not str(ruta).endswith('.txt'):
+            continue
+        try:
+            contador.procesar_archivo(ruta)
+            procesados += 1
+        except Exception as e:
+            print(f"Error procesando {ruta}: {e}")
+    print(f"N-gramas contados en {procesados} archivos")
+    guardar_informe(contador.generar_informe(), archivo_salida)
+    return contador
+
+
+def listar_textos(directorio):
+    """Todos los .txt de un directorio, recursivamente (también si está empaquetado)"""
+    return listar_textos_corpus(directorio)
+
+
+def guardar_informe(informe, archivo_salida):
+    """Guarda el informe en JSON"""
+    with open(archivo_salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en: {archivo_salida}")
+
+
+def main():
+    directorio = "/Users/maria/Desktop/REVISTAS TXT PARA WEBS ESTADÍSTICAS"
+    archivo_salida = "ngramas_colocaciones.json"
+
+    rutas = filtrar_canonicos(listar_textos(directorio))
+    print(f"Contando n-gramas en {len(rutas)} archivos...")
+
+    contador = contar_en_paralelo(rutas, semillas=SEMILLAS_POR_DEFECTO)
+    informe = contador.generar_informe()
+    guardar_informe(informe, archivo_salida)
+
+    print("\nCOLOCACIONES POR SEMILLA (log-likelihood):")
+    for semilla, colocados in informe['colocaciones'].items():
+        principales = ', '.join(c['colocado'] for c in colocados[:8])
+        print(f"- {semilla} ({informe['semillas'].get(semilla, 0)}): {principales}")
+
+
+if __name__ == "__main__":
+    main()
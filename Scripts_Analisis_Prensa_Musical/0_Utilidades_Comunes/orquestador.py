@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orquestador del flujo extracción → análisis → web
+Declara las etapas de las cuatro carpetas numeradas como un grafo con sus
+entradas y salidas: las dependencias salen de qué etapa produce lo que otra
+lee, las etapas independientes se ejecutan a la vez, una etapa en flujo
+entrega los documentos a su consumidora a medida que los produce, y solo se
+repiten las etapas cuyas entradas o código cambiaron desde la última ejecución
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import sys
+import json
+import queue
+import hashlib
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from catalogo_corpus import huella_archivo
+
+RAIZ_SCRIPTS = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DIRECTORIO_TRABAJO = '/Users/maria'
+ARCHIVO_ESTADO = '.estado_flujo.json'
+DIR_REGISTROS = 'registros_flujo'
+
+_FIN = object()
+
+CORRECTAS = ('ejecutada', 'vigente')
+
+
+def huella_ruta(ruta):
+    """Huella de una entrada: contenido si es un archivo, listado con tamaños y fechas si es un directorio"""
+    if os.path.isfile(ruta):
+        return huella_archivo(ruta)
+    if os.path.isdir(ruta):
+        sha = hashlib.sha1()
+        for raiz, directorios, archivos in os.walk(ruta):
+            directorios.sort()
+            for archivo in sorted(archivos):
+                if archivo.startswith('.'):
+                    continue
+                estado = os.stat(os.path.join(raiz, archivo))
+                relativa = os.path.relpath(os.path.join(raiz, archivo), ruta)
+                sha.update(f"{relativa}\0{estado.st_size}\0{estado.st_mtime_ns}\n".encode('utf-8'))
+        return sha.hexdigest()
+    return None
+
+
+def archivos_de(rutas):
+    """Archivos contenidos en las rutas (directorios recorridos en orden)"""
+    encontrados = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            for raiz, directorios, archivos in os.walk(ruta):
+                directorios.sort()
+                encontrados.extend(os.path.join(raiz, a) for a in sorted(archivos) if not a.startswith('.'))
+        elif os.path.exists(ruta):
+            encontrados.append(ruta)
+    return encontrados
+
+
+class Etapa:
+    """Una etapa del flujo
+
+    script: ruta (relativa a Scripts_Analisis_Prensa_Musical) de un script que se
+        ejecuta en un proceso aparte, en el directorio de trabajo.
+    accion: función que se ejecuta en este proceso. Si la etapa es productora en
+        flujo es un generador que devuelve las rutas que va escribiendo; si
+        `consume` nombra a otra etapa, recibe un iterable con esas rutas.
+        Recibe después sus salidas ya resueltas contra el directorio de
+        trabajo, como las ve un script, sin depender del directorio actual.
+    entradas/salidas: archivos o directorios (relativos al directorio de trabajo).
+    codigo: archivos cuyo contenido forma parte de la huella de la etapa
+        (por defecto, el script).
+    """
+
+    def __init__(self, nombre, script=None, accion=None, entradas=(), salidas=(), consume=None,
+                 argumentos=(), codigo=None):
+        if (script is None) == (accion is None):
+            raise ValueError(f"La etapa {nombre} necesita un script o una acción (no ambos)")
+        self.nombre = nombre
+        self.script = script
+        self.accion = accion
+        self.entradas = list(entradas)
+        self.salidas = list(salidas)
+        self.consume = consume
+        self.argumentos = list(argumentos)
+        self.codigo = list(codigo) if codigo is not None else ([script] if script else [])
+
+    def huella_definicion(self):
+        sha = hashlib.sha1(json.dumps([self.script, self.argumentos, self.entradas, self.salidas],
+                                      ensure_ascii=False).encode('utf-8'))
+        for archivo in self.codigo:
+            ruta = os.path.join(RAIZ_SCRIPTS, archivo)
+            sha.update((huella_archivo(ruta) if os.path.exists(ruta) else archivo).encode('utf-8'))
+        return sha.hexdigest()
+
+
+class Orquestador:
+    """Planifica y ejecuta las etapas en paralelo respetando sus dependencias"""
+
+    def __init__(self, etapas, directorio=DIRECTORIO_TRABAJO, procesos=None, forzar=False):
+        self.etapas = {etapa.nombre: etapa for etapa in etapas}
+        self.directorio = os.path.abspath(directorio)
+        self.procesos = max(2, procesos or os.cpu_count() or 2)
+        self.forzar = forzar
+        self.ruta_estado = os.path.join(self.directorio, ARCHIVO_ESTADO)
+        self.estado = {}
+        if os.path.exists(self.ruta_estado):
+            with open(self.ruta_estado, 'r', encoding='utf-8') as f:
+                self.estado = json.load(f)
+
+        self.dependencias = {nombre: self._dependencias(etapa) for nombre, etapa in self.etapas.items()}
+        self.orden = self._orden_topologico()
+        self.resultados = {}
+        self.colas = {}
+
+    def ruta(self, ruta):
+        return os.path.normpath(os.path.join(self.directorio, ruta))
+
+    def _dependencias(self, etapa):
+        """Etapas que producen alguna entrada de esta (o la que alimenta su flujo)"""
+        dependencias = set()
+        if etapa.consume:
+            if etapa.consume not in self.etapas:
+                raise ValueError(f"{etapa.nombre} consume una etapa inexistente: {etapa.consume}")
+            dependencias.add(etapa.consume)
+        for entrada in map(self.ruta, etapa.entradas):
+            for otra in self.etapas.values():
+                if otra is etapa:
+                    continue
+                for salida in map(self.ruta, otra.salidas):
+                    if entrada == salida or entrada.startswith(salida + os.sep):
+                        dependencias.add(otra.nombre)
+        return dependencias
+
+    def _orden_topologico(self):
+        orden, visitando, visitadas = [], set(), set()
+
+        def visitar(nombre):
+            if nombre in visitadas:
+                return
+            if nombre in visitando:
+                raise ValueError(f"Ciclo en el flujo en la etapa {nombre}")
+            visitando.add(nombre)
+            for dependencia in sorted(self.dependencias[nombre]):
+                visitar(dependencia)
+            visitando.discard(nombre)
+            visitadas.add(nombre)
+            orden.append(nombre)
+
+        for nombre in self.etapas:
+            visitar(nombre)
+        return orden
+
+    def seleccionar(self, objetivos=None):
+        """Las etapas pedidas y todas aquellas de las que dependen"""
+        if not objetivos:
+            return list(self.orden)
+        seleccion = set()
+        pendientes = list(objetivos)
+        while pendientes:
+            nombre = pendientes.pop()
+            if nombre not in self.etapas:
+                raise ValueError(f"Etapa desconocida: {nombre}")
+            if nombre not in seleccion:
+                seleccion.add(nombre)
+                pendientes.extend(self.dependencias[nombre])
+        return [nombre for nombre in self.orden if nombre in seleccion]
+
+    def huellas_entradas(self, etapa):
+        return {entrada: huella_ruta(self.ruta(entrada)) for entrada in etapa.entradas}
+
+    def vigente(self, etapa):
+        """True si ni el código ni las entradas cambiaron y las salidas siguen en disco"""
+        if self.forzar:
+            return False
+        anterior = self.estado.get(etapa.nombre)
+        return bool(anterior
+                    and anterior['definicion'] == etapa.huella_definicion()
+                    and anterior['entradas'] == self.huellas_entradas(etapa)
+                    and all(os.path.exists(self.ruta(salida)) for salida in etapa.salidas))
+
+    def _registrar(self, etapa):
+        self.estado[etapa.nombre] = {
+            'definicion': etapa.huella_definicion(),
+            'entradas': self.huellas_entradas(etapa),
+            'fecha': datetime.now().isoformat()
+        }
+
+    def _ejecutar_script(self, etapa):
+        os.makedirs(os.path.join(self.directorio, DIR_REGISTROS), exist_ok=True)
+        registro = os.path.join(self.directorio, DIR_REGISTROS, f"{etapa.nombre}.log")
+        with open(registro, 'w', encoding='utf-8') as salida:
+            proceso = subprocess.run([sys.executable, os.path.join(RAIZ_SCRIPTS, etapa.script), *etapa.argumentos],
+                                     cwd=self.directorio, stdout=salida, stderr=subprocess.STDOUT)
+        if proceso.returncode != 0:
+            raise RuntimeError(f"código de salida {proceso.returncode} (ver {registro})")
+
+    def _ejecutar(self, etapa, documentos=None):
+        """Cuerpo de una etapa (se ejecuta en un hilo del grupo)"""
+        if etapa.script:
+            self._ejecutar_script(etapa)
+            return
+        salidas = [self.ruta(salida) for salida in etapa.salidas]
+        if etapa.consume:
+            etapa.accion(documentos, *salidas)
+        elif etapa.nombre in self.colas:
+            # Productora en flujo: cada ruta llega a las consumidoras en cuanto existe
+            try:
+                for ruta in etapa.accion(*salidas):
+                    for cola in self.colas[etapa.nombre]:
+                        cola.put(ruta)
+            finally:
+                for cola in self.colas[etapa.nombre]:
+                    cola.put(_FIN)
+        else:
+            resultado = etapa.accion(*salidas)
+            # Una productora sin consumidoras seleccionadas: basta con agotar el generador
+            if hasattr(resultado, '__next__'):
+                for _ in resultado:
+                    pass
+
+    @staticmethod
+    def _iterar_cola(cola):
+        while True:
+            ruta = cola.get()
+            if ruta is _FIN:
+                return
+            yield ruta
+
+    def ejecutar(self, objetivos=None):
+        """Ejecuta las etapas seleccionadas; devuelve {etapa: resultado}"""
+        seleccion = self.seleccionar(objetivos)
+        pendientes = list(seleccion)
+        consumidoras = {nombre: [c for c in seleccion if self.etapas[c].consume == nombre] for nombre in seleccion}
+        en_curso = {}
+        futuros = {}
+        print(f"🚦 Flujo: {len(seleccion)} etapas, hasta {self.procesos} a la vez")
+
+        with ThreadPoolExecutor(max_workers=self.procesos) as ejecutor:
+            while pendientes or en_curso:
+                for nombre in list(pendientes):
+                    etapa = self.etapas[nombre]
+                    previas = self.dependencias[nombre] & set(seleccion)
+                    if any(self.resultados.get(p) in ('fallida', 'bloqueada') for p in previas):
+                        self.resultados[nombre] = 'bloqueada'
+                        pendientes.remove(nombre)
+                        print(f"  ⛔ {nombre}: bloqueada por una etapa anterior")
+                        continue
+
+                    # Una consumidora arranca en cuanto arranca su productora
+                    productora_en_curso = etapa.consume in en_curso.values()
+                    listas = all(self.resultados.get(p) in CORRECTAS or (p == etapa.consume and productora_en_curso)
+                                 for p in previas)
+                    if not listas:
+                        continue
+                    pendientes.remove(nombre)
+
+                    if not productora_en_curso and self.vigente(etapa):
+                        self.resultados[nombre] = 'vigente'
+                        print(f"  ✅ {nombre}: al día")
+                        continue
+
+                    documentos = None
+                    if etapa.consume:
+                        if productora_en_curso:
+                            documentos = self._iterar_cola(self.colas[etapa.consume][
+                                consumidoras[etapa.consume].index(nombre)])
+                        else:
+                            documentos = iter(archivos_de([self.ruta(s) for s in self.etapas[etapa.consume].salidas]))
+                    elif consumidoras.get(nombre):
+                        self.colas[nombre] = [queue.Queue() for _ in consumidoras[nombre]]
+
+                    print(f"  ▶️  {nombre}")
+                    futuros[nombre] = ejecutor.submit(self._ejecutar, etapa, documentos)
+                    en_curso[futuros[nombre]] = nombre
+
+                if not en_curso:
+                    break
+                terminadas, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminadas:
+                    nombre = en_curso.pop(futuro)
+                    etapa = self.etapas[nombre]
+                    error = futuro.exception()
+                    # Una consumidora cuya productora falló solo ha visto parte de los documentos
+                    if not error and etapa.consume in futuros and futuros[etapa.consume].exception():
+                        error = RuntimeError(f"la etapa {etapa.consume} falló")
+                    if error:
+                        self.resultados[nombre] = 'fallida'
+                        print(f"  ❌ {nombre}: {error}")
+                    else:
+                        self.resultados[nombre] = 'ejecutada'
+                        self._registrar(etapa)
+                        print(f"  ✔️  {nombre}")
+
+        for nombre in pendientes:
+            self.resultados[nombre] = 'bloqueada'
+        self.guardar()
+        return {nombre: self.resultados.get(nombre) for nombre in seleccion}
+
+    def guardar(self):
+        with open(self.ruta_estado, 'w', encoding='utf-8') as f:
+            json.dump(self.estado, f, ensure_ascii=False, indent=2)
+
+
+# Etapas con acción en este proceso (las importaciones, al ejecutarse)
+DIR_PDFS_BIBLIOGRAFIA = "/Users/maria/Downloads/BIBLIOGRAFÍA. Historiografía-20250929"
+DIR_TXT_BIBLIOGRAFIA = "/Users/maria/Downloads/textos_extraidos_bibliografia"
+
+
+def _extraer_bibliografia(directorio_textos):
+    sys.path.insert(0, os.path.join(RAIZ_SCRIPTS, '3_Procesamiento_Extraccion'))
+    from extraer_pdfs import extraer_en_flujo
+    return extraer_en_flujo(DIR_PDFS_BIBLIOGRAFIA, directorio_textos)
+
+
+def _ngramas_bibliografia(rutas, ruta_salida):
+    from ngramas_colocaciones import contar_en_flujo
+    contar_en_flujo(rutas, ruta_salida)
+
+
+def flujo_por_defecto():
+    """Etapas del proyecto con sus entradas y salidas"""
+    dir_el_sol = "/Users/maria/Desktop/txt- el sol (con vertex)"
+    dir_espana = "/Users/maria/Desktop/Música en la revista ESPAÑA/REVISTA ESPAÑA en TXT SOLO MÚSICA"
+    dir_debate = "/Users/maria/Desktop/EL DEBATE TXT"
+    dir_iberia = "/Users/maria/Desktop/FUENTES PARA CAROLINA/IBERIA/RESULTADOS La Iberia Musical TXT"
+    datos_espana = "/Users/maria/datos_revista_espana_musical.json"
+    contenidos_espana = "/Users/maria/datos_revista_espana_musical_contenidos"
+
+    return [
+        # 3. Extracción en flujo: los n-gramas se cuentan según salen los textos
+        Etapa('extraccion_bibliografia', accion=_extraer_bibliografia,
+              entradas=[DIR_PDFS_BIBLIOGRAFIA], salidas=[DIR_TXT_BIBLIOGRAFIA],
+              codigo=['3_Procesamiento_Extraccion/extraer_pdfs.py']),
+        Etapa('ngramas_bibliografia', accion=_ngramas_bibliografia, consume='extraccion_bibliografia',
+              entradas=[DIR_TXT_BIBLIOGRAFIA], salidas=['ngramas_bibliografia.json'],
+              codigo=['0_Utilidades_Comunes/ngramas_colocaciones.py']),
+
+        # 1. Revistas
+        Etapa('analisis_revista_espana', script='1_Analisis_Revistas_Musicales/analizador_revista_espana.py',
+              entradas=[dir_espana], salidas=[datos_espana, contenidos_espana]),
+
+        # 2. Prensa
+        Etapa('analisis_el_sol', script='2_Analisis_Prensa/analizador_el_sol.py',
+              entradas=[dir_el_sol], salidas=['resultados_el_sol.json', 'reporte_el_sol.txt']),
+        Etapa('analisis_avanzado_el_sol', script='2_Analisis_Prensa/analisis_avanzado.py',
+              entradas=[dir_el_sol, 'resultados_el_sol.json'], salidas=['analisis_avanzado_el_sol.txt']),
+        Etapa('analisis_el_debate', script='2_Analisis_Prensa/procesador_el_debate.py',
+              entradas=[dir_debate], salidas=['el_debate_data.json', 'el_debate_shards']),
+        Etapa('analisis_iberia_musical', script='2_Analisis_Prensa/analizador_iberia_musical.py',
+              entradas=[dir_iberia], salidas=['analisis_iberia_musical.json']),
+
+        # 3. Datos derivados
+        Etapa('datos_completos_el_sol', script='3_Procesamiento_Extraccion/extractor_datos_completo.py',
+              entradas=[dir_el_sol, 'resultados_el_sol.json'], salidas=['datos_completos_el_sol.json']),
+
+        # 4. Web
+        Etapa('web_el_sol', script='4_Generadores_Web/generador_web.py',
+              entradas=['resultados_el_sol.json'], salidas=['analisis_musical_el_sol.html'],
+              codigo=['4_Generadores_Web/generador_web.py', '4_Generadores_Web/construccion_incremental.py']),
+        Etapa('web_revista_espana', script='4_Generadores_Web/generador_web_revista_espana.py',
+              entradas=[datos_espana, contenidos_espana], salidas=['/Users/maria/revista_espana_musical.html'],
+              codigo=['4_Generadores_Web/generador_web_revista_espana.py',
+                      '4_Generadores_Web/construccion_incremental.py']),
+    ]
+
+
+def main():
+    argumentos = sys.argv[1:]
+    forzar = '--forzar' in argumentos
+    procesos = None
+    if '--procesos' in argumentos:
+        posicion = argumentos.index('--procesos')
+        procesos = int(argumentos[posicion + 1])
+        del argumentos[posicion:posicion + 2]
+    objetivos = [a for a in argumentos if not a.startswith('--')]
+
+    orquestador = Orquestador(flujo_por_defecto(), procesos=procesos, forzar=forzar)
+    if '--lista' in argumentos:
+        for nombre in orquestador.orden:
+            previas = ', '.join(sorted(orquestador.dependencias[nombre])) or '-'
+            print(f"{nombre}  ← {previas}")
+        return
+
+    resultados = orquestador.ejecutar(objetivos)
+    print("\nResumen:")
+    for nombre, resultado in resultados.items():
+        print(f"  {nombre}: {resultado}")
+
+
+if __name__ == "__main__":
+    main()
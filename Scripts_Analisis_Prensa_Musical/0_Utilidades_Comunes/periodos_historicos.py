@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Periodización histórica compartida por los analizadores
+Cada periodización precalcula una tabla año → período para 1788-2024, así que
+clasificar es una consulta (vectorial sobre columnas de años con NumPy) en vez
+de una escalera de if/elif o un recorrido de rangos por documento. Los
+recuentos de términos o entidades por período salen de una sola reducción
+agrupada sobre los pares (documento, término)
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import re
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # Sin NumPy las mismas consultas se hacen con listas
+    np = None
+
+AÑO_MINIMO = 1788
+AÑO_MAXIMO = 2024
+
+PATRON_AÑO = re.compile(r'(\d{4})')
+
+
+def año_de_fecha(texto):
+    """Primer año de cuatro cifras de una fecha en texto (None si no hay)"""
+    match = PATRON_AÑO.search(texto or '')
+    return int(match.group(1)) if match else None
+
+
+class Periodizacion:
+    """Tramos (inicio, fin, nombre) con la tabla de consulta año → índice de período
+
+    abierta=True extiende el primer y el último tramo más allá de 1788-2024,
+    como una escalera de if/elif con un else final; si no, esos años quedan
+    sin período.
+    """
+
+    def __init__(self, tramos, abierta=False):
+        self.tramos = list(tramos)
+        self.nombres = [nombre for _, _, nombre in self.tramos]
+        self.abierta = abierta
+
+        tabla = [-1] * (AÑO_MAXIMO - AÑO_MINIMO + 1)
+        for indice, (inicio, fin, _) in enumerate(self.tramos):
+            for año in range(max(inicio, AÑO_MINIMO), min(fin, AÑO_MAXIMO) + 1):
+                if tabla[año - AÑO_MINIMO] == -1:
+                    tabla[año - AÑO_MINIMO] = indice
+        self.tabla = np.array(tabla, dtype=np.int16) if np is not None else tabla
+
+    def indice(self, año):
+        """Índice del período de un año (-1 si no tiene o el año falta)"""
+        if not año:
+            return -1
+        if self.abierta:
+            año = min(max(año, AÑO_MINIMO), AÑO_MAXIMO)
+        elif not AÑO_MINIMO <= año <= AÑO_MAXIMO:
+            return -1
+        return int(self.tabla[año - AÑO_MINIMO])
+
+    def periodo(self, año, sin_periodo=None):
+        indice = self.indice(año)
+        return self.nombres[indice] if indice >= 0 else sin_periodo
+
+    def periodo_de_fecha(self, texto, sin_periodo=None):
+        return self.periodo(año_de_fecha(texto), sin_periodo)
+
+    def indices(self, años):
+        """Índices de período de una columna de años (None o 0: -1)"""
+        if np is None:
+            return [self.indice(año) for año in años]
+        if not isinstance(años, np.ndarray):
+            años = np.array([año or 0 for año in años], dtype=np.int64)
+        años = años.astype(np.int64, copy=False)
+        if self.abierta:
+            resultado = self.tabla[np.clip(años, AÑO_MINIMO, AÑO_MAXIMO) - AÑO_MINIMO].astype(np.int64)
+        else:
+            dentro = (años >= AÑO_MINIMO) & (años <= AÑO_MAXIMO)
+            resultado = np.full(len(años), -1, dtype=np.int64)
+            resultado[dentro] = self.tabla[años[dentro] - AÑO_MINIMO]
+        resultado[años == 0] = -1
+        return resultado
+
+    def agrupar(self, años, elementos):
+        """{período: [elementos]} con todos los períodos en orden, aunque estén vacíos"""
+        grupos = {nombre: [] for nombre in self.nombres}
+        for indice, elemento in zip(self.indices(años), elementos):
+            if indice >= 0:
+                grupos[self.nombres[indice]].append(elemento)
+        return grupos
+
+    def acumular(self, años, recuentos):
+        """Suma los recuentos (términos o entidades → frecuencia) de cada período
+
+        Una sola reducción agrupada sobre los pares (documento, término). Los
+        períodos y sus términos quedan en orden de primera aparición, igual que
+        acumulando a mano en un defaultdict(Counter), así que most_common()
+        desempata igual.
+        """
+        indices = self.indices(años)
+        if np is None:
+            acumulado = {}
+            for indice, recuento in zip(indices, recuentos):
+                if indice >= 0:
+                    for termino, frecuencia in recuento.items():
+                        acumulado.setdefault(self.nombres[indice], Counter())[termino] += frecuencia
+            return acumulado
+
+        # Pares (período, término, frecuencia) en el orden en que se recorren
+        vocabulario = {}
+        periodos_par, terminos_par, frecuencias = [], [], []
+        for indice, recuento in zip(indices.tolist(), recuentos):
+            if indice < 0:
+                continue
+            for termino, frecuencia in recuento.items():
+                periodos_par.append(indice)
+                terminos_par.append(vocabulario.setdefault(termino, len(vocabulario)))
+                frecuencias.append(frecuencia)
+        if not frecuencias:
+            return {}
+
+        claves = np.array(periodos_par, dtype=np.int64) * len(vocabulario) + np.array(terminos_par, dtype=np.int64)
+        unicas, primera, inversa = np.unique(claves, return_index=True, return_inverse=True)
+        sumas = np.zeros(len(unicas), dtype=np.int64)
+        np.add.at(sumas, inversa, np.array(frecuencias, dtype=np.int64))
+
+        terminos = list(vocabulario)
+        acumulado = {}
+        for posicion in np.argsort(primera, kind='stable').tolist():
+            indice, termino = divmod(int(unicas[posicion]), len(vocabulario))
+            acumulado.setdefault(self.nombres[indice], Counter())[terminos[termino]] = int(sumas[posicion])
+        return acumulado
+
+    def mas_frecuentes(self, años, recuentos, n=10):
+        """Los n términos más frecuentes de cada período"""
+        return {periodo: contador.most_common(n) for periodo, contador in self.acumular(años, recuentos).items()}
+
+
+# Grandes etapas de la prensa musical española (revistas de 1842 a 2024)
+PERIODOS_PRENSA_MUSICAL = Periodizacion([
+    (AÑO_MINIMO, 1870, 'Romántico Temprano (1842-1870)'),
+    (1871, 1900, 'Romántico Tardío (1870-1900)'),
+    (1901, 1930, 'Modernista (1900-1930)'),
+    (1931, 1960, 'Vanguardia y Guerra Civil (1930-1960)'),
+    (1961, 1990, 'Desarrollismo y Transición (1960-1990)'),
+    (1991, AÑO_MAXIMO, 'Democracia y Era Digital (1990-2024)')
+], abierta=True)
+
+# Revista ESPAÑA (1915-1924)
+PERIODOS_REVISTA_ESPANA = Periodizacion([
+    (1915, 1918, "Primera Guerra Mundial"),
+    (1919, 1923, "Crisis de posguerra"),
+    (1924, 1924, "Dictadura de Primo de Rivera")
+])
+
+# Historia política de España, para los análisis de prensa diaria
+PERIODOS_HISTORIA_ESPANA = Periodizacion([
+    (AÑO_MINIMO, 1807, 'Antiguo Régimen'),
+    (1808, 1813, 'Guerra de la Independencia'),
+    (1814, 1833, 'Reinado de Fernando VII'),
+    (1834, 1867, 'Reinado de Isabel II'),
+    (1868, 1874, 'Sexenio Democrático'),
+    (1875, 1922, 'Restauración'),
+    (1923, 1930, 'Dictadura de Primo de Rivera'),
+    (1931, 1935, 'Segunda República'),
+    (1936, 1939, 'Guerra Civil'),
+    (1940, 1975, 'Franquismo'),
+    (1976, 1981, 'Transición'),
+    (1982, AÑO_MAXIMO, 'Democracia')
+])
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registro de patrones precompilados compartido por los analizadores
+Cada detector se compila una sola vez, al importar el módulo que lo registra,
+en lugar de construirse dentro de los métodos para cada archivo. Los
+procesos de un pool lo heredan o lo vuelven a registrar al importar, y al
+serializarse viaja por su definición. Las listas de términos literales
+(compositores, instrumentos, temas...) se funden en una sola alternancia con
+los prefijos comunes factorizados (un trie), que recorre el texto una vez y
+da exactamente los mismos recuentos que buscar cada término por separado.
+Con REGISTRO.medir (o LEXIMUS_MEDIR_PATRONES=1) cada detector acumula
+llamadas, coincidencias y tiempo. Los detectores aceptan también un
+DocumentoMapeado (documentos_grandes.py): buscan sobre sus bytes con la
+expresión traducida y dan posiciones en bytes
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import re
+import time
+from collections import Counter
+
+from documentos_grandes import (DocumentoMapeado, CoincidenciaDecodificada, expresion_bytes,
+                                hay_limite_bytes, clase_utf8, variantes_mayusculas)
+
+# Letras cuya equivalencia sin mayúsculas es uno a uno también para `re`
+# (sin ſ, K de Kelvin, µ, ß, ı...); los términos con otras letras se buscan aparte
+LETRAS_SEGURAS = set('abcdefghijklmnopqrstuvwxyzàáâãäåæçèéêëìíîïñòóôõöøùúûüýþÿœ')
+
+
+def _es_palabra(caracter):
+    """Mismo criterio que \\b en los patrones str de `re`"""
+    return caracter.isalnum() or caracter == '_'
+
+
+def _hay_limite(texto, posicion):
+    izquierda = posicion > 0 and _es_palabra(texto[posicion - 1])
+    derecha = posicion < len(texto) and _es_palabra(texto[posicion])
+    return izquierda != derecha
+
+
+def alternancia_trie(claves, escapar=re.escape):
+    """Expresión que reconoce cualquiera de las claves, con los prefijos comunes
+    factorizados y, en cada punto, la continuación más larga antes que la corta"""
+    trie = {}
+    for clave in claves:
+        nodo = trie
+        for caracter in clave:
+            nodo = nodo.setdefault(caracter, {})
+        nodo[''] = {}
+
+    def expresion(nodo):
+        ramas = [escapar(caracter) + expresion(hijo) for caracter, hijo in nodo.items() if caracter]
+        if not ramas:
+            return ''
+        if len(ramas) == 1 and '' not in nodo:
+            return ramas[0]
+        return '(?:' + '|'.join(ramas) + ')' + ('?' if '' in nodo else '')
+
+    return expresion(trie)
+
+
+class Detector:
+    """Expresión regular registrada: la interfaz de re.Pattern más estadísticas"""
+
+    def __init__(self, registro, nombre, expresion, flags=0):
+        self.registro = registro
+        self.nombre = nombre
+        self.expresion = expresion
+        self.flags = flags
+        self.compilado = re.compile(expresion, flags)
+        self.llamadas = 0
+        self.coincidencias = 0
+        self.segundos = 0.0
+
+    def definicion(self):
+        return ('patron', self.expresion, self.flags)
+
+    def __reduce__(self):
+        return (_reconstruir, (self.nombre,) + self.definicion())
+
+    def _anotar(self, inicio, coincidencias):
+        self.llamadas += 1
+        self.coincidencias += coincidencias
+        self.segundos += time.perf_counter() - inicio
+        if self.registro.observador:
+            self.registro.observador(coincidencias)
+
+    def _finditer(self, texto, *argumentos):
+        if isinstance(texto, DocumentoMapeado):
+            coincidencias = expresion_bytes(self.expresion, self.flags).finditer(texto.datos, *argumentos)
+            return map(CoincidenciaDecodificada, coincidencias)
+        return self.compilado.finditer(texto, *argumentos)
+
+    def _findall(self, texto, *argumentos):
+        if isinstance(texto, DocumentoMapeado):
+            grupos = self.compilado.groups
+            return [c.group(0) if not grupos else c.group(1) if grupos == 1 else c.groups('')
+                    for c in self._finditer(texto, *argumentos)]
+        return self.compilado.findall(texto, *argumentos)
+
+    def _search(self, texto, *argumentos):
+        if isinstance(texto, DocumentoMapeado):
+            coincidencia = expresion_bytes(self.expresion, self.flags).search(texto.datos, *argumentos)
+            return CoincidenciaDecodificada(coincidencia) if coincidencia else None
+        return self.compilado.search(texto, *argumentos)
+
+    def finditer(self, texto, *argumentos):
+        if not self.registro.medir:
+            return self._finditer(texto, *argumentos)
+        inicio = time.perf_counter()
+        coincidencias = list(self._finditer(texto, *argumentos))
+        self._anotar(inicio, len(coincidencias))
+        return iter(coincidencias)
+
+    def findall(self, texto, *argumentos):
+        if not self.registro.medir:
+            return self._findall(texto, *argumentos)
+        inicio = time.perf_counter()
+        coincidencias = self._findall(texto, *argumentos)
+        self._anotar(inicio, len(coincidencias))
+        return coincidencias
+
+    def search(self, texto, *argumentos):
+        if not self.registro.medir:
+            return self._search(texto, *argumentos)
+        inicio = time.perf_counter()
+        coincidencia = self._search(texto, *argumentos)
+        self._anotar(inicio, coincidencia is not None)
+        return coincidencia
+
+    def sub(self, reemplazo, texto, count=0):
+        if not self.registro.medir:
+            return self.compilado.sub(reemplazo, texto, count)
+        inicio = time.perf_counter()
+        resultado, sustituciones = self.compilado.subn(reemplazo, texto, count)
+        self._anotar(inicio, sustituciones)
+        return resultado
+
+    def estadisticas(self):
+        return {'detector': self.nombre, 'llamadas': self.llamadas, 'coincidencias': self.coincidencias,
+                'ms': round(self.segundos * 1000, 3)}
+
+
+class DetectorTerminos(Detector):
+    """Lista de términos literales buscada en una sola pasada
+
+    Para cada término, posiciones() da las mismas coincidencias que
+    re.finditer(r'\\b' + re.escape(término) + r'\\b', texto, re.IGNORECASE)
+    (sin \\b con palabras_completas=False; sin IGNORECASE con
+    ignorar_mayusculas=False), solapamientos entre términos incluidos.
+    """
+
+    def __init__(self, registro, nombre, terminos, ignorar_mayusculas=True, palabras_completas=True):
+        self.terminos = list(dict.fromkeys(t for t in terminos if t))
+        self.ignorar_mayusculas = ignorar_mayusculas
+        self.palabras_completas = palabras_completas
+        self.por_termino = Counter()
+
+        clave = str.lower if ignorar_mayusculas else (lambda termino: termino)
+        self.terminos_de_clave = {}  # clave → términos (varios si solo difieren en mayúsculas)
+        self.aparte = []
+        for termino in self.terminos:
+            if ignorar_mayusculas and any(c.isalpha() and c.lower() not in LETRAS_SEGURAS for c in termino):
+                self.aparte.append(termino)
+            else:
+                self.terminos_de_clave.setdefault(clave(termino), []).append(termino)
+        # Claves más cortas que empiezan igual: coinciden en la misma posición que la larga
+        self.prefijos = {
+            larga: [corta for corta in self.terminos_de_clave if corta != larga and larga.startswith(corta)]
+            for larga in self.terminos_de_clave
+        }
+
+        limite = r'\b' if palabras_completas else ''
+        flags = re.IGNORECASE if ignorar_mayusculas else 0
+        expresion = limite + '(?:' + alternancia_trie(self.terminos_de_clave) + ')' + limite
+        super().__init__(registro, nombre, expresion if self.terminos_de_clave else r'(?!)', flags)
+        self.patrones_aparte = {t: re.compile(limite + re.escape(t) + limite, flags) for t in self.aparte}
+        self.clave = clave
+        self._bytes = None
+
+    @staticmethod
+    def definicion_de(terminos, ignorar_mayusculas, palabras_completas):
+        return ('terminos', tuple(dict.fromkeys(t for t in terminos if t)), ignorar_mayusculas, palabras_completas)
+
+    def definicion(self):
+        return self.definicion_de(self.terminos, self.ignorar_mayusculas, self.palabras_completas)
+
+    def _claves_de(self, coincidente):
+        """Claves que reconocen el texto coincidente (caso raro: mayúsculas sin equivalencia simple)"""
+        clave = self.clave(coincidente)
+        if clave in self.terminos_de_clave:
+            return clave
+        for candidata in self.terminos_de_clave:
+            if len(candidata) == len(coincidente) and re.fullmatch(re.escape(candidata), coincidente, self.flags):
+                return candidata
+        return None
+
+    def _compilados_bytes(self):
+        """Trie y términos aparte para buscar en los bytes de un DocumentoMapeado
+
+        El trie va sin \\b: los límites se comprueban después, y como las claves
+        que coinciden en un punto son prefijos unas de otras, salen las mismas.
+        """
+        if self._bytes is None:
+            if self.ignorar_mayusculas:
+                escapar = lambda caracter: clase_utf8(variantes_mayusculas(caracter))
+            else:
+                escapar = lambda caracter: clase_utf8(caracter)
+            expresion = alternancia_trie(self.terminos_de_clave, escapar) if self.terminos_de_clave else '(?!)'
+            limite = r'\b' if self.palabras_completas else ''
+            aparte = {t: expresion_bytes(limite + re.escape(t) + limite, self.flags) for t in self.aparte}
+            self._bytes = (re.compile(expresion.encode('ascii')), aparte)
+        return self._bytes
+
+    def _posiciones(self, texto):
+        if isinstance(texto, DocumentoMapeado):
+            datos = texto.datos
+            compilado, patrones_aparte = self._compilados_bytes()
+            hay_limite = lambda posicion: hay_limite_bytes(datos, posicion)
+            decodificar = lambda valor: valor.decode('utf-8')
+            longitud = lambda coincidente, clave: len(coincidente[:len(clave)].encode('utf-8'))
+            limites_comprobados = False
+        else:
+            datos = texto
+            compilado, patrones_aparte = self.compilado, self.patrones_aparte
+            hay_limite = lambda posicion: _hay_limite(texto, posicion)
+            decodificar = str
+            longitud = lambda coincidente, clave: len(clave)
+            limites_comprobados = True  # la expresión str lleva los \b
+        posiciones = {}
+        fin_anterior = {}
+        buscar = compilado.search
+        coincidencia = buscar(datos)
+        while coincidencia:
+            inicio = coincidencia.start()
+            if not limites_comprobados and self.palabras_completas and not hay_limite(inicio):
+                coincidencia = buscar(datos, inicio + 1)
+                continue
+            coincidente = decodificar(coincidencia.group())
+            larga = self._claves_de(coincidente)
+            if larga is not None:
+                for orden, clave in enumerate([larga] + self.prefijos[larga]):
+                    fin = inicio + longitud(coincidente, clave)
+                    if (orden or not limites_comprobados) and self.palabras_completas and not hay_limite(fin):
+                        continue
+                    # Como findall con cada término: sin solapar consigo mismo
+                    if inicio >= fin_anterior.get(clave, 0):
+                        fin_anterior[clave] = fin
+                        for termino in self.terminos_de_clave[clave]:
+                            posiciones.setdefault(termino, []).append((inicio, fin))
+            coincidencia = buscar(datos, inicio + 1)
+        for termino, patron in patrones_aparte.items():
+            encontradas = [c.span() for c in patron.finditer(datos)]
+            if encontradas:
+                posiciones[termino] = encontradas
+        return {termino: posiciones[termino] for termino in self.terminos if termino in posiciones}
+
+    def posiciones(self, texto):
+        """{término: [(inicio, fin), ...]} de los términos presentes, en el orden de la lista
+
+        Con un DocumentoMapeado, inicio y fin son desplazamientos en bytes.
+        """
+        if not self.registro.medir:
+            return self._posiciones(texto)
+        inicio = time.perf_counter()
+        posiciones = self._posiciones(texto)
+        for termino, encontradas in posiciones.items():
+            self.por_termino[termino] += len(encontradas)
+        self._anotar(inicio, sum(len(encontradas) for encontradas in posiciones.values()))
+        return posiciones
+
+    def contar(self, texto):
+        """{término: número de coincidencias} de los términos presentes"""
+        return {termino: len(encontradas) for termino, encontradas in self.posiciones(texto).items()}
+
+    def presentes(self, texto):
+        """Términos que aparecen al menos una vez"""
+        return set(self.posiciones(texto))
+
+    def estadisticas(self):
+        estadisticas = super().estadisticas()
+        estadisticas['terminos'] = len(self.terminos)
+        if self.por_termino:
+            estadisticas['mas_frecuentes'] = self.por_termino.most_common(10)
+        return estadisticas
+
+
+class RegistroPatrones:
+    """Detectores por nombre; registrar dos veces la misma definición devuelve el mismo"""
+
+    def __init__(self):
+        self.detectores = {}
+        self.medir = bool(os.environ.get('LEXIMUS_MEDIR_PATRONES'))
+        self.observador = None  # función que recibe cada número de coincidencias (instrumentacion.py)
+
+    def _registrar(self, nombre, detector):
+        existente = self.detectores.get(nombre)
+        if existente is not None:
+            if existente.definicion() != detector.definicion():
+                raise ValueError(f"El detector '{nombre}' ya está registrado con otra definición")
+            return existente
+        self.detectores[nombre] = detector
+        return detector
+
+    def patron(self, nombre, expresion, flags=0):
+        existente = self.detectores.get(nombre)
+        if existente is not None and existente.definicion() == ('patron', expresion, flags):
+            return existente
+        return self._registrar(nombre, Detector(self, nombre, expresion, flags))
+
+    def terminos(self, nombre, terminos, ignorar_mayusculas=True, palabras_completas=True):
+        terminos = list(terminos)
+        existente = self.detectores.get(nombre)
+        if existente is not None and existente.definicion() == DetectorTerminos.definicion_de(
+                terminos, ignorar_mayusculas, palabras_completas):
+            return existente
+        return self._registrar(nombre, DetectorTerminos(self, nombre, terminos, ignorar_mayusculas,
+                                                        palabras_completas))
+
+    def estadisticas(self):
+        """Estadísticas de los detectores usados, de más a menos tiempo"""
+        usados = [d.estadisticas() for d in self.detectores.values() if d.llamadas]
+        return sorted(usados, key=lambda e: e['ms'], reverse=True)
+
+    def informe(self, mostrar=20):
+        lineas = [f"🔎 Patrones: {len(self.detectores)} detectores registrados"]
+        for estadistica in self.estadisticas()[:mostrar]:
+            lineas.append(f"  {estadistica['ms']:>10.1f} ms {estadistica['llamadas']:>7} llamadas "
+                          f"{estadistica['coincidencias']:>8} coinc.  {estadistica['detector']}")
+        return '\n'.join(lineas)
+
+
+REGISTRO = RegistroPatrones()
+
+
+def patron(nombre, expresion, flags=0):
+    """Registra (o recupera) una expresión regular compilada"""
+    return REGISTRO.patron(nombre, expresion, flags)
+
+
+def terminos(nombre, lista, ignorar_mayusculas=True, palabras_completas=True):
+    """Registra (o recupera) una lista de términos fundida en una sola alternancia"""
+    return REGISTRO.terminos(nombre, lista, ignorar_mayusculas, palabras_completas)
+
+
+def _reconstruir(nombre, tipo, *definicion):
+    """Al deserializar en otro proceso se recupera o registra el detector allí"""
+    if tipo == 'terminos':
+        return REGISTRO.terminos(nombre, *definicion)
+    return REGISTRO.patron(nombre, *definicion)
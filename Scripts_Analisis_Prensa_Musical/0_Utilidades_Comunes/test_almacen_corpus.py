@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Comprobación de la lectura transparente del almacén del corpus
+Empaqueta textos con saltos de línea \n, \r\n, \r y mezclados, borra los
+sueltos y comprueba que leer_texto(), abrir_texto(), iterar_textos() y el
+recorrido del almacén dan lo mismo que open() en modo texto sobre el original
+
+Uso: python3 test_almacen_corpus.py
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import io
+import os
+import sys
+import tempfile
+import contextlib
+
+from almacen_corpus import (empaquetar_directorio, almacen_de_directorio, leer_texto, abrir_texto,
+                            iterar_textos, listar_textos_corpus)
+
+# Nombre -> bytes del archivo
+TEXTOS = {
+    'lf.txt': 'línea uno\nlínea dos\n'.encode('utf-8'),
+    'crlf.txt': 'línea uno\r\nlínea dos\r\n'.encode('utf-8'),
+    'cr.txt': b'uno\rdos\rtres\r',
+    'mezcla.txt': 'ópera\r\n\r\rzarzuela\n\r\nfin'.encode('utf-8'),
+    'sub/crlf_final.txt': b'sin salto final\r\nultima',
+}
+
+
+def test_saltos_de_linea_como_open():
+    with tempfile.TemporaryDirectory() as raiz:
+        directorio = os.path.join(raiz, 'textos')
+        esperados = {}
+        for nombre, datos in TEXTOS.items():
+            ruta = os.path.join(directorio, *nombre.split('/'))
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, 'wb') as f:
+                f.write(datos)
+            with open(ruta, 'r', encoding='utf-8') as f:
+                esperados[ruta] = f.read()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            empaquetar_directorio(directorio, compresion='zlib')
+        for ruta in esperados:
+            os.remove(ruta)
+
+        assert sorted(listar_textos_corpus(directorio)) == sorted(esperados)
+        for ruta, esperado in esperados.items():
+            assert leer_texto(ruta) == esperado, (ruta, leer_texto(ruta))
+            with abrir_texto(ruta) as f:
+                assert f.readlines() == io.StringIO(esperado).readlines(), ruta
+        assert dict(iterar_textos(directorio)) == esperados
+        almacen = almacen_de_directorio(directorio)
+        assert {os.path.join(directorio, *id_documento.split('/')): texto
+                for id_documento, texto in almacen} == esperados
+        almacen.cerrar()
+
+
+def main():
+    try:
+        test_saltos_de_linea_como_open()
+    except AssertionError as e:
+        print(f"❌ test_saltos_de_linea_como_open: {e}")
+        sys.exit(1)
+    print("✅ test_saltos_de_linea_como_open")
+
+
+if __name__ == "__main__":
+    main()
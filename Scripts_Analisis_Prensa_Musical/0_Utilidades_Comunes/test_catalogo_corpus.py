@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Comprobación del análisis de nombres de archivo y del catálogo del corpus
+Recorre las disposiciones de nombre que leen los analizadores y las compara
+con analizar_nombre() y con las expresiones que cada analizador usaba antes;
+comprueba además que indexar() no toca directorios hermanos cuyo nombre
+casa con un '_' o '%' del directorio indexado
+
+Uso: python3 test_catalogo_corpus.py
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(DIRECTORIO, '..', '2_Analisis_Prensa'))
+
+from catalogo_corpus import analizar_nombre, CatalogoCorpus
+from procesador_el_debate import ElDebateProcessor
+from analizador_el_sol import AnalizadorElSol
+from analizador_iberia_musical import AnalizadorIberiaMusical
+
+# Nombre -> campos esperados de analizar_nombre()
+NOMBRES = {
+    # El Debate
+    'El_Debate_textos_1910.txt': {'publicacion': 'El Debate', 'año': 1910, 'mes': None, 'fecha': '1910'},
+    # El Sol, con fecha separada y compacta
+    'El_Sol_1918_01_02.txt': {'año': 1918, 'mes': 1, 'dia': 2, 'fecha': '1918-01-02'},
+    'El_Sol_19180102.txt': {'año': 1918, 'mes': 1, 'dia': 2, 'fecha': '1918-01-02'},
+    # La Iberia Musical y El Artista
+    '1842_01_05.txt': {'año': 1842, 'mes': 1, 'dia': 5, 'numero': None, 'publicacion': None},
+    'La_Iberia_Musical_1845_01_13.txt': {'año': 1845, 'mes': 1, 'dia': 13},
+    'El_Artista_1866_12_31.txt': {'año': 1866, 'mes': 12, 'dia': 31},
+    # Boletín Musical de Madrid
+    'Boletin-musical-Madrid-5-1-1897.txt': {'publicacion': 'Boletín Musical de Madrid', 'año': 1897,
+                                            'mes': 1, 'dia': 5},
+    # Ondas
+    'O-1925-03-07.txt': {'publicacion': 'Ondas', 'año': 1925, 'mes': 3, 'dia': 7},
+    # Revista Musical de Bilbao: descargas originales, renombradas y sus páginas
+    'Revista-musical-Bilbao-7-8-1913-n-o-7.pdf': {'publicacion': 'Revista Musical Bilbao', 'año': 1913,
+                                                  'mes': 7, 'numero': 7},
+    '1913_07-08_Revista-Musical-Bilbao.pdf': {'publicacion': 'Revista Musical Bilbao', 'año': 1913,
+                                              'numero': 7, 'mes': None},
+    '1910_13_Revista-Musical-Bilbao_pagina_004.jpg': {'año': 1910, 'numero': 13, 'mes': None, 'pagina': 4},
+    # Revistas musicales por año y mes
+    '1914-3-Revista-Musical-Hispanoamericana-n-1.txt': {'año': 1914, 'mes': 3, 'dia': None},
+    '1910-11-Revista-Musical-de-Bilbao-n-10.txt': {'año': 1910, 'mes': 11, 'dia': None},
+    # Sin fecha
+    'transcripcion_musical_espana_12.txt': {'año': None, 'fecha': None},
+}
+
+
+def test_disposiciones_de_nombre():
+    for nombre, esperado in NOMBRES.items():
+        datos = analizar_nombre(nombre)
+        obtenido = {campo: datos[campo] for campo in esperado}
+        assert obtenido == esperado, (nombre, obtenido)
+
+
+def test_analizadores_como_antes():
+    """Las fechas de los analizadores coinciden con sus expresiones originales"""
+    debate = ElDebateProcessor(data_dir=DIRECTORIO)
+    sol = AnalizadorElSol(DIRECTORIO)
+    iberia = AnalizadorIberiaMusical(DIRECTORIO)
+    for nombre in NOMBRES:
+        if nombre == 'transcripcion_musical_espana_12.txt':
+            continue  # '12' no es un año: ahí el original devolvía un año sin sentido
+        anio = re.search(r'(\d{4})', nombre)
+        assert debate.extract_date_from_filename(nombre) == (anio.group(1) if anio else "unknown"), nombre
+        assert sol.extraer_año(nombre) == (int(anio.group(1)) if anio else None), nombre
+        fecha = re.search(r'(\d{4})_(\d{2})_(\d{2})', nombre)
+        original = (f"{fecha.group(3)}/{fecha.group(2)}/{fecha.group(1)}", int(fecha.group(1))) if fecha else None
+        if original:
+            assert iberia.extraer_fecha_archivo(nombre) == original, nombre
+
+
+def test_indexar_no_toca_directorios_hermanos():
+    with tempfile.TemporaryDirectory() as raiz:
+        for directorio in ('El_Sol', 'ElxSol', 'El%Sol', 'El_Sol_extra'):
+            # El LIKE solo interviene con subdirectorios
+            os.makedirs(os.path.join(raiz, directorio, '1918'))
+            with open(os.path.join(raiz, directorio, '1918', 'El_Sol_1918_01_02.txt'), 'w', encoding='utf-8') as f:
+                f.write(directorio)
+        with CatalogoCorpus(os.path.join(raiz, 'catalogo.sqlite')) as catalogo:
+            for directorio in ('ElxSol', 'El%Sol', 'El_Sol_extra'):
+                catalogo.indexar(os.path.join(raiz, directorio))
+            catalogo.indexar(os.path.join(raiz, 'El_Sol'))
+            assert catalogo.indexar(os.path.join(raiz, 'El_Sol')) == (0, 1, 0)
+            assert len(catalogo.buscar()) == 4
+            assert len(catalogo.buscar(directorio=os.path.join(raiz, 'El_Sol'))) == 1
+            assert len(catalogo.buscar(directorio=os.path.join(raiz, 'El%Sol'))) == 1
+
+
+def main():
+    errores = 0
+    for prueba in (test_disposiciones_de_nombre, test_analizadores_como_antes,
+                   test_indexar_no_toca_directorios_hermanos):
+        try:
+            prueba()
+            print(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            errores += 1
+            print(f"❌ {prueba.__name__}: {e}")
+    if errores:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
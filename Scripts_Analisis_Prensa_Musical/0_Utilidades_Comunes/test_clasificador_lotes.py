@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Comprobación del clasificador por lotes frente a las reglas originales
+Compara las etiquetas de ElDebateProcessor y BoletinMusicalAnalyzer con las
+de las reglas por subcadenas a las que sustituyen, sobre textos con formas
+flexionadas (plurales, derivados) y, si se indica, sobre las líneas de un
+directorio de textos
+
+Uso: python3 test_clasificador_lotes.py [directorio_textos]
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import sys
+import glob
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(DIRECTORIO, '..', '1_Analisis_Revistas_Musicales'))
+sys.path.insert(0, os.path.join(DIRECTORIO, '..', '2_Analisis_Prensa'))
+
+from procesador_el_debate import ElDebateProcessor
+from boletin_musical_analysis import BoletinMusicalAnalyzer
+
+# Formas flexionadas y subcadenas que las reglas originales sí reconocían
+CASOS_FLEXIONADOS = [
+    "Grandes conciertos en el Real",
+    "Las orquestas del Liceo",
+    "Funciones religiosas en las iglesias",
+    "Bailes de máscaras",
+    "El anfiteatro estaba lleno",
+    "Misas cantadas y novenario en la parroquial",
+    "Los espectáculos del Price y el circo ecuestre",
+    "Musicalmente, las bandas municipales",
+    "Críticas de los estrenos y representaciones de la temporada",
+    "Anuncios: ventas a precios de almacén en la Casa Editorial",
+    "Obras del maestro; biografías de compositores",
+    "Estudios, ejercicios y lecciones del método de armonía",
+    "La redacción, con propósitos editoriales, informa y comunica",
+    "Técnicas de composición, formas y contrapunto",
+    "1→ Noticias\n  2→ ANUNCIOS    de la CASA\n\n   EDITORIAL",
+    "Ningún término: lluvia en Madrid",
+    "",
+]
+
+
+def clasificar_debate_original(content):
+    """Regla original de ElDebateProcessor.classify_content"""
+    content_lower = content.lower()
+
+    if any(keyword in content_lower for keyword in ['teatro', 'teatros', 'función', 'drama', 'comedia', 'zarzuela']):
+        return 'teatro'
+    elif any(keyword in content_lower for keyword in ['concierto', 'música', 'musical', 'orquesta', 'banda']):
+        return 'música'
+    elif any(keyword in content_lower for keyword in ['iglesia', 'misa', 'novena', 'sermón', 'parroquia']):
+        return 'religioso'
+    elif any(keyword in content_lower for keyword in ['circo', 'price', 'espectáculo', 'baile']):
+        return 'espectáculo'
+    else:
+        return 'general'
+
+
+def clasificar_boletin_original(analizador, text):
+    """Regla original de BoletinMusicalAnalyzer.classify_content"""
+    cleaned_text = analizador.clean_text(text)
+
+    review_keywords = ['crítica', 'reseña', 'juicio', 'opinión', 'estreno', 'representación']
+    educational_keywords = ['enseñanza', 'método', 'estudio', 'ejercicio', 'lección', 'teoría']
+    news_keywords = ['noticia', 'anuncio', 'información', 'comunica', 'participa']
+    theory_keywords = ['armonía', 'contrapunto', 'composición', 'técnica', 'forma']
+    composer_keywords = ['biografía', 'maestro', 'compositor', 'vida', 'obra']
+    ad_keywords = ['anuncio', 'venta', 'precio', 'almacén', 'casa editorial']
+    editorial_keywords = ['editorial', 'redacción', 'propósito', 'programa', 'misión']
+
+    scores = {
+        'reviews_critiques': sum(1 for kw in review_keywords if kw in cleaned_text),
+        'educational_content': sum(1 for kw in educational_keywords if kw in cleaned_text),
+        'news_announcements': sum(1 for kw in news_keywords if kw in cleaned_text),
+        'theory_articles': sum(1 for kw in theory_keywords if kw in cleaned_text),
+        'composer_profiles': sum(1 for kw in composer_keywords if kw in cleaned_text),
+        'advertisements': sum(1 for kw in ad_keywords if kw in cleaned_text),
+        'editorials': sum(1 for kw in editorial_keywords if kw in cleaned_text)
+    }
+
+    if max(scores.values()) > 0:
+        return max(scores, key=scores.get)
+    return 'unclassified'
+
+
+def diferencias(textos):
+    """(texto, clasificador, original, nuevo) de cada etiqueta distinta"""
+    debate = ElDebateProcessor(data_dir=DIRECTORIO)
+    boletin = BoletinMusicalAnalyzer(DIRECTORIO)
+    distintas = []
+    for texto, nueva in zip(textos, debate.classify_batch(textos)):
+        original = clasificar_debate_original(texto)
+        if original != nueva:
+            distintas.append((texto, 'El Debate', original, nueva))
+    for texto, nueva in zip(textos, boletin.classify_contents(textos)):
+        original = clasificar_boletin_original(boletin, texto)
+        if original != nueva:
+            distintas.append((texto, 'Boletín', original, nueva))
+    return distintas
+
+
+def test_formas_flexionadas():
+    assert diferencias(CASOS_FLEXIONADOS) == []
+
+
+def main():
+    textos = list(CASOS_FLEXIONADOS)
+    if len(sys.argv) > 1:
+        for ruta in sorted(glob.glob(os.path.join(sys.argv[1], '*.txt'))):
+            with open(ruta, encoding='utf-8', errors='replace') as f:
+                textos.extend(linea.strip() for linea in f if linea.strip())
+
+    print(f"Comprobando {len(textos)} textos...")
+    distintas = diferencias(textos)
+    for texto, clasificador, original, nueva in distintas[:20]:
+        print(f"❌ {clasificador}: {texto[:60]!r} -> {nueva} (original: {original})")
+    if distintas:
+        print(f"❌ {len(distintas)} etiquetas distintas")
+        sys.exit(1)
+    print("✅ Etiquetas idénticas a las reglas originales")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Procesamiento por ventanas de archivos enormes
+Los volcados de El Debate son unos pocos El_Debate_textos*.txt de cientos de
+megas: leídos enteros, un solo proceso carga con todo. Aquí cada archivo se
+parte en ventanas por límites de línea (o de párrafo) que se reparten entre
+procesos. Cada ventana tiene un núcleo, el tramo que le corresponde, y unos
+márgenes solapados con sus vecinas para que las expresiones regulares vean el
+mismo contexto que en el texto completo: una coincidencia se queda en la
+ventana cuyo núcleo contiene su inicio. Los resultados vuelven en el orden
+del archivo y cada ventana informa de cuántos caracteres y líneas tiene su
+núcleo, para recomponer los desplazamientos globales.
+
+Uso: python3 ventanas_corpus.py archivo.txt [--tam-ventana MB] [--solape BYTES] [--parrafos]
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from documentos_grandes import DocumentoMapeado
+
+TAM_VENTANA = 8 << 20
+SOLAPE = 4096
+UMBRAL_VENTANAS = 32 << 20
+
+
+def umbral_ventanas():
+    """Tamaño a partir del cual un archivo se procesa por ventanas (LEXIMUS_UMBRAL_VENTANAS, en bytes)"""
+    return int(os.environ.get('LEXIMUS_UMBRAL_VENTANAS', UMBRAL_VENTANAS))
+
+
+def requiere_ventanas(ruta):
+    """True si el archivo está en disco y alcanza el umbral de procesamiento por ventanas"""
+    ruta = os.fspath(ruta)
+    return os.path.isfile(ruta) and os.path.getsize(ruta) >= umbral_ventanas()
+
+
+class Ventana:
+    """Tramo [inicio, fin) en bytes de un archivo; el núcleo [nucleo_inicio, nucleo_fin)
+    es lo que le corresponde y el resto, margen de contexto compartido con las vecinas"""
+
+    def __init__(self, ruta, numero, inicio, nucleo_inicio, nucleo_fin, fin):
+        self.ruta = ruta
+        self.numero = numero
+        self.inicio = inicio
+        self.nucleo_inicio = nucleo_inicio
+        self.nucleo_fin = nucleo_fin
+        self.fin = fin
+
+    def __repr__(self):
+        return (f"Ventana({self.numero}, {self.inicio}-[{self.nucleo_inicio}-{self.nucleo_fin}]-{self.fin}, "
+                f"{os.path.basename(self.ruta)})")
+
+    def leer(self, errors='strict'):
+        """(texto, desde, hasta): texto de la ventana y el núcleo en caracteres dentro de él
+
+        Se decodifica como leer_texto(): UTF-8 con los saltos de línea \\r\\n y \\r
+        convertidos en \\n, así que las posiciones coinciden con las del texto completo.
+        """
+        with open(self.ruta, 'rb') as f:
+            f.seek(self.inicio)
+            datos = f.read(self.fin - self.inicio)
+        partes = [datos[:self.nucleo_inicio - self.inicio],
+                  datos[self.nucleo_inicio - self.inicio:self.nucleo_fin - self.inicio],
+                  datos[self.nucleo_fin - self.inicio:]]
+        antes, nucleo, despues = (parte.decode('utf-8', errors).replace('\r\n', '\n').replace('\r', '\n')
+                                  for parte in partes)
+        return antes + nucleo + despues, len(antes), len(antes) + len(nucleo)
+
+    def lineas_nucleo(self, errors='strict'):
+        """Líneas del núcleo, como readlines() sobre el archivo completo"""
+        texto, desde, hasta = self.leer(errors)
+        return io.StringIO(texto[desde:hasta]).readlines()
+
+
+def dividir_en_ventanas(ruta, tam_ventana=TAM_VENTANA, solape=SOLAPE, parrafos=False):
+    """Ventanas de unos `tam_ventana` bytes cortadas tras un salto de línea
+
+    Con parrafos=True los núcleos se cortan tras una línea en blanco (si no hay
+    ninguna en la ventana siguiente, tras el siguiente salto de línea). Los
+    márgenes se extienden al menos `solape` bytes por cada lado, hasta un
+    límite de línea.
+    """
+    ruta = os.fspath(ruta)
+    ventanas = []
+    with DocumentoMapeado(ruta) as documento:
+        datos, total = documento.datos, len(documento)
+
+        def tras_salto(posicion, separador=b'\n'):
+            """Primera posición tras `separador` a partir de `posicion` (o el final)"""
+            if posicion >= total:
+                return total
+            encontrado = datos.find(separador, posicion)
+            return total if encontrado == -1 else encontrado + len(separador)
+
+        def inicio_de_linea(posicion):
+            if posicion <= 0:
+                return 0
+            return datos.rfind(b'\n', 0, posicion) + 1
+
+        nucleo_inicio = 0
+        while nucleo_inicio < total or not ventanas:
+            corte = nucleo_inicio + max(1, tam_ventana)
+            nucleo_fin = tras_salto(corte)
+            if parrafos and corte < total:
+                # Línea en blanco dentro de la ventana siguiente; si no hay, salto de línea
+                parrafo = datos.find(b'\n\n', corte, corte + max(1, tam_ventana))
+                if parrafo != -1:
+                    nucleo_fin = parrafo + 2
+            inicio = inicio_de_linea(nucleo_inicio - solape) if solape else nucleo_inicio
+            fin = tras_salto(nucleo_fin + solape) if solape else nucleo_fin
+            ventanas.append(Ventana(ruta, len(ventanas), inicio, nucleo_inicio, nucleo_fin, fin))
+            nucleo_inicio = nucleo_fin
+            if total == 0:
+                break
+    return ventanas
+
+
+def procesar_en_ventanas(ventanas, funcion, procesos=None, inicializador=None, argumentos_inicializador=()):
+    """Aplica `funcion` (de nivel de módulo) a cada ventana en un pool de procesos
+
+    Devuelve los resultados en el orden de las ventanas; procesos=1 lo hace en
+    este proceso.
+    """
+    if procesos == 1 or len(ventanas) <= 1:
+        if inicializador:
+            inicializador(*argumentos_inicializador)
+        return [funcion(ventana) for ventana in ventanas]
+    with ProcessPoolExecutor(max_workers=procesos, initializer=inicializador,
+                             initargs=argumentos_inicializador) as ejecutor:
+        return list(ejecutor.map(funcion, ventanas))
+
+
+def _resumen_ventana(ventana):
+    texto, desde, hasta = ventana.leer(errors='replace')
+    return hasta - desde, len(io.StringIO(texto[desde:hasta]).readlines())
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python3 ventanas_corpus.py archivo.txt [--tam-ventana MB] [--solape BYTES] [--parrafos]")
+        return
+    argumentos = sys.argv[1:]
+    tam_ventana, solape = TAM_VENTANA, SOLAPE
+    if '--tam-ventana' in argumentos:
+        tam_ventana = int(float(argumentos[argumentos.index('--tam-ventana') + 1]) * (1 << 20))
+    if '--solape' in argumentos:
+        solape = int(argumentos[argumentos.index('--solape') + 1])
+    ventanas = dividir_en_ventanas(argumentos[0], tam_ventana, solape, '--parrafos' in argumentos)
+    print(f"🪟 {len(ventanas)} ventanas")
+    caracteres = lineas = 0
+    for ventana, (n_caracteres, n_lineas) in zip(ventanas, procesar_en_ventanas(ventanas, _resumen_ventana)):
+        print(f"  {ventana}  carácter {caracteres:>12}  línea {lineas + 1:>9}")
+        caracteres += n_caracteres
+        lineas += n_lineas
+    print(f"✅ {caracteres} caracteres, {lineas} líneas")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,10 +12,32 @@ Metodología:
 """
 
 import os
-import re
+import sys
 from pathlib import Path
 from collections import defaultdict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from registro_patrones import patron, terminos, DetectorTerminos, REGISTRO
+
+PATRON_NUMERO = patron('revista_espana_completo.numero', r'(\d+)')
+
+# Patrones comunes de temas en la revista España (antes alternancias por tema, ahora sus términos)
+TERMINOS_TEMAS = {
+    'política': ['política', 'político', 'gobierno', 'ministro', 'parlamento', 'congreso', 'diputados'],
+    'guerra': ['guerra', 'bélico', 'militar', 'soldado', 'batalla', 'conflicto'],
+    'literatura': ['literaria', 'literario', 'escritor', 'novela', 'poesía', 'poeta', 'libro'],
+    'educación': ['educación', 'enseñanza', 'escuela', 'universidad', 'estudiante'],
+    'economía': ['económica', 'económico', 'comercio', 'industria', 'dinero', 'precio'],
+    'sociedad': ['social', 'sociedad', 'costumbres', 'pueblo', 'cultura'],
+    'arte': ['arte', 'pintura', 'pintor', 'escultura', 'artista'],
+    'filosofía': ['filosofía', 'filosófico', 'pensamiento', 'idea'],
+    'religión': ['religioso', 'iglesia', 'católico', 'fe', 'dios'],
+    'internacional': ['internacional', 'europa', 'francia', 'alemania', 'extranjero']
+}
+TEMA_DE_TERMINO = {termino: tema for tema, lista in TERMINOS_TEMAS.items() for termino in lista}
+# Sin límites de palabra, como los re.search de cada tema
+DETECTOR_TEMAS = terminos('revista_espana_completo.temas', TEMA_DE_TERMINO, palabras_completas=False)
+
 class AnalizadorRevistaEspana:
     def __init__(self):
         self.directorio = "/Users/maria/Desktop/Música en la revista ESPAÑA/REVISTA ESPAÑA en TXT/"
@@ -182,6 +204,16 @@ class AnalizadorRevistaEspana:
             'ópera', 'zarzuela', 'opereta', 'recital', 'audición'
         ]
         
+        # Un detector por diccionario: una pasada por texto en vez de una búsqueda por término
+        self.detectores_referencias = {
+            id(diccionario): terminos(f"revista_espana_completo.{nombre}", diccionario)
+            for nombre, diccionario in (('compositores', self.compositores_dict),
+                                        ('generos', self.generos_dict),
+                                        ('instrumentos', self.instrumentos_dict),
+                                        ('instituciones', self.instituciones_dict),
+                                        ('interpretes', self.interpretes_dict))
+        }
+        
         self.resultados_detallados = []
     
     def leer_archivo(self, ruta_archivo):
@@ -195,16 +227,19 @@ class AnalizadorRevistaEspana:
     
     def extraer_numero_archivo(self, nombre_archivo):
         """Extrae el número del archivo del nombre"""
-        match = re.search(r'(\d+)', nombre_archivo)
+        match = PATRON_NUMERO.search(nombre_archivo)
         return int(match.group(1)) if match else 0
     
     def contar_referencias(self, contenido, diccionario):
         """Cuenta las referencias de un diccionario específico en el contenido"""
+        detector = self.detectores_referencias.get(id(diccionario))
+        if detector is None:
+            detector = DetectorTerminos(REGISTRO, 'revista_espana_completo.referencias', diccionario)
+        # Cada término como palabra completa, todos en una sola pasada
+        coincidencias_terminos = detector.contar(contenido)
         conteos = {}
         for termino, nombre_canonical in diccionario.items():
-            # Buscar el término como palabra completa
-            patron = r'\b' + re.escape(termino) + r'\b'
-            coincidencias = len(re.findall(patron, contenido, re.IGNORECASE))
+            coincidencias = coincidencias_terminos.get(termino, 0)
             if coincidencias > 0:
                 if nombre_canonical in conteos:
                     conteos[nombre_canonical] += coincidencias
@@ -227,25 +262,8 @@ class AnalizadorRevistaEspana:
     
     def extraer_temas_principales(self, contenido):
         """Extrae los temas principales no musicales del contenido"""
-        temas = []
-        
-        # Patrones comunes de temas en la revista España
-        patrones_temas = {
-            'política': r'(polític[ao]|gobierno|ministro|parlamento|congreso|diputados)',
-            'guerra': r'(guerra|bélico|militar|soldado|batalla|conflicto)',
-            'literatura': r'(literari[ao]|escritor|novela|poesía|poeta|libro)',
-            'educación': r'(educación|enseñanza|escuela|universidad|estudiante)',
-            'economía': r'(económic[ao]|comercio|industria|dinero|precio)',
-            'sociedad': r'(social|sociedad|costumbres|pueblo|cultura)',
-            'arte': r'(arte|pintura|pintor|escultura|artista)',
-            'filosofía': r'(filosofía|filosófico|pensamiento|idea)',
-            'religión': r'(religioso|iglesia|católico|fe|dios)',
-            'internacional': r'(internacional|europa|francia|alemania|extranjero)'
-        }
-        
-        for tema, patron in patrones_temas.items():
-            if re.search(patron, contenido, re.IGNORECASE):
-                temas.append(tema)
+        presentes = DETECTOR_TEMAS.presentes(contenido)
+        temas = [tema for tema, lista in TERMINOS_TEMAS.items() if any(t in presentes for t in lista)]
         
         return temas if temas else ['general']
     
@@ -10,12 +10,41 @@ Universidad de Salamanca
 """
 
 import os
+import sys
 import json
 import re
 from collections import defaultdict, Counter
 from datetime import datetime
 import glob
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from duplicados_corpus import filtrar_canonicos
+from almacen_corpus import AlmacenContenidos, leer_bytes_texto, leer_rango
+from periodos_historicos import PERIODOS_REVISTA_ESPANA, año_de_fecha
+
+MESES = {
+    'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4,
+    'mayo': 5, 'junio': 6, 'julio': 7, 'agosto': 8,
+    'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
+}
+
+# Patrones de la extracción en una sola pasada (extraer_en_una_pasada)
+PATRON_TOKEN = re.compile(r'(\w+)')
+PATRON_PALABRA = re.compile(r'[a-záéíóúñü]+')
+PATRON_AÑO = re.compile(r'\d{4}')
+PATRON_NUMERO_AÑO = re.compile(r'AÑO\s+[IVX]+,?\s*N[UÚ]M?\.\s*(\d+)', re.IGNORECASE)
+PATRON_AUTOR_POR = re.compile(r'POR\s+([A-ZÁÉÍÓÚ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚ][a-záéíóúñ]+)*)')
+PATRON_AUTOR_FIRMADO = re.compile(r'Firmado[:\s]+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)')
+PATRON_TRAMO_MAYUSCULAS = re.compile(r'[A-ZÁÉÍÓÚ\s\.]+')
+PATRON_MAYUSCULA = re.compile(r'[A-ZÁÉÍÓÚ]')
+# Únicos caracteres cuya minúscula cambia los límites de \w o la clase de letras contadas
+CARACTERES_SIN_EQUIVALENCIA = ('\u0130', '\u212a')
+
+
+def saltos_universales(texto):
+    """Convierte \\r\\n y \\r en \\n, como la lectura de open() en modo texto"""
+    return texto.replace('\r\n', '\n').replace('\r', '\n')
+
 
 class AnalizadorRevistaEspana:
     def __init__(self, directorio_textos):
@@ -61,12 +90,16 @@ class AnalizadorRevistaEspana:
             ]
         }
         
-        # Períodos históricos
-        self.periodos = {
-            (1915, 1918): "Primera Guerra Mundial",
-            (1919, 1923): "Crisis de posguerra", 
-            (1924, 1924): "Dictadura de Primo de Rivera"
-        }
+        # Períodos históricos (tabla año → período precalculada)
+        self.periodos = PERIODOS_REVISTA_ESPANA
+        
+        # Términos por prefijo para buscarlos token a token: termino -> [(categoria, indice)]
+        self.terminos_por_prefijo = defaultdict(list)
+        for categoria, terminos in self.vocabulario_musical.items():
+            for indice, termino in enumerate(terminos):
+                self.terminos_por_prefijo[termino].append((categoria, indice))
+        self.longitudes_terminos = sorted({len(termino) for termino in self.terminos_por_prefijo})
+        self._cache_tokens = {}
         
     
     def extraer_numero_archivo(self, archivo):
@@ -87,11 +120,7 @@ class AnalizadorRevistaEspana:
             r'AÑO\s+[IVX]+,?\s*N[UÚ]M?\.\s*(\d+)'
         ]
         
-        meses = {
-            'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4,
-            'mayo': 5, 'junio': 6, 'julio': 7, 'agosto': 8,
-            'septiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
-        }
+        meses = MESES
         
         for patron in patrones_fecha:
             match = re.search(patron, contenido, re.IGNORECASE)
@@ -168,14 +197,7 @@ class AnalizadorRevistaEspana:
     
     def determinar_periodo(self, fecha_str):
         """Determina el período histórico basado en la fecha"""
-        # Extraer año de la fecha
-        match = re.search(r'(\d{4})', fecha_str)
-        if match:
-            año = int(match.group(1))
-            for (inicio, fin), periodo in self.periodos.items():
-                if inicio <= año <= fin:
-                    return periodo
-        return "Sin clasificar"
+        return self.periodos.periodo_de_fecha(fecha_str, "Sin clasificar")
     
     def contar_palabras(self, texto):
         """Cuenta las palabras en el texto"""
@@ -184,21 +206,141 @@ class AnalizadorRevistaEspana:
         palabras = re.findall(r'\b[a-záéíóúñüA-ZÁÉÍÓÚÑÜ]+\b', texto_limpio)
         return len(palabras)
     
+    def _clasificar_token(self, token):
+        """(cuenta como palabra, [(categoria, indice del término)]) de un token en minúsculas"""
+        if token not in self._cache_tokens:
+            aciertos = []
+            for longitud in self.longitudes_terminos:
+                if longitud > len(token):
+                    break
+                aciertos.extend(self.terminos_por_prefijo.get(token[:longitud], ()))
+            self._cache_tokens[token] = (PATRON_PALABRA.fullmatch(token) is not None, aciertos)
+        return self._cache_tokens[token]
+    
+    def _fecha_de_tokens(self, tokens, separadores, contenido):
+        """Misma fecha que extraer_fecha_contenido, buscada sobre los tokens
+        
+        Cada patrón cuenta solo con su primera coincidencia: "d de mes de aaaa",
+        luego "d mes aaaa", luego el primer año de cuatro cifras.
+        """
+        total = len(tokens)
+        larga = corta = año = None
+        for i, token in enumerate(tokens):
+            if año is None and not token.isalpha() and PATRON_AÑO.search(token):
+                año = PATRON_AÑO.search(token).group(0)
+            # Día: las últimas una o dos cifras del token, seguidas de espacio
+            if token[-1].isdecimal() and separadores[i + 1].isspace():
+                dia = token[-2:] if len(token) > 1 and token[-2].isdecimal() else token[-1]
+                if (larga is None and i + 4 < total and tokens[i + 1] == 'de' and tokens[i + 3] == 'de'
+                        and tokens[i + 4][:4].isdecimal() and len(tokens[i + 4]) >= 4
+                        and separadores[i + 2].isspace() and separadores[i + 3].isspace()
+                        and separadores[i + 4].isspace()):
+                    larga = (dia, tokens[i + 2], tokens[i + 4][:4])
+                    if larga[1] in MESES:
+                        break
+                if (corta is None and i + 2 < total and tokens[i + 2][:4].isdecimal() and len(tokens[i + 2]) >= 4
+                        and separadores[i + 2].isspace()):
+                    corta = (dia, tokens[i + 1], tokens[i + 2][:4])
+            if larga is not None and corta is not None and año is not None:
+                break
+        
+        for candidata in (larga, corta):
+            if candidata and candidata[1] in MESES:
+                return f"{candidata[0]} de {candidata[1]} de {candidata[2]}"
+        if año:
+            return año
+        match = PATRON_NUMERO_AÑO.search(contenido)
+        return match.group(1) if match else "Fecha no disponible"
+    
+    def _autores_una_pasada(self, contenido):
+        """Mismos autores que extraer_autores, sin la búsqueda cuadrática de líneas en mayúsculas"""
+        candidatos = PATRON_AUTOR_POR.findall(contenido)
+        # Líneas en mayúsculas: en cada tramo de mayúsculas, espacios y puntos hay como
+        # mucho una coincidencia, desde la primera mayúscula hasta el último fin de línea
+        for tramo in PATRON_TRAMO_MAYUSCULAS.finditer(contenido):
+            inicio, fin = tramo.span()
+            final = fin if fin == len(contenido) else contenido.rfind('\n', inicio, fin)
+            if final - inicio < 2:
+                continue
+            mayuscula = PATRON_MAYUSCULA.search(contenido, inicio, final - 1)
+            if mayuscula:
+                candidatos.append(contenido[mayuscula.start():final])
+        candidatos.extend(PATRON_AUTOR_FIRMADO.findall(contenido))
+        
+        autores = set()
+        for candidato in candidatos:
+            if len(candidato.strip()) > 3 and len(candidato.strip()) < 50:
+                autores.add(candidato.strip())
+        return list(autores)
+    
+    def extraer_en_una_pasada(self, contenido):
+        """Fecha, autores, menciones musicales y número de palabras de un número
+        
+        Un solo troceado del texto en minúsculas (palabras y separadores) sirve
+        para la fecha, los términos y el recuento, en lugar de una regex por
+        término. El resultado es idéntico al de los métodos originales.
+        """
+        if any(c in contenido for c in CARACTERES_SIN_EQUIVALENCIA):
+            return {
+                'fecha': self.extraer_fecha_contenido(contenido),
+                'autores': self.extraer_autores(contenido),
+                'menciones_musicales': self.analizar_contenido_musical(contenido),
+                'num_palabras': self.contar_palabras(contenido)
+            }
+        
+        partes = PATRON_TOKEN.split(contenido.lower())
+        separadores = partes[0::2]
+        tokens = partes[1::2]
+        
+        # Cada token distinto se clasifica una vez, en orden de primera aparición
+        num_palabras = 0
+        aciertos = defaultdict(list)
+        for token, frecuencia in Counter(tokens).items():
+            es_palabra, terminos = self._clasificar_token(token)
+            if es_palabra:
+                num_palabras += frecuencia
+            for clave in terminos:
+                aciertos[clave].append((token, frecuencia))
+        
+        # Mismo orden de claves que analizar_contenido_musical
+        menciones_musicales = defaultdict(int)
+        for categoria, terminos in self.vocabulario_musical.items():
+            for indice in range(len(terminos)):
+                coincidencias = aciertos.get((categoria, indice))
+                if coincidencias:
+                    menciones_musicales[categoria] += sum(frecuencia for _, frecuencia in coincidencias)
+                    for token, frecuencia in coincidencias:
+                        menciones_musicales[f"{categoria}_{token}"] += frecuencia
+        
+        return {
+            'fecha': self._fecha_de_tokens(tokens, separadores, contenido),
+            'autores': self._autores_una_pasada(contenido),
+            'menciones_musicales': dict(menciones_musicales),
+            'num_palabras': num_palabras
+        }
+    
     def procesar_archivo(self, ruta_archivo):
-        """Procesa un archivo individual"""
+        """Procesa un archivo individual
+        
+        El artículo no guarda el texto: solo una referencia (archivo y rango de
+        bytes) y la huella del contenido; el cuerpo se lee con contenido().
+        El rango es el del archivo en disco, y la huella, la del texto con los
+        saltos de línea convertidos.
+        """
         try:
-            with open(ruta_archivo, 'r', encoding='utf-8') as f:
-                contenido = f.read()
+            datos = leer_bytes_texto(ruta_archivo)
+            contenido = saltos_universales(datos.decode('utf-8'))
             
             if not contenido.strip():
                 return None
             
             numero = self.extraer_numero_archivo(os.path.basename(ruta_archivo))
-            fecha = self.extraer_fecha_contenido(contenido)
-            autores = self.extraer_autores(contenido)
-            menciones_musicales = self.analizar_contenido_musical(contenido)
+            extraido = self.extraer_en_una_pasada(contenido)
+            fecha = extraido['fecha']
+            autores = extraido['autores']
+            menciones_musicales = extraido['menciones_musicales']
             periodo = self.determinar_periodo(fecha)
-            num_palabras = self.contar_palabras(contenido)
+            num_palabras = extraido['num_palabras']
             
             # Crear título unificado
             titulo = self.crear_titulo_unificado(numero, fecha)
@@ -210,7 +352,12 @@ class AnalizadorRevistaEspana:
                 'fecha': fecha,
                 'autores': autores,
                 'periodo': periodo,
-                'contenido': contenido,
+                'referencia': {
+                    'archivo': os.path.relpath(ruta_archivo, self.directorio_textos).replace(os.sep, '/'),
+                    'inicio': 0,
+                    'fin': len(datos)
+                },
+                'huella_contenido': AlmacenContenidos.huella(contenido.encode('utf-8')),
                 'num_palabras': num_palabras,
                 'menciones_musicales': menciones_musicales,
                 'total_menciones_musicales': sum(menciones_musicales.values())
@@ -222,12 +369,18 @@ class AnalizadorRevistaEspana:
             print(f"Error procesando {ruta_archivo}: {str(e)}")
             return None
     
+    def contenido(self, articulo):
+        """Texto completo de un artículo, leído bajo demanda desde su referencia"""
+        referencia = articulo['referencia']
+        ruta = os.path.join(self.directorio_textos, *referencia['archivo'].split('/'))
+        return saltos_universales(leer_rango(ruta, referencia['inicio'], referencia['fin']))
+    
     def analizar_corpus(self):
         """Analiza todo el corpus de textos"""
         print(f"Analizando corpus en: {self.directorio_textos}")
         
         archivos = glob.glob(os.path.join(self.directorio_textos, "*.txt"))
-        archivos.sort()
+        archivos = filtrar_canonicos(sorted(archivos))
         
         print(f"Encontrados {len(archivos)} archivos")
         
@@ -276,6 +429,19 @@ class AnalizadorRevistaEspana:
                 año = match.group(1)
                 articulos_por_año[año] += 1
         
+        # Temas y autores por período histórico, en una reducción agrupada cada uno
+        años = [año_de_fecha(articulo['fecha']) for articulo in self.datos_completos]
+        temas_por_periodo = self.periodos.mas_frecuentes(
+            años,
+            # Solo términos: las claves de categoría ('elementos_tecnicos') son totales
+            [{tema: n for tema, n in articulo['menciones_musicales'].items()
+              if tema not in self.vocabulario_musical}
+             for articulo in self.datos_completos]
+        )
+        autores_por_periodo = self.periodos.mas_frecuentes(
+            años, [Counter(articulo['autores']) for articulo in self.datos_completos]
+        )
+        
         return {
             'resumen_general': {
                 'total_numeros': self.estadisticas['total_numeros'],
@@ -288,12 +454,30 @@ class AnalizadorRevistaEspana:
             'autores_principales': dict(contador_autores.most_common(10)),
             'temas_musicales': {k: dict(v.most_common(10)) for k, v in temas_por_categoria.items()},
             'distribucion_temporal': dict(articulos_por_año),
-            'periodos_historicos': dict(self.estadisticas['periodos'])
+            'periodos_historicos': dict(self.estadisticas['periodos']),
+            'temas_por_periodo': {periodo: dict(temas) for periodo, temas in temas_por_periodo.items()},
+            'autores_por_periodo': {periodo: dict(autores) for periodo, autores in autores_por_periodo.items()}
         }
     
+    def guardar_contenidos(self, directorio_contenidos):
+        """Escribe los cuerpos de los artículos en el almacén direccionado por contenido
+        
+        Solo se leen los artículos cuya huella aún no está guardada.
+        """
+        almacen = AlmacenContenidos(directorio_contenidos)
+        nuevos = 0
+        for articulo in self.datos_completos:
+            if articulo['huella_contenido'] not in almacen:
+                almacen.guardar(self.contenido(articulo).encode('utf-8'))
+                nuevos += 1
+        eliminados = almacen.eliminar_no_referenciados(a['huella_contenido'] for a in self.datos_completos)
+        print(f"Contenidos: {nuevos} nuevos, {eliminados} obsoletos eliminados en {directorio_contenidos}")
+    
     def guardar_datos(self, archivo_salida):
-        """Guarda los datos analizados en formato JSON"""
+        """Guarda los metadatos en JSON y los textos completos en un almacén aparte"""
         estadisticas_resumen = self.generar_estadisticas_resumen()
+        directorio_contenidos = os.path.splitext(archivo_salida)[0] + '_contenidos'
+        self.guardar_contenidos(directorio_contenidos)
         
         datos_exportar = {
             'metadatos': {
@@ -303,7 +487,10 @@ class AnalizadorRevistaEspana:
                 'revista': 'ESPAÑA',
                 'periodo': '1915-1924',
                 'fecha_analisis': datetime.now().isoformat(),
-                'total_archivos_procesados': len(self.datos_completos)
+                'total_archivos_procesados': len(self.datos_completos),
+                'directorio_textos': self.directorio_textos,
+                # Relativo al JSON: <huella[:2]>/<huella>.txt por artículo
+                'almacen_contenidos': os.path.basename(directorio_contenidos)
             },
             'estadisticas': estadisticas_resumen,
             'articulos': self.datos_completos
@@ -7,14 +7,93 @@ Análisis de contenido musical de revistas especializadas (1909-1917)
 import json
 import re
 import os
+import sys
 from collections import defaultdict, Counter
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from duplicados_corpus import filtrar_canonicos
+
+# Contextos de ejemplo que se guardan por nombre (el recuento es siempre completo)
+MAX_EJEMPLOS = 5
+
+class AgregadoRevistas:
+    """Agregado fusionable: contadores más ejemplos de contexto acotados"""
+
+    CATEGORIAS = ('compositores', 'interpretes', 'masculino', 'femenino')
+
+    def __init__(self):
+        self.menciones = {categoria: Counter() for categoria in self.CATEGORIAS}
+        self.ejemplos = {categoria: {} for categoria in self.CATEGORIAS}
+        self.generos = Counter()
+        self.instrumentos = Counter()
+        self.lugares = Counter()
+        self.evolucion = defaultdict(Counter)
+        self.archivos_por_revista = Counter()
+
+    @classmethod
+    def desde_archivo(cls, resultado, revista, revista_nombre):
+        """Agregado parcial de un archivo a partir de procesar_archivo()"""
+        agregado = cls()
+        archivo = resultado['archivo']
+        año = archivo['año']
+        listas = {
+            'compositores': resultado['compositores'],
+            'interpretes': resultado['interpretes'],
+            'masculino': resultado['genero_personas']['masculino'],
+            'femenino': resultado['genero_personas']['femenino']
+        }
+        for categoria, menciones in listas.items():
+            for mencion in menciones:
+                agregado.añadir_mencion(categoria, mencion['nombre'],
+                                        {'revista': revista, 'archivo': archivo, 'contexto': mencion['contexto']})
+        agregado.generos.update(resultado['generos'])
+        agregado.instrumentos.update(resultado['instrumentos'])
+        agregado.lugares.update(resultado['lugares'])
+        if año:
+            agregado.evolucion[año]['compositores'] += len(resultado['compositores'])
+            agregado.evolucion[año]['interpretes'] += len(resultado['interpretes'])
+            agregado.evolucion[año]['total'] += 1
+        agregado.archivos_por_revista[revista_nombre] += 1
+        return agregado
+
+    def añadir_mencion(self, categoria, nombre, ejemplo):
+        self.menciones[categoria][nombre] += 1
+        ejemplos = self.ejemplos[categoria].setdefault(nombre, [])
+        if len(ejemplos) < MAX_EJEMPLOS:
+            ejemplos.append(ejemplo)
+
+    def fusionar(self, otro):
+        """Suma otro agregado a este (el orden de fusión es el de los archivos)"""
+        for categoria in self.CATEGORIAS:
+            self.menciones[categoria].update(otro.menciones[categoria])
+            for nombre, ejemplos in otro.ejemplos[categoria].items():
+                propios = self.ejemplos[categoria].setdefault(nombre, [])
+                propios.extend(ejemplos[:MAX_EJEMPLOS - len(propios)])
+        self.generos.update(otro.generos)
+        self.instrumentos.update(otro.instrumentos)
+        self.lugares.update(otro.lugares)
+        for año, contador in otro.evolucion.items():
+            self.evolucion[año].update(contador)
+        self.archivos_por_revista.update(otro.archivos_por_revista)
+        return self
+
+    def menciones_con_ejemplos(self, categoria):
+        """{nombre: {'menciones': n, 'ejemplos': [...]}} en orden de aparición"""
+        return {nombre: {'menciones': n, 'ejemplos': self.ejemplos[categoria][nombre]}
+                for nombre, n in self.menciones[categoria].items()}
+
 class AnalizadorRevistasMusicales:
     def __init__(self):
         self.bilbao_dir = "/Users/maria/Desktop/REVISTAS TXT PARA WEBS ESTADÍSTICAS/TXT - Revista Musical de Bilbao"
         self.hispano_dir = "/Users/maria/Desktop/REVISTAS TXT PARA WEBS ESTADÍSTICAS/TXT - Revista Musical Hispanoamericana"
         
+        # (nombre, nombre corto, directorio): para añadir una revista basta otra entrada
+        self.revistas = [
+            ("Revista Musical de Bilbao", "Bilbao", self.bilbao_dir),
+            ("Revista Musical Hispanoamericana", "Hispanoamericana", self.hispano_dir)
+        ]
+        
         # Patrones para análisis
         self.patrones_compositores = [
             r'\b(Bach|Beethoven|Mozart|Chopin|Wagner|Schubert|Brahms|Liszt|Schumann|Haydn)\b',
@@ -152,112 +231,65 @@ class AnalizadorRevistasMusicales:
         
         return resultado
 
-    def procesar_directorio(self, directorio, revista_nombre):
-        """Procesa todos los archivos de un directorio"""
+    def procesar_directorio(self, directorio, revista_nombre, revista_corta=None, agregado=None):
+        """Procesa los archivos de un directorio y los acumula en un agregado
+
+        Cada archivo se reduce a un agregado parcial (contadores y unos pocos
+        contextos de ejemplo) que se fusiona enseguida: la memoria no crece con
+        el número de menciones.
+        """
         print(f"\n🔍 Procesando {revista_nombre}...")
+        agregado = agregado if agregado is not None else AgregadoRevistas()
         
         directorio_path = Path(directorio)
-        archivos = list(directorio_path.glob("*.txt"))
+        archivos = filtrar_canonicos(sorted(directorio_path.glob("*.txt")))
         
-        resultados = []
+        procesados = 0
         for i, archivo in enumerate(archivos, 1):
             print(f"  📄 {i}/{len(archivos)}: {archivo.name}")
             resultado = self.procesar_archivo(archivo)
             if resultado:
-                resultados.append(resultado)
+                agregado.fusionar(AgregadoRevistas.desde_archivo(resultado, revista_corta or revista_nombre,
+                                                                 revista_nombre))
+                procesados += 1
         
-        print(f"✅ {revista_nombre}: {len(resultados)} archivos procesados")
-        return resultados
+        print(f"✅ {revista_nombre}: {procesados} archivos procesados")
+        return agregado
 
-    def consolidar_datos(self, datos_bilbao, datos_hispano):
-        """Consolida y analiza todos los datos"""
+    def consolidar_datos(self, agregado):
+        """Estructura final a partir del agregado de todas las revistas"""
         print("\n📊 Consolidando datos...")
+        archivos = agregado.archivos_por_revista
         
-        # Contadores globales
-        compositores_total = defaultdict(list)
-        interpretes_total = defaultdict(list)
-        generos_counter = Counter()
-        instrumentos_counter = Counter()
-        personas_genero = {'masculino': defaultdict(list), 'femenino': defaultdict(list)}
-        lugares_counter = Counter()
-        evolucion_temporal = defaultdict(lambda: defaultdict(int))
-        
-        # Procesar ambas revistas
-        for datos, revista in [(datos_bilbao, 'Bilbao'), (datos_hispano, 'Hispanoamericana')]:
-            for archivo_data in datos:
-                año = archivo_data['archivo']['año']
-                
-                # Compositores
-                for comp in archivo_data['compositores']:
-                    compositores_total[comp['nombre']].append({
-                        'revista': revista,
-                        'archivo': archivo_data['archivo'],
-                        'contexto': comp['contexto']
-                    })
-                    if año:
-                        evolucion_temporal[año]['compositores'] += 1
-                
-                # Intérpretes
-                for interp in archivo_data['interpretes']:
-                    interpretes_total[interp['nombre']].append({
-                        'revista': revista,
-                        'archivo': archivo_data['archivo'],
-                        'contexto': interp['contexto']
-                    })
-                    if año:
-                        evolucion_temporal[año]['interpretes'] += 1
-                
-                # Géneros
-                for genero in archivo_data['generos']:
-                    generos_counter[genero] += 1
-                
-                # Instrumentos
-                for instrumento in archivo_data['instrumentos']:
-                    instrumentos_counter[instrumento] += 1
-                
-                # Análisis de género
-                for genero in ['masculino', 'femenino']:
-                    for persona in archivo_data['genero_personas'][genero]:
-                        personas_genero[genero][persona['nombre']].append({
-                            'revista': revista,
-                            'archivo': archivo_data['archivo'],
-                            'contexto': persona['contexto']
-                        })
-                
-                # Lugares
-                for lugar in archivo_data['lugares']:
-                    lugares_counter[lugar] += 1
-                
-                if año:
-                    evolucion_temporal[año]['total'] += 1
-        
-        # Crear estructura final
         resultado_final = {
             'metadatos': {
                 'revistas_analizadas': ['Revista Musical de Bilbao', 'Revista Musical Hispanoamericana'],
                 'periodo': '1909-1917',
-                'total_archivos': len(datos_bilbao) + len(datos_hispano),
-                'archivos_bilbao': len(datos_bilbao),
-                'archivos_hispano': len(datos_hispano)
+                'total_archivos': sum(archivos.values()),
+                'archivos_bilbao': archivos.get('Revista Musical de Bilbao', 0),
+                'archivos_hispano': archivos.get('Revista Musical Hispanoamericana', 0)
             },
-            'compositores': dict(compositores_total),
-            'interpretes': dict(interpretes_total),
-            'generos_musicales': dict(generos_counter.most_common(20)),
-            'instrumentos': dict(instrumentos_counter.most_common(20)),
+            'compositores': agregado.menciones_con_ejemplos('compositores'),
+            'interpretes': agregado.menciones_con_ejemplos('interpretes'),
+            'generos_musicales': dict(agregado.generos.most_common(20)),
+            'instrumentos': dict(agregado.instrumentos.most_common(20)),
             'analisis_genero': {
-                'hombres': dict(personas_genero['masculino']),
-                'mujeres': dict(personas_genero['femenino'])
+                'hombres': agregado.menciones_con_ejemplos('masculino'),
+                'mujeres': agregado.menciones_con_ejemplos('femenino')
+            },
+            'lugares': dict(agregado.lugares.most_common(15)),
+            'evolucion_temporal': {
+                año: {clave: agregado.evolucion[año][clave] for clave in ('total', 'compositores', 'interpretes')}
+                for año in agregado.evolucion
             },
-            'lugares': dict(lugares_counter.most_common(15)),
-            'evolucion_temporal': dict(evolucion_temporal),
             'estadisticas_generales': {
-                'compositores_unicos': len(compositores_total),
-                'interpretes_unicos': len(interpretes_total),
-                'generos_diferentes': len(generos_counter),
-                'instrumentos_diferentes': len(instrumentos_counter),
-                'personas_masculinas': len(personas_genero['masculino']),
-                'personas_femeninas': len(personas_genero['femenino']),
-                'lugares_mencionados': len(lugares_counter)
+                'compositores_unicos': len(agregado.menciones['compositores']),
+                'interpretes_unicos': len(agregado.menciones['interpretes']),
+                'generos_diferentes': len(agregado.generos),
+                'instrumentos_diferentes': len(agregado.instrumentos),
+                'personas_masculinas': len(agregado.menciones['masculino']),
+                'personas_femeninas': len(agregado.menciones['femenino']),
+                'lugares_mencionados': len(agregado.lugares)
             }
         }
         
@@ -276,11 +308,11 @@ class AnalizadorRevistasMusicales:
         }
         
         # Top compositores
-        comp_counts = {nombre: len(menciones) for nombre, menciones in datos['compositores'].items()}
+        comp_counts = {nombre: entrada['menciones'] for nombre, entrada in datos['compositores'].items()}
         stats['compositores_top'] = sorted(comp_counts.items(), key=lambda x: x[1], reverse=True)[:10]
         
         # Top intérpretes
-        interp_counts = {nombre: len(menciones) for nombre, menciones in datos['interpretes'].items()}
+        interp_counts = {nombre: entrada['menciones'] for nombre, entrada in datos['interpretes'].items()}
         stats['interpretes_top'] = sorted(interp_counts.items(), key=lambda x: x[1], reverse=True)[:10]
         
         # Top géneros
@@ -299,8 +331,8 @@ class AnalizadorRevistasMusicales:
             })
         
         # Ratio de género
-        total_hombres = sum(len(menciones) for menciones in datos['analisis_genero']['hombres'].values())
-        total_mujeres = sum(len(menciones) for menciones in datos['analisis_genero']['mujeres'].values())
+        total_hombres = sum(entrada['menciones'] for entrada in datos['analisis_genero']['hombres'].values())
+        total_mujeres = sum(entrada['menciones'] for entrada in datos['analisis_genero']['mujeres'].values())
         
         stats['ratio_genero'] = {
             'hombres': total_hombres,
@@ -318,14 +350,13 @@ class AnalizadorRevistasMusicales:
         print("🎼 INICIANDO ANÁLISIS DE REVISTAS MUSICALES")
         print("=" * 50)
         
-        # Procesar Revista Musical de Bilbao
-        datos_bilbao = self.procesar_directorio(self.bilbao_dir, "Revista Musical de Bilbao")
-        
-        # Procesar Revista Musical Hispanoamericana
-        datos_hispano = self.procesar_directorio(self.hispano_dir, "Revista Musical Hispanoamericana")
+        # Cada revista se acumula en el mismo agregado, archivo a archivo
+        agregado = AgregadoRevistas()
+        for revista_nombre, revista_corta, directorio in self.revistas:
+            self.procesar_directorio(directorio, revista_nombre, revista_corta, agregado)
         
         # Consolidar datos
-        datos_consolidados = self.consolidar_datos(datos_bilbao, datos_hispano)
+        datos_consolidados = self.consolidar_datos(agregado)
         
         # Generar estadísticas resumidas
         estadisticas = self.generar_estadisticas_resumidas(datos_consolidados)
@@ -7,11 +7,27 @@ Statistical Analysis for Web Publishing
 
 import os
 import re
+import sys
 import json
 from collections import defaultdict, Counter
 from datetime import datetime
 import unicodedata
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from ngramas_colocaciones import contar_en_paralelo, SEMILLAS_POR_DEFECTO
+from clasificador_lotes import ClasificadorPorLotes
+
+# Keywords for the different content types (same order as results['themes_topics'])
+CONTENT_TYPE_KEYWORDS = {
+    'reviews_critiques': ['crítica', 'reseña', 'juicio', 'opinión', 'estreno', 'representación'],
+    'educational_content': ['enseñanza', 'método', 'estudio', 'ejercicio', 'lección', 'teoría'],
+    'news_announcements': ['noticia', 'anuncio', 'información', 'comunica', 'participa'],
+    'theory_articles': ['armonía', 'contrapunto', 'composición', 'técnica', 'forma'],
+    'composer_profiles': ['biografía', 'maestro', 'compositor', 'vida', 'obra'],
+    'advertisements': ['anuncio', 'venta', 'precio', 'almacén', 'casa editorial'],
+    'editorials': ['editorial', 'redacción', 'propósito', 'programa', 'misión']
+}
+
 class BoletinMusicalAnalyzer:
     def __init__(self, directory_path):
         self.directory_path = directory_path
@@ -49,6 +65,9 @@ class BoletinMusicalAnalyzer:
         
         # Define musical vocabulary dictionaries
         self.init_musical_vocabularies()
+        self.content_classifier = ClasificadorPorLotes(CONTENT_TYPE_KEYWORDS,
+                                                       etiqueta_por_defecto='unclassified',
+                                                       regla='maximo')
         
     def init_musical_vocabularies(self):
         """Initialize comprehensive musical vocabulary lists"""
@@ -229,35 +248,14 @@ class BoletinMusicalAnalyzer:
 
     def classify_content(self, text, filename):
         """Classify content type"""
-        cleaned_text = self.clean_text(text)
-        
-        # Keywords for different content types
-        review_keywords = ['crítica', 'reseña', 'juicio', 'opinión', 'estreno', 'representación']
-        educational_keywords = ['enseñanza', 'método', 'estudio', 'ejercicio', 'lección', 'teoría']
-        news_keywords = ['noticia', 'anuncio', 'información', 'comunica', 'participa']
-        theory_keywords = ['armonía', 'contrapunto', 'composición', 'técnica', 'forma']
-        composer_keywords = ['biografía', 'maestro', 'compositor', 'vida', 'obra']
-        ad_keywords = ['anuncio', 'venta', 'precio', 'almacén', 'casa editorial']
-        editorial_keywords = ['editorial', 'redacción', 'propósito', 'programa', 'misión']
-        
-        # Score each content type
-        scores = {
-            'reviews_critiques': sum(1 for kw in review_keywords if kw in cleaned_text),
-            'educational_content': sum(1 for kw in educational_keywords if kw in cleaned_text),
-            'news_announcements': sum(1 for kw in news_keywords if kw in cleaned_text),
-            'theory_articles': sum(1 for kw in theory_keywords if kw in cleaned_text),
-            'composer_profiles': sum(1 for kw in composer_keywords if kw in cleaned_text),
-            'advertisements': sum(1 for kw in ad_keywords if kw in cleaned_text),
-            'editorials': sum(1 for kw in editorial_keywords if kw in cleaned_text)
-        }
-        
-        # Classify based on highest score
-        if max(scores.values()) > 0:
-            content_type = max(scores, key=scores.get)
+        content_type = self.classify_contents([text])[0]
+        if content_type != 'unclassified':
             self.results['themes_topics'][content_type] += 1
-            return content_type
-        
-        return 'unclassified'
+        return content_type
+
+    def classify_contents(self, texts):
+        """Classify many issues at once: one keyword score per type, highest wins"""
+        return self.content_classifier.clasificar([self.clean_text(text) for text in texts])
 
     def analyze_file(self, filepath):
         """Analyze a single file"""
@@ -340,6 +338,14 @@ class BoletinMusicalAnalyzer:
         
         print("Analysis complete!")
 
+    def compute_ngram_statistics(self, seeds=None, processes=None):
+        """Compute 1-4 gram counts and seed collocations in bounded memory"""
+        txt_files = [os.path.join(self.directory_path, f)
+                     for f in os.listdir(self.directory_path) if f.endswith('.txt')]
+        counter = contar_en_paralelo(txt_files, procesos=processes,
+                                     semillas=seeds or SEMILLAS_POR_DEFECTO)
+        return counter.generar_informe()
+
     def generate_report(self):
         """Generate comprehensive analysis report"""
         report = f"""
@@ -8,11 +8,16 @@ Provides exact dates, word counts, and detailed musical lexicon analysis
 import os
 import re
 import json
+import sys
 import glob
-from collections import Counter, defaultdict
+from collections import Counter
 from datetime import datetime
 # import pandas as pd  # Not needed
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from ngramas_colocaciones import contar_en_paralelo, SEMILLAS_POR_DEFECTO
+from periodos_historicos import PERIODOS_PRENSA_MUSICAL
+
 class ComprehensiveMusicalMagazinesAnalyzer:
     def __init__(self, base_directory):
         self.base_directory = base_directory
@@ -202,70 +207,22 @@ class ComprehensiveMusicalMagazinesAnalyzer:
         
         return magazine_data
     
+    def magazine_start_years(self):
+        """Start year of each magazine, in the order of self.magazines_data"""
+        return [mag_data.get('actual_start_year') or mag_data.get('start_year')
+                for mag_data in self.magazines_data.values()]
+    
     def categorize_by_historical_periods(self):
         """Categorize magazines by historical periods"""
-        periods = {
-            'Romántico Temprano (1842-1870)': [],
-            'Romántico Tardío (1870-1900)': [],
-            'Modernista (1900-1930)': [],
-            'Vanguardia y Guerra Civil (1930-1960)': [],
-            'Desarrollismo y Transición (1960-1990)': [],
-            'Democracia y Era Digital (1990-2024)': []
-        }
-        
-        for mag_name, mag_data in self.magazines_data.items():
-            start_year = mag_data.get('actual_start_year') or mag_data.get('start_year')
-            if not start_year:
-                continue
-                
-            if start_year <= 1870:
-                periods['Romántico Temprano (1842-1870)'].append(mag_name)
-            elif start_year <= 1900:
-                periods['Romántico Tardío (1870-1900)'].append(mag_name)
-            elif start_year <= 1930:
-                periods['Modernista (1900-1930)'].append(mag_name)
-            elif start_year <= 1960:
-                periods['Vanguardia y Guerra Civil (1930-1960)'].append(mag_name)
-            elif start_year <= 1990:
-                periods['Desarrollismo y Transición (1960-1990)'].append(mag_name)
-            else:
-                periods['Democracia y Era Digital (1990-2024)'].append(mag_name)
-        
-        return periods
+        return PERIODOS_PRENSA_MUSICAL.agrupar(self.magazine_start_years(), list(self.magazines_data))
     
     def get_top_terms_by_period(self, n=10):
         """Get top N musical terms by historical period"""
-        periods_vocab = defaultdict(Counter)
-        
-        for mag_name, mag_data in self.magazines_data.items():
-            start_year = mag_data.get('actual_start_year') or mag_data.get('start_year')
-            if not start_year:
-                continue
-            
-            # Determine period
-            if start_year <= 1870:
-                period = 'Romántico Temprano (1842-1870)'
-            elif start_year <= 1900:
-                period = 'Romántico Tardío (1870-1900)'
-            elif start_year <= 1930:
-                period = 'Modernista (1900-1930)'
-            elif start_year <= 1960:
-                period = 'Vanguardia y Guerra Civil (1930-1960)'
-            elif start_year <= 1990:
-                period = 'Desarrollismo y Transición (1960-1990)'
-            else:
-                period = 'Democracia y Era Digital (1990-2024)'
-            
-            # Add vocabulary counts to period
-            for term, count in mag_data['vocabulary_counts'].items():
-                periods_vocab[period][term] += count
-        
-        # Get top N terms for each period
-        top_terms_by_period = {}
-        for period, vocab_counter in periods_vocab.items():
-            top_terms_by_period[period] = vocab_counter.most_common(n)
-        
-        return top_terms_by_period
+        return PERIODOS_PRENSA_MUSICAL.mas_frecuentes(
+            self.magazine_start_years(),
+            [mag_data['vocabulary_counts'] for mag_data in self.magazines_data.values()],
+            n
+        )
     
     def analyze_genre_evolution(self):
         """Analyze evolution of musical genres over time"""
@@ -281,6 +238,20 @@ class ComprehensiveMusicalMagazinesAnalyzer:
         
         return genre_evolution
     
+    def compute_ngram_statistics(self, seeds=None, processes=None):
+        """Compute 1-4 gram counts and seed collocations in bounded memory"""
+        filepaths = []
+        for item in os.listdir(self.base_directory):
+            item_path = os.path.join(self.base_directory, item)
+            if os.path.isdir(item_path) and ('TXT' in item or 'txt' in item):
+                for root, dirs, files in os.walk(item_path):
+                    filepaths.extend(os.path.join(root, f) for f in files if f.endswith('.txt'))
+        
+        print(f"Counting n-grams in {len(filepaths)} files...")
+        counter = contar_en_paralelo(filepaths, procesos=processes,
+                                     semillas=seeds or SEMILLAS_POR_DEFECTO)
+        return counter.generar_informe()
+    
     def run_comprehensive_analysis(self):
         """Run the complete analysis"""
         print("Starting comprehensive analysis of Spanish music magazines...")
@@ -7,11 +7,19 @@ Analyzing 3,079 text files across multiple collections
 
 import os
 import re
+import sys
 import json
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import unicodedata
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from duplicados_corpus import filtrar_canonicos
+
+SUM_KEYS = ('files_processed', 'total_words', 'male_names', 'female_names', 'spanish_composers', 'foreign_composers')
+COUNTER_KEYS = ('instruments', 'genres', 'venues', 'composers')
+
 class SpanishMagazineAnalyzer:
     def __init__(self, base_path):
         self.base_path = Path(base_path)
@@ -184,16 +192,10 @@ class SpanishMagazineAnalyzer:
             
         return spanish_mentions, foreign_mentions
 
-    def analyze_magazine(self, magazine_name, directory_name):
-        """Analyze a single magazine collection"""
-        print(f"Analyzing {magazine_name}...")
-        
-        magazine_path = self.base_path / directory_name
-        if not magazine_path.exists():
-            print(f"Directory not found: {magazine_path}")
-            return None
-            
-        results = {
+    @staticmethod
+    def new_results(magazine_name=None, directory_name=None):
+        """Empty accumulator for a magazine (or for a batch of its files)"""
+        return {
             'name': magazine_name,
             'directory': directory_name,
             'files_processed': 0,
@@ -209,6 +211,28 @@ class SpanishMagazineAnalyzer:
             'years_covered': set(),
             'file_details': []
         }
+
+    @staticmethod
+    def merge_results(results, partial):
+        """Add a partial (one file or a batch) to an accumulator
+
+        Counters are updated in file order, so ties in most_common() come out
+        exactly as in a serial run.
+        """
+        for key in SUM_KEYS:
+            results[key] += partial[key]
+        for key in COUNTER_KEYS:
+            results[key].update(partial[key])
+        results['years_covered'].update(partial['years_covered'])
+        results['file_details'].extend(partial['file_details'])
+        return results
+
+    def magazine_files(self, magazine_name, directory_name):
+        """Files of a magazine in processing order (None if the directory is missing)"""
+        magazine_path = self.base_path / directory_name
+        if not magazine_path.exists():
+            print(f"Directory not found: {magazine_path}")
+            return None
         
         # Find all text files (both .txt and files without extension for Triunfo)
         if magazine_name == "Revista Triunfo":
@@ -217,66 +241,110 @@ class SpanishMagazineAnalyzer:
             files = list(magazine_path.glob("*.txt"))
             
         files.sort()
-        
-        for file_path in files:
-            try:
-                # Read file content
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    
-                if not content.strip():  # Skip empty files
-                    continue
-                    
-                results['files_processed'] += 1
-                word_count = len(content.split())
-                results['total_words'] += word_count
-                
-                # Extract dates
-                year, month = self.extract_dates_from_filename(file_path.name)
-                if year:
-                    results['years_covered'].add(year)
-                
-                # Count musical elements
-                musical_counts = self.count_musical_elements(content)
-                for category, counter in musical_counts.items():
-                    results[category].update(counter)
-                
-                # Gender analysis
-                male, female = self.analyze_gender(content)
-                results['male_names'] += male
-                results['female_names'] += female
-                
-                # Spanish vs foreign analysis
-                spanish, foreign = self.analyze_spanish_vs_foreign(content)
-                results['spanish_composers'] += spanish
-                results['foreign_composers'] += foreign
+        # Near-duplicate transcripts (OCR re-runs, re-downloads) are counted once
+        return filtrar_canonicos(files)
+
+    def analyze_file(self, file_path):
+        """Partial results for a single file (None if it is empty or unreadable)"""
+        try:
+            # Read file content
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
                 
-                # Store file details
-                results['file_details'].append({
-                    'filename': file_path.name,
-                    'words': word_count,
-                    'year': year,
-                    'month': month
-                })
+            if not content.strip():  # Skip empty files
+                return None
                 
-            except Exception as e:
-                print(f"Error processing {file_path}: {e}")
-                continue
-        
-        # Convert years set to sorted list
+            partial = self.new_results()
+            partial['files_processed'] = 1
+            word_count = len(content.split())
+            partial['total_words'] = word_count
+            
+            # Extract dates
+            year, month = self.extract_dates_from_filename(file_path.name)
+            if year:
+                partial['years_covered'].add(year)
+            
+            # Count musical elements
+            musical_counts = self.count_musical_elements(content)
+            for category, counter in musical_counts.items():
+                partial[category].update(counter)
+            
+            # Gender analysis
+            partial['male_names'], partial['female_names'] = self.analyze_gender(content)
+            
+            # Spanish vs foreign analysis
+            partial['spanish_composers'], partial['foreign_composers'] = self.analyze_spanish_vs_foreign(content)
+            
+            # Store file details
+            partial['file_details'].append({
+                'filename': file_path.name,
+                'words': word_count,
+                'year': year,
+                'month': month
+            })
+            return partial
+            
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+            return None
+
+    def finish_magazine(self, results):
+        """Convert years set to sorted list and report the totals"""
         results['years_covered'] = sorted(list(results['years_covered']))
-        
-        print(f"Completed {magazine_name}: {results['files_processed']} files, {results['total_words']:,} words")
+        print(f"Completed {results['name']}: {results['files_processed']} files, {results['total_words']:,} words")
         return results
 
-    def run_analysis(self):
-        """Run complete analysis of all requested magazines"""
+    def analyze_magazine(self, magazine_name, directory_name):
+        """Analyze a single magazine collection"""
+        print(f"Analyzing {magazine_name}...")
+        
+        files = self.magazine_files(magazine_name, directory_name)
+        if files is None:
+            return None
+            
+        results = self.new_results(magazine_name, directory_name)
+        for file_path in files:
+            partial = self.analyze_file(file_path)
+            if partial:
+                self.merge_results(results, partial)
+        
+        return self.finish_magazine(results)
+
+    def run_analysis(self, processes=None, files_per_batch=50):
+        """Run complete analysis of all requested magazines
+
+        Batches of files from every magazine are spread over a process pool
+        (processes=1 runs serially). Partials are merged in file order, so
+        self.results and the report match a serial run exactly.
+        """
         print("Starting comprehensive analysis of Spanish musical magazines...")
         
-        for magazine_name, directory_name in self.target_magazines.items():
-            result = self.analyze_magazine(magazine_name, directory_name)
-            if result:
-                self.results[magazine_name] = result
+        if processes == 1:
+            for magazine_name, directory_name in self.target_magazines.items():
+                result = self.analyze_magazine(magazine_name, directory_name)
+                if result:
+                    self.results[magazine_name] = result
+            return self.results
+        
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(str(self.base_path),)) as executor:
+            # Fan out: every batch of every magazine is queued before any merge
+            pending = []
+            for magazine_name, directory_name in self.target_magazines.items():
+                print(f"Analyzing {magazine_name}...")
+                files = self.magazine_files(magazine_name, directory_name)
+                if files is None:
+                    continue
+                batches = [[str(f) for f in files[i:i + files_per_batch]]
+                           for i in range(0, len(files), files_per_batch)]
+                pending.append((magazine_name, directory_name,
+                                [executor.submit(_analyze_batch, batch) for batch in batches]))
+            
+            for magazine_name, directory_name, futures in pending:
+                results = self.new_results(magazine_name, directory_name)
+                for future in futures:
+                    self.merge_results(results, future.result())
+                self.results[magazine_name] = self.finish_magazine(results)
         
         return self.results
 
@@ -380,6 +448,22 @@ class SpanishMagazineAnalyzer:
         
         return "\n".join(report)
 
+# Worker side of the parallel runner: one analyzer per process
+_worker = None
+
+def _init_worker(base_path):
+    global _worker
+    _worker = SpanishMagazineAnalyzer(base_path)
+
+def _analyze_batch(paths):
+    """Merged partial results of a batch of files, in order"""
+    batch = SpanishMagazineAnalyzer.new_results()
+    for path in paths:
+        partial = _worker.analyze_file(Path(path))
+        if partial:
+            SpanishMagazineAnalyzer.merge_results(batch, partial)
+    return batch
+
 def main():
     base_path = "/Users/maria/Desktop/REVISTAS TXT PARA WEBS ESTADÍSTICAS"
     analyzer = SpanishMagazineAnalyzer(base_path)
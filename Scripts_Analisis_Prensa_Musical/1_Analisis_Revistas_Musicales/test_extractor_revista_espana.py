@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Comprobación de la extracción en una sola pasada de la Revista ESPAÑA
+Compara, archivo por archivo, extraer_en_una_pasada() con los métodos
+originales (fecha, autores, menciones musicales y palabras) y mide el tiempo
+de ambos sobre el corpus
+
+Uso: python3 test_extractor_revista_espana.py [directorio_textos]
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import sys
+import glob
+import time
+
+from analizador_revista_espana import AnalizadorRevistaEspana, saltos_universales
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from almacen_corpus import leer_bytes_texto
+
+DIRECTORIO_TEXTOS = "/Users/maria/Desktop/Música en la revista ESPAÑA/REVISTA ESPAÑA en TXT SOLO MÚSICA"
+
+# Casos límite de los patrones originales, además del corpus
+CASOS_LIMITE = [
+    "",
+    "1917",
+    "AÑO III, NÚM. 45\nsin año de cuatro cifras",
+    "123 de Marzo de 19175 y luego 4 de abril de 1918",
+    "5 de la de 1920, después 7 MAYO 1921",
+    "a12 junio 1919 ORQUESTA\nTEATRO REAL.\n\nPOR Juan Pérez3 García y POR Ana-María",
+    "LÍNEA EN MAYÚSCULAS SIN FIN DE LÍNEA seguida de minúsculas\nOTRA\n",
+    "Firmado: Manuel Falla\nFirmado Enrique Granados\r\nMADRID.\r\n",
+    "Los violinistas y el violín; la zarzuela, las zarzuelas y la ópera; compás y compases",
+    "1→ línea numerada\n  2→ otra línea con piano\n\n3→ y organo",
+    "İstanbul y 10 K de notas: opera, piano, coro",
+    "8 DICIEMBRE 1923 ― ESPAÑA ― POR Luis Araquistáin",
+]
+
+
+def extraer_original(analizador, contenido):
+    return {
+        'fecha': analizador.extraer_fecha_contenido(contenido),
+        'autores': analizador.extraer_autores(contenido),
+        'menciones_musicales': analizador.analizar_contenido_musical(contenido),
+        'num_palabras': analizador.contar_palabras(contenido)
+    }
+
+
+def diferencias(original, nuevo):
+    """Campos que no coinciden (también el orden de las menciones, que llega al JSON)"""
+    campos = []
+    for campo in ('fecha', 'num_palabras', 'autores'):
+        if original[campo] != nuevo[campo]:
+            campos.append(campo)
+    if list(original['menciones_musicales'].items()) != list(nuevo['menciones_musicales'].items()):
+        campos.append('menciones_musicales')
+    return campos
+
+
+def main():
+    directorio = sys.argv[1] if len(sys.argv) > 1 else DIRECTORIO_TEXTOS
+    analizador = AnalizadorRevistaEspana(directorio)
+
+    textos = [(f"caso límite {i}", caso) for i, caso in enumerate(CASOS_LIMITE)]
+    rutas = sorted(glob.glob(os.path.join(directorio, "*.txt")))
+    if not rutas:
+        print(f"⚠️  No hay textos en {directorio}: solo se comprueban los casos límite")
+    for ruta in rutas:
+        try:
+            textos.append((os.path.basename(ruta), saltos_universales(leer_bytes_texto(ruta).decode('utf-8'))))
+        except UnicodeDecodeError:
+            continue  # procesar_archivo también los descarta
+
+    print(f"Comprobando {len(textos)} textos...")
+    errores = 0
+    for nombre, contenido in textos:
+        campos = diferencias(extraer_original(analizador, contenido), analizador.extraer_en_una_pasada(contenido))
+        if campos:
+            errores += 1
+            print(f"❌ {nombre}: difiere en {', '.join(campos)}")
+    if errores:
+        print(f"❌ {errores} textos con resultados distintos")
+        sys.exit(1)
+    print("✅ Resultados idénticos en todos los textos")
+
+    # Rendimiento: la caché de tokens se vacía para no favorecer a la versión nueva
+    contenidos = [contenido for _, contenido in textos]
+    inicio = time.perf_counter()
+    for contenido in contenidos:
+        extraer_original(analizador, contenido)
+    tiempo_original = time.perf_counter() - inicio
+
+    analizador._cache_tokens.clear()
+    inicio = time.perf_counter()
+    for contenido in contenidos:
+        analizador.extraer_en_una_pasada(contenido)
+    tiempo_nuevo = time.perf_counter() - inicio
+
+    megas = sum(len(c) for c in contenidos) / 1e6
+    print(f"⏱️  Original:        {tiempo_original:.2f} s ({megas / max(tiempo_original, 1e-9):.1f} MB/s)")
+    print(f"⏱️  Una sola pasada: {tiempo_nuevo:.2f} s ({megas / max(tiempo_nuevo, 1e-9):.1f} MB/s)")
+    print(f"🚀 Aceleración: x{tiempo_original / max(tiempo_nuevo, 1e-9):.1f}")
+
+
+if __name__ == "__main__":
+    main()
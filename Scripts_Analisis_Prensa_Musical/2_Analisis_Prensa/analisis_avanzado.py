@@ -4,11 +4,16 @@ Análisis avanzado para detectar patrones específicos en El Sol
 Enfoque en género, raza y tratamiento diferencial
 """
 
+import os
+import sys
 import json
 import re
 from collections import defaultdict, Counter
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from periodos_historicos import PERIODOS_HISTORIA_ESPANA
+
 class AnalisisAvanzado:
     def __init__(self, directorio_textos):
         self.directorio = Path(directorio_textos)
@@ -308,6 +313,13 @@ class AnalisisAvanzado:
         reporte.append("🌍 ANÁLISIS DE DIVERSIDAD RACIAL Y ÉTNICA")
         reporte.append("-" * 50)
         
+        # Menciones de cada categoría por período histórico, en una sola reducción agrupada
+        pares = [(año, {categoria: n})
+                 for categoria, por_año in analisis_diversidad['evolucion_temporal'].items()
+                 for año, n in por_año.items()]
+        menciones_por_periodo = PERIODOS_HISTORIA_ESPANA.acumular([año for año, _ in pares],
+                                                                  [recuento for _, recuento in pares])
+        
         for categoria, menciones in analisis_diversidad['por_categoria'].items():
             if menciones:
                 reporte.append(f"{categoria.upper()}: {len(menciones)} menciones")
@@ -334,6 +346,12 @@ class AnalisisAvanzado:
                         cambio = ((periodo_final - periodo_inicial) / periodo_inicial) * 100
                         reporte.append(f"  - Cambio temporal: {cambio:+.1f}% (inicio vs final)")
                 
+                por_periodo = [(periodo, menciones_por_periodo[periodo][categoria])
+                               for periodo in PERIODOS_HISTORIA_ESPANA.nombres
+                               if menciones_por_periodo.get(periodo, {}).get(categoria)]
+                if por_periodo:
+                    reporte.append("  - Por período: " + ", ".join(f"{periodo} {n}" for periodo, n in por_periodo))
+                
                 reporte.append("")
         
         # Conclusiones
@@ -7,9 +7,13 @@ Proyecto LexiMus - Universidad de Salamanca
 
 import os
 import re
+import sys
 import json
 from collections import defaultdict
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from ngramas_colocaciones import contar_en_paralelo, semillas_desde_patrones
+
 class AnalizadorElArtista:
     def __init__(self, directorio_base):
         self.directorio_base = directorio_base
@@ -203,6 +207,20 @@ class AnalizadorElArtista:
 
         return resultados_finales
 
+    def calcular_ngramas_colocaciones(self, procesos=None):
+        """Cuenta n-gramas (1-4) y colocaciones de los términos de cada tema"""
+        semillas = []
+        for tema_data in self.temas_musicales.values():
+            for semilla in semillas_desde_patrones(tema_data['terminos']):
+                if semilla not in semillas:
+                    semillas.append(semilla)
+
+        archivos_txt = [os.path.join(self.directorio_base, archivo)
+                        for archivo in os.listdir(self.directorio_base)
+                        if archivo.endswith('.txt') and not archivo.startswith('.')]
+        contador = contar_en_paralelo(archivos_txt, procesos=procesos, semillas=semillas)
+        return contador.generar_informe()
+
     def _contar_frecuencias(self, lista_palabras):
         """Cuenta frecuencias de términos encontrados"""
         frecuencias = defaultdict(int)
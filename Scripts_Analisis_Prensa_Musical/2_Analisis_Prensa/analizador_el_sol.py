@@ -5,7 +5,7 @@ Extrae información sobre compositores, intérpretes, géneros y análisis de g
 """
 
 import os
-import re
+import sys
 import json
 import glob
 from pathlib import Path
@@ -13,9 +13,43 @@ from datetime import datetime
 from collections import defaultdict, Counter
 import unicodedata
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from catalogo_corpus import analizar_nombre, abrir_catalogo
+from almacen_corpus import leer_texto, listar_textos_corpus
+from duplicados_corpus import filtrar_canonicos
+from registro_patrones import patron, terminos
+from documentos_grandes import DocumentoMapeado, es_documento_grande
+
+# Patrones compilados una vez al importar (antes se reconstruían en cada archivo)
+NOMBRE = r'[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+'
+PATRON_NOMBRES_PROPIOS = patron('el_sol.nombres_propios', rf'\b{NOMBRE}(?:\s+{NOMBRE})*\b')
+
+# Como "el pianista X", "X, soprano" o "Sra. X"
+PATRONES_INTERPRETES = [
+    patron('el_sol.interpretes.oficio_nombre',
+           rf'(?:el|la)\s+(pianista|violinista|soprano|tenor|barítono|bajo|directora?)\s+({NOMBRE}(?:\s+{NOMBRE})*)'),
+    patron('el_sol.interpretes.nombre_oficio',
+           rf'({NOMBRE}(?:\s+{NOMBRE})*),\s+(pianista|violinista|soprano|tenor|barítono|bajo)'),
+    patron('el_sol.interpretes.tratamiento', rf'(?:Sra?\.|Srta?\.|D\.?|Dña\.?)\s+({NOMBRE}(?:\s+{NOMBRE})*)')
+]
+
+# Nombres con títulos de género
+PATRONES_HOMBRES = [
+    patron('el_sol.hombres.tratamiento', rf'\b(?:Sr\.|Don|D\.)\s+({NOMBRE}(?:\s+{NOMBRE})*)'),
+    patron('el_sol.hombres.oficio', rf'\b(maestro|profesor|director)\s+({NOMBRE})'),
+    patron('el_sol.hombres.voz', rf'\b({NOMBRE}),\s+(?:tenor|barítono|bajo)')
+]
+PATRONES_MUJERES = [
+    patron('el_sol.mujeres.tratamiento', rf'\b(?:Sra?\.|Srta?\.|Dña?\.|Doña)\s+({NOMBRE}(?:\s+{NOMBRE})*)'),
+    patron('el_sol.mujeres.oficio', rf'\b(maestra|profesora|directora)\s+({NOMBRE})'),
+    patron('el_sol.mujeres.voz', rf'\b({NOMBRE}),\s+(?:soprano|mezzosoprano|contralto)')
+]
+
 class AnalizadorElSol:
-    def __init__(self, directorio_textos):
+    def __init__(self, directorio_textos, catalogo=None):
         self.directorio = Path(directorio_textos)
+        # Catálogo del corpus opcional (CatalogoCorpus o ruta a su base de datos)
+        self.catalogo = abrir_catalogo(catalogo)
         self.resultados = {
             'compositores': defaultdict(list),
             'interpretes': defaultdict(list),
@@ -80,9 +114,19 @@ class AnalizadorElSol:
             'oriental', 'chino', 'japonés', 'indio', 'americano', 'argentino',
             'cubano', 'brasileño', 'mexicano', 'ruso', 'polaco', 'húngaro'
         }
+        
+        # Compositores y términos de diversidad buscados en una sola pasada por texto
+        self.detector_compositores = terminos('el_sol.compositores', sorted(self.compositores_conocidos))
+        self.detector_diversidad = terminos('el_sol.diversidad', sorted(self.terminos_diversidad))
+        # Términos que se buscan en el texto normalizado (recuentos por ventanas en documentos grandes)
+        self.vocabulario_normalizado = (self.compositores_conocidos | self.generos | self.terminos_masculinos
+                                        | self.terminos_femeninos | self.terminos_diversidad)
     
     def limpiar_texto(self, texto):
         """Limpia y normaliza el texto"""
+        if isinstance(texto, DocumentoMapeado):
+            # Sin copiar el documento: recuentos del vocabulario sobre el texto normalizado
+            return texto.normalizado(self.limpiar_texto, self.vocabulario_normalizado)
         # Normalizar caracteres unicode
         texto = unicodedata.normalize('NFKD', texto)
         # Convertir a minúsculas para análisis
@@ -90,20 +134,19 @@ class AnalizadorElSol:
     
     def extraer_nombres_propios(self, texto):
         """Extrae nombres propios del texto"""
-        # Patrón para nombres (mayúscula seguida de minúsculas)
-        patron_nombres = r'\b[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*\b'
-        nombres = re.findall(patron_nombres, texto)
+        # Nombres: mayúscula seguida de minúsculas
+        nombres = PATRON_NOMBRES_PROPIOS.findall(texto)
         return [nombre for nombre in nombres if len(nombre.split()) <= 3]
     
     def analizar_compositores(self, texto, archivo):
         """Analiza compositores mencionados"""
         texto_limpio = self.limpiar_texto(texto)
+        posiciones = self.detector_compositores.posiciones(texto)
         
         for compositor in self.compositores_conocidos:
             if compositor in texto_limpio:
                 # Buscar el contexto original con mayúsculas
-                patron = re.compile(rf'\b{re.escape(compositor)}\b', re.IGNORECASE)
-                matches = patron.findall(texto)
+                matches = [texto[inicio:fin] for inicio, fin in posiciones.get(compositor, ())]
                 for match in matches:
                     self.resultados['compositores'][match.title()].append({
                         'archivo': archivo,
@@ -113,14 +156,10 @@ class AnalizadorElSol:
     def analizar_interpretes(self, texto, archivo):
         """Analiza intérpretes y músicos mencionados"""
         # Buscar patrones como "el pianista X", "la soprano Y", etc.
-        patrones_interpretes = [
-            r'(?:el|la)\s+(pianista|violinista|soprano|tenor|barítono|bajo|directora?)\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)',
-            r'([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*),\s+(pianista|violinista|soprano|tenor|barítono|bajo)',
-            r'(?:Sra?\.|Srta?\.|D\.?|Dña\.?)\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)'
-        ]
+        patrones_interpretes = PATRONES_INTERPRETES
         
         for patron in patrones_interpretes:
-            matches = re.finditer(patron, texto)
+            matches = patron.finditer(texto)
             for match in matches:
                 if len(match.groups()) >= 2:
                     nombre = match.group(2) if patron == patrones_interpretes[0] else match.group(1)
@@ -159,20 +198,11 @@ class AnalizadorElSol:
                 self.resultados['analisis_genero']['terminos_femeninos'][termino] += count
         
         # Detectar nombres con títulos de género
-        patrones_hombres = [
-            r'\b(?:Sr\.|Don|D\.)\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)',
-            r'\b(maestro|profesor|director)\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)',
-            r'\b([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+),\s+(?:tenor|barítono|bajo)'
-        ]
-        
-        patrones_mujeres = [
-            r'\b(?:Sra?\.|Srta?\.|Dña?\.|Doña)\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)',
-            r'\b(maestra|profesora|directora)\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)',
-            r'\b([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+),\s+(?:soprano|mezzosoprano|contralto)'
-        ]
+        patrones_hombres = PATRONES_HOMBRES
+        patrones_mujeres = PATRONES_MUJERES
         
         for patron in patrones_hombres:
-            matches = re.finditer(patron, texto)
+            matches = patron.finditer(texto)
             for match in matches:
                 nombre = match.group(1) if match.lastindex == 1 else match.group(2)
                 self.resultados['analisis_genero']['hombres'][nombre].append({
@@ -181,7 +211,7 @@ class AnalizadorElSol:
                 })
         
         for patron in patrones_mujeres:
-            matches = re.finditer(patron, texto)
+            matches = patron.finditer(texto)
             for match in matches:
                 nombre = match.group(1) if match.lastindex == 1 else match.group(2)
                 self.resultados['analisis_genero']['mujeres'][nombre].append({
@@ -192,18 +222,20 @@ class AnalizadorElSol:
     def analizar_diversidad_racial(self, texto, archivo):
         """Analiza menciones de diversidad racial/étnica"""
         texto_limpio = self.limpiar_texto(texto)
+        posiciones = self.detector_diversidad.posiciones(texto)
         
         for termino in self.terminos_diversidad:
             if termino in texto_limpio:
-                matches = re.finditer(rf'\b{re.escape(termino)}\b', texto, re.IGNORECASE)
-                for match in matches:
+                for inicio, fin in posiciones.get(termino, ()):
                     self.resultados['diversidad_racial'][termino].append({
                         'archivo': archivo,
-                        'contexto': self.extraer_contexto(texto, match.group(0), 200)
+                        'contexto': self.extraer_contexto(texto, texto[inicio:fin], 200)
                     })
     
     def extraer_contexto(self, texto, termino, longitud=100):
         """Extrae contexto alrededor de un término"""
+        if isinstance(texto, DocumentoMapeado):
+            return self.extraer_contexto_mapeado(texto, termino, longitud)
         pos = texto.lower().find(termino.lower())
         if pos == -1:
             return ""
@@ -219,24 +251,42 @@ class AnalizadorElSol:
         
         return contexto.strip()
     
+    def extraer_contexto_mapeado(self, documento, termino, longitud=100):
+        """extraer_contexto sobre un documento mapeado: solo se decodifica el contexto"""
+        pos = documento.buscar_minusculas(termino)
+        if pos == -1:
+            return ""
+        
+        inicio = documento.retroceder(pos, longitud//2)
+        fin = documento.avanzar(pos, len(termino) + longitud//2)
+        
+        contexto = documento[inicio:fin]
+        if inicio > 0:
+            contexto = "..." + contexto
+        if fin < len(documento):
+            contexto = contexto + "..."
+        
+        return contexto.strip()
+    
     def procesar_archivo(self, ruta_archivo):
         """Procesa un archivo individual"""
         try:
-            with open(ruta_archivo, 'r', encoding='utf-8', errors='ignore') as f:
-                contenido = f.read()
-            
             archivo_info = {
                 'nombre': ruta_archivo.name,
                 'ruta': str(ruta_archivo),
                 'año': self.extraer_año(ruta_archivo.name)
             }
             
-            # Realizar todos los análisis
-            self.analizar_compositores(contenido, archivo_info)
-            self.analizar_interpretes(contenido, archivo_info)
-            self.analizar_generos_musicales(contenido, archivo_info)
-            self.analizar_genero_social(contenido, archivo_info)
-            self.analizar_diversidad_racial(contenido, archivo_info)
+            if es_documento_grande(ruta_archivo):
+                # Volcados de decenas de megas: se analizan sobre el mmap, sin leerlos en un str
+                # (con saltos \r\n o \r no, porque leer_texto() los convierte en \n)
+                with DocumentoMapeado(ruta_archivo) as documento:
+                    if documento.utf8_valido() and documento.sin_retornos():
+                        self.analizar_contenido(documento, archivo_info)
+                        return True
+            
+            contenido = leer_texto(ruta_archivo)
+            self.analizar_contenido(contenido, archivo_info)
             
             return True
             
@@ -244,14 +294,26 @@ class AnalizadorElSol:
             print(f"Error procesando {ruta_archivo}: {e}")
             return False
     
+    def analizar_contenido(self, contenido, archivo_info):
+        """Realiza todos los análisis sobre un texto o un documento mapeado"""
+        self.analizar_compositores(contenido, archivo_info)
+        self.analizar_interpretes(contenido, archivo_info)
+        self.analizar_generos_musicales(contenido, archivo_info)
+        self.analizar_genero_social(contenido, archivo_info)
+        self.analizar_diversidad_racial(contenido, archivo_info)
+    
     def extraer_año(self, nombre_archivo):
         """Extrae el año del nombre del archivo"""
-        match = re.search(r'(\d{4})', nombre_archivo)
-        return int(match.group(1)) if match else None
+        return analizar_nombre(nombre_archivo)['año']
     
     def procesar_todos_los_archivos(self):
         """Procesa todos los archivos TXT en el directorio"""
-        archivos_txt = list(self.directorio.rglob("*.txt"))
+        if self.catalogo:
+            archivos_txt = [Path(ruta) for ruta in self.catalogo.rutas(directorio=self.directorio, tipo='texto')]
+        else:
+            # Archivos sueltos o almacén empaquetado (<directorio>.lxc)
+            archivos_txt = [Path(ruta) for ruta in listar_textos_corpus(self.directorio)]
+        archivos_txt = filtrar_canonicos(archivos_txt)
         total_archivos = len(archivos_txt)
         procesados = 0
         
@@ -7,11 +7,31 @@ Enfocado en 6 temas musicales específicos
 """
 
 import os
+import sys
 import re
 import json
 from collections import defaultdict, Counter
 from datetime import datetime
-import glob
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from catalogo_corpus import analizar_nombre
+from almacen_corpus import leer_texto, listar_textos_corpus, almacen_de_directorio
+from duplicados_corpus import filtrar_canonicos
+from ventanas_corpus import requiere_ventanas, dividir_en_ventanas, procesar_en_ventanas
+
+_analizador_ventanas = None
+
+def _iniciar_trabajador_ventanas(patrones):
+    global _analizador_ventanas
+    _analizador_ventanas = AnalizadorIberiaMusical(None)
+    _analizador_ventanas.temas_musicales = {tema: {'patrones': lista} for tema, lista in patrones.items()}
+
+def _menciones_ventana(ventana):
+    """Trabajador: caracteres y palabras del núcleo y sus menciones, con posiciones relativas a él"""
+    texto, desde, hasta = ventana.leer(errors='strict')
+    menciones = [(tema, patron, [(inicio - desde,) + tuple(resto) for inicio, *resto in encontradas])
+                 for tema, patron, encontradas in _analizador_ventanas.buscar_menciones(texto, desde, hasta)]
+    return hasta - desde, len(texto[desde:hasta].split()), menciones
 
 class AnalizadorIberiaMusical:
     def __init__(self, directorio_base):
@@ -93,10 +113,9 @@ class AnalizadorIberiaMusical:
 
     def extraer_fecha_archivo(self, nombre_archivo):
         """Extrae la fecha del nombre del archivo"""
-        match = re.search(r'(\d{4})_(\d{2})_(\d{2})', nombre_archivo)
-        if match:
-            año, mes, dia = match.groups()
-            return f"{dia}/{mes}/{año}", int(año)
+        datos = analizar_nombre(nombre_archivo)
+        if datos['dia']:
+            return f"{datos['dia']:02d}/{datos['mes']:02d}/{datos['año']}", datos['año']
         return None, None
 
     def extraer_contexto(self, texto, posicion, ventana=150):
@@ -112,11 +131,58 @@ class AnalizadorIberiaMusical:
             if palabra.lower() in contexto_lower:
                 self.temas_musicales[tema]['vocabulario_asociado'][palabra] += 1
 
+    def buscar_menciones(self, contenido, desde=0, hasta=None):
+        """Menciones de cada tema y patrón que empiezan en contenido[desde:hasta]
+
+        Devuelve [(tema, patron, [(inicio, texto, contexto, contexto_previo, contexto_posterior)])]
+        en el orden de temas y patrones.
+        """
+        hasta = len(contenido) if hasta is None else hasta
+        menciones = []
+        for tema, datos in self.temas_musicales.items():
+            for patron in datos['patrones']:
+                encontradas = []
+                for match in re.finditer(patron, contenido, re.IGNORECASE):
+                    if desde <= match.start() < hasta:
+                        encontradas.append((match.start(), match.group(),
+                                            self.extraer_contexto(contenido, match.start()),
+                                            contenido[max(0, match.start()-50):match.start()],
+                                            contenido[match.end():match.end()+50]))
+                menciones.append((tema, patron, encontradas))
+        return menciones
+
+    def buscar_menciones_en_ventanas(self, ruta_archivo, procesos=None):
+        """Palabras y menciones de un archivo enorme, buscadas por ventanas en paralelo
+
+        Los márgenes de las ventanas cubren los contextos de 150 caracteres y cada
+        mención se busca en la ventana cuyo núcleo la contiene, así que el resultado
+        es el de buscar_menciones() sobre el texto completo (los patrones no pueden
+        solaparse consigo mismos).
+        """
+        patrones = {tema: datos['patrones'] for tema, datos in self.temas_musicales.items()}
+        parciales = procesar_en_ventanas(dividir_en_ventanas(ruta_archivo), _menciones_ventana, procesos,
+                                         _iniciar_trabajador_ventanas, (patrones,))
+
+        palabras = 0
+        base = 0
+        menciones = [(tema, patron, []) for tema, lista in patrones.items() for patron in lista]
+        for caracteres, palabras_ventana, menciones_ventana in parciales:
+            palabras += palabras_ventana
+            for (_, _, todas), (_, _, encontradas) in zip(menciones, menciones_ventana):
+                todas.extend((base + inicio,) + tuple(resto) for inicio, *resto in encontradas)
+            base += caracteres
+        return palabras, menciones
+
     def procesar_archivo(self, ruta_archivo):
         """Procesa un archivo individual"""
         try:
-            with open(ruta_archivo, 'r', encoding='utf-8') as f:
-                contenido = f.read()
+            if requiere_ventanas(ruta_archivo):
+                # Archivos enormes: ventanas solapadas repartidas entre procesos
+                palabras, menciones = self.buscar_menciones_en_ventanas(ruta_archivo)
+            else:
+                contenido = leer_texto(ruta_archivo, errors='strict')
+                palabras = len(contenido.split())
+                menciones = self.buscar_menciones(contenido)
 
             nombre_archivo = os.path.basename(ruta_archivo)
             fecha_str, año = self.extraer_fecha_archivo(nombre_archivo)
@@ -127,42 +193,39 @@ class AnalizadorIberiaMusical:
                     self.estadisticas_generales['fechas_cubiertas'].append(fecha_str)
 
             # Contar palabras totales
-            palabras = len(contenido.split())
             self.estadisticas_generales['total_palabras'] += palabras
 
             archivo_tiene_menciones = False
 
-            # Buscar cada tema musical
-            for tema, datos in self.temas_musicales.items():
-                for patron in datos['patrones']:
-                    matches = list(re.finditer(patron, contenido, re.IGNORECASE))
-
-                    if matches:
-                        archivo_tiene_menciones = True
-                        datos['total_menciones'] += len(matches)
-
-                        if nombre_archivo not in datos['archivos_con_menciones']:
-                            datos['archivos_con_menciones'].append(nombre_archivo)
-
-                        for match in matches:
-                            contexto = self.extraer_contexto(contenido, match.start())
-                            datos['contextos'].append({
-                                'archivo': nombre_archivo,
-                                'fecha': fecha_str or 'Sin fecha',
-                                'contexto': contexto,
-                                'posicion': match.start()
-                            })
-
-                            datos['menciones'].append({
-                                'texto': match.group(),
-                                'archivo': nombre_archivo,
-                                'fecha': fecha_str or 'Sin fecha',
-                                'contexto_previo': contenido[max(0, match.start()-50):match.start()],
-                                'contexto_posterior': contenido[match.end():match.end()+50]
-                            })
-
-                            # Analizar vocabulario asociado
-                            self.analizar_vocabulario_asociado(contexto, tema)
+            # Registrar las menciones de cada tema musical
+            for tema, patron, matches in menciones:
+                datos = self.temas_musicales[tema]
+
+                if matches:
+                    archivo_tiene_menciones = True
+                    datos['total_menciones'] += len(matches)
+
+                    if nombre_archivo not in datos['archivos_con_menciones']:
+                        datos['archivos_con_menciones'].append(nombre_archivo)
+
+                    for posicion, texto, contexto, contexto_previo, contexto_posterior in matches:
+                        datos['contextos'].append({
+                            'archivo': nombre_archivo,
+                            'fecha': fecha_str or 'Sin fecha',
+                            'contexto': contexto,
+                            'posicion': posicion
+                        })
+
+                        datos['menciones'].append({
+                            'texto': texto,
+                            'archivo': nombre_archivo,
+                            'fecha': fecha_str or 'Sin fecha',
+                            'contexto_previo': contexto_previo,
+                            'contexto_posterior': contexto_posterior
+                        })
+
+                        # Analizar vocabulario asociado
+                        self.analizar_vocabulario_asociado(contexto, tema)
 
             if archivo_tiene_menciones:
                 self.estadisticas_generales['archivos_con_contenido_musical'] += 1
@@ -190,8 +253,7 @@ class AnalizadorIberiaMusical:
 
     def procesar_todos_archivos(self):
         """Procesa todos los archivos en el directorio"""
-        patron_archivos = os.path.join(self.directorio_base, "*.txt")
-        archivos = glob.glob(patron_archivos)
+        archivos = filtrar_canonicos(listar_textos_corpus(self.directorio_base, recursivo=False))
 
         self.estadisticas_generales['total_archivos'] = len(archivos)
 
@@ -248,7 +310,7 @@ def main():
     # Ruta al directorio de archivos
     directorio = "/Users/maria/Desktop/FUENTES PARA CAROLINA/IBERIA/RESULTADOS La Iberia Musical TXT"
 
-    if not os.path.exists(directorio):
+    if not os.path.exists(directorio) and not almacen_de_directorio(directorio):
         print(f"Error: No se encuentra el directorio {directorio}")
         return
 
@@ -2,30 +2,72 @@
 # -*- coding: utf-8 -*-
 
 import os
+import sys
 import json
-import re
+import gzip
+import unicodedata
 from datetime import datetime
 from typing import List, Dict, Any
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from clasificador_lotes import ClasificadorPorLotes
+from catalogo_corpus import analizar_nombre, abrir_catalogo
+from almacen_corpus import abrir_texto, listar_textos_corpus, almacen_de_directorio
+from duplicados_corpus import filtrar_canonicos
+from ventanas_corpus import requiere_ventanas, dividir_en_ventanas, procesar_en_ventanas
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip comes with the standard library
+    brotli = None
+
+# Content categories in priority order: the first one with a keyword hit wins
+CONTENT_CATEGORIES = {
+    'teatro': ['teatro', 'teatros', 'función', 'drama', 'comedia', 'zarzuela'],
+    'música': ['concierto', 'música', 'musical', 'orquesta', 'banda'],
+    'religioso': ['iglesia', 'misa', 'novena', 'sermón', 'parroquia'],
+    'espectáculo': ['circo', 'price', 'espectáculo', 'baile']
+}
+
+_window_classifier = None
+
+def _init_window_worker(classifier):
+    global _window_classifier
+    _window_classifier = classifier
+
+def _process_window(window):
+    """Worker: line count and (line number, content, type) of every article in a window core"""
+    lines = window.lineas_nucleo(errors='strict')
+    numbered = [(i, line.strip()) for i, line in enumerate(lines, 1) if line.strip()]
+    types = _window_classifier.clasificar([content for _, content in numbered])
+    return len(lines), [(i, content, article_type) for (i, content), article_type in zip(numbered, types)]
+
 class ElDebateProcessor:
-    def __init__(self, data_dir: str = "/Users/maria/Desktop/EL DEBATE TXT"):
+    def __init__(self, data_dir: str = "/Users/maria/Desktop/EL DEBATE TXT", catalog=None):
         self.data_dir = data_dir
         self.articles = []
+        # Optional corpus catalog (CatalogoCorpus or path to its database)
+        self.catalog = abrir_catalogo(catalog)
+        self.classifier = ClasificadorPorLotes(CONTENT_CATEGORIES, etiqueta_por_defecto='general',
+                                               regla='prioridad')
         
     def extract_date_from_filename(self, filename: str) -> str:
         """Extract year from filename like 'El_Debate_textos_1881.txt'"""
-        match = re.search(r'(\d{4})', filename)
-        return match.group(1) if match else "unknown"
+        year = analizar_nombre(filename)['año']
+        return str(year) if year else "unknown"
     
     def process_file(self, filepath: str) -> List[Dict[str, Any]]:
         """Process a single text file and extract articles"""
+        if requiere_ventanas(filepath):
+            return self.process_file_windows(filepath)
+        
         filename = os.path.basename(filepath)
         year = self.extract_date_from_filename(filename)
         
         articles = []
         
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
+            with abrir_texto(filepath, errors='strict') as f:
                 lines = f.readlines()
                 
             # Process each line as a separate article
@@ -41,41 +83,84 @@ class ElDebateProcessor:
                     'article_number': i,
                     'content': line,
                     'source_file': filename,
-                    'date': year,  # We only have year information
-                    'type': self.classify_content(line)
+                    'date': year  # We only have year information
                 })
+            
+            # Classify every article of the file in one batch
+            types = self.classify_batch([article['content'] for article in articles])
+            for article, article_type in zip(articles, types):
+                article['type'] = article_type
+                
+        except Exception as e:
+            print(f"Error processing file {filepath}: {e}")
+            
+        return articles
+    
+    def process_file_windows(self, filepath: str, processes: int = None) -> List[Dict[str, Any]]:
+        """Process a huge file as line windows spread over a process pool
+        
+        Each window numbers and classifies its own lines; the numbers are shifted
+        by the lines of the windows before it, so the articles match process_file.
+        """
+        filename = os.path.basename(filepath)
+        year = self.extract_date_from_filename(filename)
+        
+        articles = []
+        
+        try:
+            windows = dividir_en_ventanas(filepath, solape=0)
+            partials = procesar_en_ventanas(windows, _process_window, processes,
+                                            _init_window_worker, (self.classifier,))
+            
+            first_line = 0
+            for line_count, window_articles in partials:
+                for number, content, article_type in window_articles:
+                    i = first_line + number
+                    articles.append({
+                        'id': f"{year}_{i}",
+                        'year': year,
+                        'article_number': i,
+                        'content': content,
+                        'source_file': filename,
+                        'date': year,
+                        'type': article_type
+                    })
+                first_line += line_count
                 
         except Exception as e:
             print(f"Error processing file {filepath}: {e}")
+            return []
             
         return articles
     
     def classify_content(self, content: str) -> str:
         """Classify content type based on keywords"""
-        content_lower = content.lower()
-        
-        if any(keyword in content_lower for keyword in ['teatro', 'teatros', 'función', 'drama', 'comedia', 'zarzuela']):
-            return 'teatro'
-        elif any(keyword in content_lower for keyword in ['concierto', 'música', 'musical', 'orquesta', 'banda']):
-            return 'música'
-        elif any(keyword in content_lower for keyword in ['iglesia', 'misa', 'novena', 'sermón', 'parroquia']):
-            return 'religioso'
-        elif any(keyword in content_lower for keyword in ['circo', 'price', 'espectáculo', 'baile']):
-            return 'espectáculo'
-        else:
-            return 'general'
+        return self.classify_batch([content])[0]
+    
+    def classify_batch(self, contents: List[str]) -> List[str]:
+        """Classify many articles at once with a single matrix product"""
+        return self.classifier.clasificar(contents)
     
     def process_all_files(self) -> List[Dict[str, Any]]:
         """Process all text files in the directory"""
         all_articles = []
         
-        if not os.path.exists(self.data_dir):
+        if not os.path.exists(self.data_dir) and not almacen_de_directorio(self.data_dir):
             print(f"Directory {self.data_dir} does not exist")
             return all_articles
+        
+        # With a catalog the file list comes from the database instead of the directory
+        if self.catalog:
+            filepaths = self.catalog.rutas(directorio=self.data_dir, tipo='texto')
+        else:
+            # Loose files or a packed store (<data_dir>.lxc), read the same way
+            filepaths = listar_textos_corpus(self.data_dir, recursivo=False)
+        # Near-duplicate transcripts (OCR re-runs, re-downloads) are counted once
+        filepaths = filtrar_canonicos(filepaths)
             
-        for filename in os.listdir(self.data_dir):
+        for filepath in filepaths:
+            filename = os.path.basename(filepath)
             if filename.endswith('.txt') and 'El_Debate_textos' in filename:
-                filepath = os.path.join(self.data_dir, filename)
                 print(f"Processing {filename}...")
                 articles = self.process_file(filepath)
                 all_articles.extend(articles)
@@ -124,6 +209,85 @@ class ElDebateProcessor:
         print(f"Statistics: {stats}")
         
         return output_file
+    
+    def save_sharded(self, articles: List[Dict[str, Any]], output_dir: str = "el_debate_shards",
+                     compression: tuple = ('gzip', 'brotli'), offsets_every: int = 500) -> str:
+        """Save one compact JSON Lines shard per year and type plus a small manifest
+        
+        Each shard line is [article_number, content]; year, type and source file are
+        stored once in the manifest. The manifest records the byte offset of every
+        `offsets_every`-th line so the front-end can fetch pages with HTTP range requests.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # Group articles by (year, type) keeping the original order
+        groups = {}
+        for article in articles:
+            groups.setdefault((article['year'], article['type']), []).append(article)
+        
+        shards = []
+        for (year, article_type), group in sorted(groups.items()):
+            # ASCII file names so shards can be fetched without URL-encoding
+            slug = unicodedata.normalize('NFKD', article_type).encode('ascii', 'ignore').decode('ascii')
+            filename = f"el_debate_{year}_{slug}.jsonl"
+            offsets = []
+            position = 0
+            lines = []
+            for i, article in enumerate(group):
+                line = json.dumps([article['article_number'], article['content']],
+                                  ensure_ascii=False, separators=(',', ':')) + '\n'
+                encoded = line.encode('utf-8')
+                if i % offsets_every == 0:
+                    offsets.append(position)
+                position += len(encoded)
+                lines.append(encoded)
+            data = b''.join(lines)
+            
+            with open(os.path.join(output_dir, filename), 'wb') as f:
+                f.write(data)
+            
+            shard = {
+                'file': filename,
+                'year': year,
+                'type': article_type,
+                'source_files': sorted({article['source_file'] for article in group}),
+                'count': len(group),
+                'bytes': len(data),
+                'offsets_every': offsets_every,
+                'offsets': offsets,
+                'compressed': {}
+            }
+            
+            # Precompressed variants for static servers
+            if 'gzip' in compression:
+                with open(os.path.join(output_dir, filename + '.gz'), 'wb') as f:
+                    f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                shard['compressed']['gzip'] = os.path.getsize(os.path.join(output_dir, filename + '.gz'))
+            if 'brotli' in compression and brotli is not None:
+                with open(os.path.join(output_dir, filename + '.br'), 'wb') as f:
+                    f.write(brotli.compress(data))
+                shard['compressed']['brotli'] = os.path.getsize(os.path.join(output_dir, filename + '.br'))
+            
+            shards.append(shard)
+        
+        manifest = {
+            'metadata': {
+                'generated_at': datetime.now().isoformat(),
+                'source_directory': self.data_dir,
+                'format': 'jsonl: [article_number, content]',
+                'total_articles': len(articles),
+                'years': sorted({shard['year'] for shard in shards}),
+                'types': sorted({shard['type'] for shard in shards})
+            },
+            'shards': shards
+        }
+        
+        manifest_file = os.path.join(output_dir, 'manifest.json')
+        with open(manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        
+        print(f"{len(shards)} shards saved to {output_dir}")
+        return manifest_file
 
 def main():
     """Main function to process EL DEBATE files"""
@@ -134,6 +298,8 @@ def main():
     
     if articles:
         output_file = processor.save_to_json(articles)
+        manifest_file = processor.save_sharded(articles)
+        print(f"Shard manifest: {manifest_file}")
         print(f"\nProcessing complete! Generated {len(articles)} articles")
         print(f"Data saved to: {output_file}")
     else:
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Clasificación rápida de páginas de PDF para decidir qué necesita OCR
+Con PyMuPDF se mira en cada página la capa de texto (caracteres y si son
+legibles), las fuentes y la superficie cubierta por imágenes, sin renderizar
+nada. Cada página queda como 'texto', 'escaneada', 'mixta' o 'vacia', y solo
+las escaneadas y mixtas se mandan a Tesseract
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import sys
+import json
+
+import fitz
+
+MIN_CARACTERES = 100        # Menos caracteres útiles que esto: la capa de texto no sirve
+MIN_LEGIBLE = 0.6           # Fracción mínima de letras, cifras y signos habituales
+COBERTURA_ESCANEO = 0.5     # Imagen que ocupa al menos media página
+COBERTURA_MIXTA = 0.25      # Zona de imagen sin texto encima a partir de la cual se hace OCR
+
+TIPOS_OCR = ('escaneada', 'mixta')
+
+
+def fraccion_legible(texto):
+    """Fracción de caracteres que son letras, cifras, espacios o puntuación común"""
+    if not texto:
+        return 0.0
+    legibles = sum(1 for c in texto if c.isalnum() or c.isspace() or c in '.,;:¡!¿?()«»"\'-—')
+    return legibles / len(texto)
+
+
+def superficie(rectangulos, pagina):
+    """Fracción de la página cubierta por los rectángulos (recortados a la página)"""
+    area_pagina = abs(pagina) or 1
+    total = 0
+    for rect in rectangulos:
+        interseccion = fitz.Rect(rect) & pagina
+        if not interseccion.is_empty:
+            total += abs(interseccion)
+    return min(1.0, total / area_pagina)
+
+
+def clasificar_pagina(page):
+    """Tipo de una página y las medidas con que se ha decidido"""
+    pagina = page.rect
+    texto = page.get_text('text')
+    caracteres = sum(1 for c in texto if not c.isspace())
+    legible = fraccion_legible(texto.strip())
+    fuentes = len(page.get_fonts())
+
+    imagenes = [info['bbox'] for info in page.get_image_info()]
+    cobertura_imagen = superficie(imagenes, pagina)
+    bloques = [bloque[:4] for bloque in page.get_text('blocks') if bloque[6] == 0 and bloque[4].strip()]
+    cobertura_texto = superficie(bloques, pagina)
+
+    texto_util = caracteres >= MIN_CARACTERES and legible >= MIN_LEGIBLE
+    if texto_util:
+        # Una imagen a página completa con texto invisible encima (PDF ya pasado por OCR)
+        # es una página de texto; una ilustración o recorte escaneado sin texto, mixta
+        sin_texto = cobertura_imagen - cobertura_texto
+        tipo = 'mixta' if cobertura_imagen < 0.9 and sin_texto >= COBERTURA_MIXTA else 'texto'
+    elif caracteres >= MIN_CARACTERES or cobertura_imagen >= COBERTURA_ESCANEO or (imagenes and not fuentes):
+        # Texto ilegible (codificación rota), imagen grande o solo imágenes sin ninguna fuente
+        tipo = 'escaneada'
+    elif imagenes:
+        tipo = 'mixta'
+    else:
+        # Poco texto y nada más (portadillas, páginas con solo el folio): el OCR no aportaría
+        tipo = 'texto' if caracteres else 'vacia'
+
+    return {
+        'pagina': page.number + 1,
+        'tipo': tipo,
+        'caracteres': caracteres,
+        'legible': round(legible, 3),
+        'fuentes': fuentes,
+        'cobertura_imagen': round(cobertura_imagen, 3),
+        'cobertura_texto': round(cobertura_texto, 3)
+    }
+
+
+def clasificar_pdf(ruta_pdf):
+    """Clasificación de todas las páginas de un PDF"""
+    with fitz.open(ruta_pdf) as doc:
+        return [clasificar_pagina(page) for page in doc]
+
+
+def paginas_para_ocr(clasificacion):
+    """Números de página (desde 1) que hay que pasar por OCR"""
+    return [pagina['pagina'] for pagina in clasificacion if pagina['tipo'] in TIPOS_OCR]
+
+
+def resumen(clasificacion):
+    """Recuento de páginas por tipo"""
+    cuentas = {'texto': 0, 'escaneada': 0, 'mixta': 0, 'vacia': 0}
+    for pagina in clasificacion:
+        cuentas[pagina['tipo']] += 1
+    return cuentas
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python3 clasificar_paginas.py <archivo.pdf | directorio> [-o clasificacion.json]")
+        return
+    ruta = sys.argv[1]
+    salida = sys.argv[sys.argv.index('-o') + 1] if '-o' in sys.argv else None
+
+    if os.path.isdir(ruta):
+        pdfs = [os.path.join(ruta, n) for n in sorted(os.listdir(ruta)) if n.lower().endswith('.pdf')]
+    else:
+        pdfs = [ruta]
+
+    resultados = {}
+    total_paginas = total_ocr = 0
+    for ruta_pdf in pdfs:
+        clasificacion = clasificar_pdf(ruta_pdf)
+        resultados[os.path.basename(ruta_pdf)] = clasificacion
+        ocr = len(paginas_para_ocr(clasificacion))
+        total_paginas += len(clasificacion)
+        total_ocr += ocr
+        cuentas = resumen(clasificacion)
+        print(f"📄 {os.path.basename(ruta_pdf)}: {len(clasificacion)} páginas "
+              f"({', '.join(f'{n} {tipo}' for tipo, n in cuentas.items() if n)}) → OCR: {ocr}")
+
+    if total_paginas:
+        print(f"OCR necesario en {total_ocr}/{total_paginas} páginas ({100 * total_ocr / total_paginas:.1f}%)")
+    if salida:
+        with open(salida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"Clasificación guardada en {salida}")
+
+
+if __name__ == "__main__":
+    main()
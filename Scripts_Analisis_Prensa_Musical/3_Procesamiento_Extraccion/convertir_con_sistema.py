@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-import subprocess
 import os
 
+from rasterizar_paginas import rasterizar_pdf
+
 def convertir_pdf_con_sistema():
     pdf_path = "/Users/maria/Desktop/1914 Nº 1/Revista-musical-hispano-americana-1-1914-n-o-1.pdf"
     output_dir = "/Users/maria/Desktop/1914 Nº 1"
@@ -13,28 +14,12 @@ def convertir_pdf_con_sistema():
     
     print(f"Convirtiendo PDF: {os.path.basename(pdf_path)}")
     
-    # Usar osascript para convertir (AppleScript)
-    script = f'''
-    tell application "Preview"
-        open POSIX file "{pdf_path}"
-        delay 2
-        tell document 1
-            set pageCount to count of pages
-            repeat with i from 1 to pageCount
-                export pages i to POSIX file "{output_dir}/Revista-musical-hispano-americana-1-1914-n-o-1_pagina_" & (text -3 thru -1 of ("000" & i)) & ".jpg" as JPEG with resolution 300
-            end repeat
-        end tell
-        close document 1
-    end tell
-    '''
-    
+    # Antes se exportaba página a página con Vista Previa (osascript); ahora
+    # PyMuPDF renderiza en paralelo y sin interfaz gráfica, con la misma resolución
     try:
-        result = subprocess.run(['osascript', '-e', script], 
-                              capture_output=True, text=True, timeout=300)
-        if result.returncode == 0:
-            print("✅ Conversión completada usando Preview")
-        else:
-            print(f"Error en AppleScript: {result.stderr}")
+        rasterizar_pdf(pdf_path, output_dir, base_name="Revista-musical-hispano-americana-1-1914-n-o-1",
+                       dpi=300, formato='jpg')
+        print("✅ Conversión completada con PyMuPDF")
     except Exception as e:
         print(f"Error: {e}")
 
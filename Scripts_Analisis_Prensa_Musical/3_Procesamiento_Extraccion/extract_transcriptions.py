@@ -1,22 +1,100 @@
 #!/usr/bin/env python3
+import os
+import re
+import sys
 import json
+import glob
+from datetime import datetime
 
-# Load the JSON file
-with open('/Users/maria/revista_musical_bilbao_transcriptions.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
-
-# Generate JavaScript object entries for pages 8-30
-print("// Add these entries to your staticTranscriptions object:")
-print()
-
-for page_num in range(8, 31):
-    page_key = str(page_num)
-    if page_key in data:
-        transcription = data[page_key]['transcription']
-        # Escape quotes and backslashes for JavaScript
-        escaped_transcription = transcription.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
-        print(f'    {page_num}: "{escaped_transcription}",')
-        print()
+# Transcription files: one JSON per magazine ({page: {'transcription': ...}}),
+# or {issue: {page: {...}}} when a file holds several issues
+INPUT_PATTERN = '/Users/maria/*_transcriptions.json'
+OUTPUT_DIR = '/Users/maria/transcripciones'
+
+
+def page_sort_key(key):
+    """Numeric pages first, in order; anything else after, alphabetically"""
+    return (0, int(key), '') if str(key).isdigit() else (1, 0, str(key))
+
+
+def slug(name):
+    """Safe directory name for a magazine or issue"""
+    return re.sub(r'[^\w.-]+', '_', str(name)).strip('_') or 'sin_nombre'
+
+
+def split_issues(data):
+    """Return {issue: {page: entry}} for both supported layouts"""
+    if all(isinstance(value, dict) and 'transcription' in value for value in data.values()):
+        return {'': data}
+    return {issue: pages for issue, pages in data.items() if isinstance(pages, dict)}
+
+
+def write_json(path, content):
+    """Compact JSON written atomically; json.dumps takes care of all escaping"""
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(content, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temporary, path)
+
+
+def export_transcriptions(input_files, output_dir):
+    """Write one small JSON file per page plus an index.json manifest"""
+    manifest = {
+        'generated_at': datetime.now().isoformat(),
+        'path_template': '{magazine}/{issue}/page_{page}.json',
+        'magazines': {}
+    }
+    total_pages = 0
+
+    for input_file in input_files:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        magazine = slug(os.path.basename(input_file).replace('_transcriptions.json', ''))
+        magazine_entry = manifest['magazines'].setdefault(magazine, {'source': input_file, 'issues': {}})
+
+        for issue, pages in split_issues(data).items():
+            issue_dir_name = slug(issue) if issue else '_'
+            issue_dir = os.path.join(output_dir, magazine, issue_dir_name)
+            os.makedirs(issue_dir, exist_ok=True)
+
+            index_pages = []
+            for page_key in sorted(pages, key=page_sort_key):
+                entry = pages[page_key]
+                transcription = entry.get('transcription', '') if isinstance(entry, dict) else str(entry)
+                page_file = f"page_{slug(page_key)}.json"
+
+                # Keep any extra fields (confidence, image, ...) next to the text
+                content = dict(entry) if isinstance(entry, dict) else {}
+                content.update({'page': page_key, 'transcription': transcription})
+                write_json(os.path.join(issue_dir, page_file), content)
+
+                index_pages.append({
+                    'page': page_key,
+                    'file': f"{magazine}/{issue_dir_name}/{page_file}",
+                    'characters': len(transcription)
+                })
+
+            magazine_entry['issues'][issue_dir_name] = {'issue': issue, 'pages': index_pages}
+            total_pages += len(index_pages)
+            print(f"{magazine}{' ' + issue if issue else ''}: {len(index_pages)} pages")
+
+    write_json(os.path.join(output_dir, 'index.json'), manifest)
+    print(f"Exported {total_pages} pages to {output_dir} (manifest: index.json)")
+    return manifest
+
+
+if __name__ == "__main__":
+    # Optional arguments: transcription JSON files, then the output directory with -o
+    arguments = sys.argv[1:]
+    output_dir = OUTPUT_DIR
+    if '-o' in arguments:
+        position = arguments.index('-o')
+        output_dir = arguments[position + 1]
+        del arguments[position:position + 2]
+    input_files = arguments or sorted(glob.glob(INPUT_PATTERN))
+
+    if not input_files:
+        print(f"No transcription files found ({INPUT_PATTERN})")
     else:
-        print(f'    // Page {page_num}: Not found in JSON data')
-        print()
\ No newline at end of file
+        export_transcriptions(input_files, output_dir)
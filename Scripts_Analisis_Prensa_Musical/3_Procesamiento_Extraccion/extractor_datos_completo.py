@@ -3,11 +3,43 @@
 Extractor de datos completo para la web mejorada
 """
 
+import os
+import sys
 import json
 import re
 from collections import defaultdict, Counter
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from registro_patrones import patron
+
+# Patrones para detectar teatros y salas
+PATRONES_TEATROS = [
+    patron('extractor.teatros.nombre', r'\b(?:teatro|sala)\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ\s]+)', re.IGNORECASE),
+    patron('extractor.teatros.conocidos', r'\b(Real|Español|Comedia|Zarzuela|Eslava|Principal|Recoletos)\b',
+           re.IGNORECASE),
+    patron('extractor.teatros.celebracion', r'\b(?:en\s+el\s+)([A-ZÁÉÍÓÚÑ][a-záéíóúñ\s]+)(?:\s+se\s+celebr)',
+           re.IGNORECASE),
+]
+
+# Patrones para detectar firmas y autores
+PATRONES_CRITICOS = [
+    patron('extractor.criticos.nombre_punto', r'\b([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)\s*\.'),
+    patron('extractor.criticos.por', r'Por\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)'),
+    patron('extractor.criticos.firma', r'Firma:\s*([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)'),
+]
+
+# Patrones para detectar títulos de obras
+PATRONES_OBRAS = [
+    patron('extractor.obras.comillas', r'\"([^\"]+)\"'),
+    patron('extractor.obras.cursiva', r'_([^_]+)_'),
+    patron('extractor.obras.sinfonia', r'\b(Sinfonía\s+\w+)'),
+    patron('extractor.obras.concierto', r'\b(Concierto\s+\w+)'),
+    patron('extractor.obras.sonata', r'\b(Sonata\s+\w+)'),
+]
+
+PATRON_AÑO = patron('extractor.año', r'(\d{4})')
+
 class ExtractorDatosCompleto:
     def __init__(self, directorio_textos):
         self.directorio = Path(directorio_textos)
@@ -85,13 +117,6 @@ class ExtractorDatosCompleto:
         """Extrae teatros y salas mencionados"""
         teatros = defaultdict(int)
         
-        # Patrones para detectar teatros y salas
-        patrones_teatros = [
-            r'\b(?:teatro|sala)\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ\s]+)',
-            r'\b(Real|Español|Comedia|Zarzuela|Eslava|Principal|Recoletos)\b',
-            r'\b(?:en\s+el\s+)([A-ZÁÉÍÓÚÑ][a-záéíóúñ\s]+)(?:\s+se\s+celebr)',
-        ]
-        
         archivos_txt = list(self.directorio.rglob("*.txt"))
         
         for archivo in archivos_txt[:100]:  # Muestra para optimizar
@@ -99,8 +124,8 @@ class ExtractorDatosCompleto:
                 with open(archivo, 'r', encoding='utf-8', errors='ignore') as f:
                     texto = f.read()
                 
-                for patron in patrones_teatros:
-                    matches = re.finditer(patron, texto, re.IGNORECASE)
+                for patron_teatro in PATRONES_TEATROS:
+                    matches = patron_teatro.finditer(texto)
                     for match in matches:
                         teatro = match.group(1).strip() if match.lastindex >= 1 else match.group(0)
                         if len(teatro) > 3 and len(teatro) < 30:
@@ -117,13 +142,6 @@ class ExtractorDatosCompleto:
         """Extrae críticos y autores de artículos"""
         criticos = defaultdict(int)
         
-        # Patrones para detectar firmas y autores
-        patrones_criticos = [
-            r'\b([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)\s*\.',
-            r'Por\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+[A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)',
-            r'Firma:\s*([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)',
-        ]
-        
         archivos_txt = list(self.directorio.rglob("*.txt"))
         
         for archivo in archivos_txt[:200]:  # Muestra optimizada
@@ -135,8 +153,8 @@ class ExtractorDatosCompleto:
                 lineas = texto.split('\n')[-5:]
                 texto_firmas = '\n'.join(lineas)
                 
-                for patron in patrones_criticos:
-                    matches = re.finditer(patron, texto_firmas)
+                for patron_critico in PATRONES_CRITICOS:
+                    matches = patron_critico.finditer(texto_firmas)
                     for match in matches:
                         critico = match.group(1).strip()
                         if len(critico.split()) <= 3 and len(critico) > 5:
@@ -153,15 +171,6 @@ class ExtractorDatosCompleto:
         """Extrae obras musicales específicas mencionadas"""
         obras = defaultdict(int)
         
-        # Patrones para detectar títulos de obras
-        patrones_obras = [
-            r'\"([^\"]+)\"',  # Entre comillas
-            r'_([^_]+)_',     # Entre guiones bajos (cursiva)
-            r'\b(Sinfonía\s+\w+)',
-            r'\b(Concierto\s+\w+)',
-            r'\b(Sonata\s+\w+)',
-        ]
-        
         archivos_txt = list(self.directorio.rglob("*.txt"))
         
         for archivo in archivos_txt[:150]:  # Muestra optimizada
@@ -169,8 +178,8 @@ class ExtractorDatosCompleto:
                 with open(archivo, 'r', encoding='utf-8', errors='ignore') as f:
                     texto = f.read()
                 
-                for patron in patrones_obras:
-                    matches = re.finditer(patron, texto)
+                for patron_obra in PATRONES_OBRAS:
+                    matches = patron_obra.finditer(texto)
                     for match in matches:
                         obra = match.group(1).strip()
                         if len(obra) > 5 and len(obra) < 50:
@@ -189,7 +198,7 @@ class ExtractorDatosCompleto:
     
     def extraer_año_archivo(self, nombre_archivo):
         """Extrae año del nombre de archivo"""
-        match = re.search(r'(\d{4})', str(nombre_archivo))
+        match = PATRON_AÑO.search(str(nombre_archivo))
         return int(match.group(1)) if match else None
     
     def generar_datos_completos(self):
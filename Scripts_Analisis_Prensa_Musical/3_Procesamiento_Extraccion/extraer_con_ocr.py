@@ -1,29 +1,63 @@
 #!/usr/bin/env python3
 import os
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
 
-def extraer_con_ocr(ruta_pdf, idioma='spa+eng'):
-    """Extrae texto de PDF usando OCR"""
+try:
+    import fitz
+    from clasificar_paginas import clasificar_pdf, paginas_para_ocr, resumen
+except ImportError:  # Sin PyMuPDF se pasan por OCR todas las páginas
+    fitz = None
+
+try:
+    from preprocesar_imagenes import imagen_preparada
+except ImportError:  # Sin NumPy las páginas van a Tesseract tal como se rasterizan
+    imagen_preparada = None
+
+def imagen_para_ocr(ruta_pdf, numero, preprocesar=True):
+    """Página rasterizada a 300 ppp, preparada y en caché cuando es posible"""
+    if preprocesar and imagen_preparada:
+        return imagen_preparada(ruta_pdf, numero, dpi=300)
+    return convert_from_path(ruta_pdf, dpi=300, first_page=numero, last_page=numero)[0]
+
+def extraer_con_ocr(ruta_pdf, idioma='spa+eng', psm=None, preprocesar=True):
+    """Extrae texto de PDF usando OCR solo en las páginas que lo necesitan
+
+    Las páginas preparadas quedan en caché: repetir con otro idioma o psm no
+    vuelve a rasterizarlas.
+    """
     print(f"Procesando con OCR: {os.path.basename(ruta_pdf)}")
+    configuracion = f"--psm {psm}" if psm is not None else ""
 
     try:
-        # Convertir PDF a imágenes
-        print("  - Convirtiendo PDF a imágenes...")
-        imagenes = convert_from_path(ruta_pdf, dpi=300)
+        if fitz is None:
+            paginas = pdfinfo_from_path(ruta_pdf)['Pages']
+            textos = {numero: None for numero in range(1, paginas + 1)}
+        else:
+            # Las páginas con capa de texto utilizable se leen con PyMuPDF
+            clasificacion = clasificar_pdf(ruta_pdf)
+            ocr = set(paginas_para_ocr(clasificacion))
+            print(f"  - Páginas: {resumen(clasificacion)} → OCR en {len(ocr)}/{len(clasificacion)}")
+            textos = {}
+            with fitz.open(ruta_pdf) as doc:
+                for pagina in clasificacion:
+                    numero = pagina['pagina']
+                    textos[numero] = None if numero in ocr else doc[numero - 1].get_text('text')
 
         texto_completo = ""
 
         # Procesar cada página
-        for i, imagen in enumerate(imagenes):
-            print(f"  - Procesando página {i+1}/{len(imagenes)}...")
-
-            # Aplicar OCR a la imagen
-            texto_pagina = pytesseract.image_to_string(imagen, lang=idioma)
+        for numero in sorted(textos):
+            texto_pagina = textos[numero]
+            if texto_pagina is None:
+                print(f"  - OCR página {numero}/{len(textos)}...")
+                imagen = imagen_para_ocr(ruta_pdf, numero, preprocesar)
+                # Aplicar OCR a la imagen
+                texto_pagina = pytesseract.image_to_string(imagen, lang=idioma, config=configuracion)
 
             if texto_pagina.strip():
-                texto_completo += f"\n\n--- PÁGINA {i+1} ---\n\n"
+                texto_completo += f"\n\n--- PÁGINA {numero} ---\n\n"
                 texto_completo += texto_pagina
 
         return texto_completo
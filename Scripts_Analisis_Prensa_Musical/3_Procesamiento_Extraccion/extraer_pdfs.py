@@ -54,6 +54,31 @@ def procesar_pdfs_directorio(directorio_origen, directorio_destino=None):
         else:
             print(f"  ✗ No se pudo extraer texto de {archivo_pdf}")
 
+def extraer_en_flujo(directorio_origen, directorio_destino):
+    """Extrae los PDFs uno a uno y devuelve cada .txt en cuanto está escrito
+
+    Los textos más recientes que su PDF no se vuelven a extraer.
+    """
+    Path(directorio_destino).mkdir(parents=True, exist_ok=True)
+
+    for archivo_pdf in sorted(glob.glob(os.path.join(directorio_origen, "*.pdf"))):
+        archivo_txt = os.path.join(directorio_destino, f"{Path(archivo_pdf).stem}.txt")
+        if os.path.exists(archivo_txt) and os.path.getmtime(archivo_txt) >= os.path.getmtime(archivo_pdf):
+            yield archivo_txt
+            continue
+
+        print(f"Procesando: {os.path.basename(archivo_pdf)}")
+        texto = extraer_texto_pdf(archivo_pdf)
+        if texto:
+            # Escritura atómica: la etapa siguiente nunca lee un texto a medias
+            temporal = archivo_txt + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                f.write(texto)
+            os.replace(temporal, archivo_txt)
+            yield archivo_txt
+        else:
+            print(f"  ✗ No se pudo extraer texto de {archivo_pdf}")
+
 def procesar_lista_pdfs(lista_archivos, directorio_destino="textos_extraidos"):
     """Procesa una lista específica de archivos PDF"""
 
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Preparación de las imágenes de página antes de Tesseract
+Escala de grises, corrección de la inclinación, binarización adaptativa
+(Sauvola con imágenes integrales) y recorte de los bordes del escaneo, todo
+vectorizado con NumPy. Las páginas preparadas se guardan en una caché en disco
+con clave huella del PDF + página + parámetros: repetir el OCR con otro idioma
+u otro modo PSM no vuelve a rasterizar ni a preparar nada
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import sys
+import json
+import hashlib
+
+import numpy as np
+from PIL import Image
+from pdf2image import convert_from_path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from catalogo_corpus import huella_archivo
+
+CACHE_POR_DEFECTO = os.path.expanduser('~/.cache/leximus_ocr')
+
+PARAMETROS_POR_DEFECTO = {
+    'dpi': 300,
+    'enderezar': True,
+    'max_angulo': 3.0,        # Grados; las páginas escaneadas rara vez se tuercen más
+    'paso_angulo': 0.2,
+    'ventana': 41,            # Lado de la ventana de Sauvola en píxeles (a 300 ppp, ~3 mm)
+    'k': 0.2,
+    'recortar': True,
+    'margen': 20
+}
+
+# Versión del algoritmo: forma parte de la clave, así un cambio aquí invalida la caché
+VERSION = 1
+
+_huellas = {}
+
+
+def gris(imagen):
+    """Luminancia en float32 a partir de una imagen PIL (RGB, L...)"""
+    if imagen.mode == 'L':
+        return np.asarray(imagen, dtype=np.float32)
+    rgb = np.asarray(imagen.convert('RGB'), dtype=np.float32)
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def umbral_otsu(valores):
+    """Umbral de Otsu sobre un array de niveles 0-255"""
+    histograma = np.bincount(np.clip(valores, 0, 255).astype(np.uint8).ravel(), minlength=256).astype(np.float64)
+    niveles = np.arange(256)
+    peso_fondo = np.cumsum(histograma)
+    peso_tinta = peso_fondo[-1] - peso_fondo
+    suma = np.cumsum(histograma * niveles)
+    media_fondo = suma / np.maximum(peso_fondo, 1)
+    media_tinta = (suma[-1] - suma) / np.maximum(peso_tinta, 1)
+    varianza = peso_fondo * peso_tinta * (media_fondo - media_tinta) ** 2
+    return int(np.argmax(varianza))
+
+
+def angulo_inclinacion(niveles, max_angulo=3.0, paso=0.2):
+    """Ángulo (grados) que mejor alinea las líneas de texto con la horizontal
+
+    Perfil de proyección: con el ángulo correcto las filas de tinta forman picos
+    nítidos y la varianza del perfil es máxima. Se calcula sobre una copia
+    reducida y con las coordenadas de los píxeles de tinta, sin rotar la imagen.
+    """
+    reduccion = max(1, min(niveles.shape) // 600)
+    pequeña = niveles[::reduccion, ::reduccion]
+    filas, columnas = np.nonzero(pequeña < umbral_otsu(pequeña))
+    if len(filas) < 100:
+        return 0.0
+    filas = filas - filas.mean()
+    columnas = columnas - columnas.mean()
+
+    angulos = np.arange(-max_angulo, max_angulo + paso / 2, paso)
+    mejor, mejor_puntuacion = 0.0, -1.0
+    for angulo in angulos:
+        radianes = np.deg2rad(angulo)
+        proyeccion = np.round(filas * np.cos(radianes) - columnas * np.sin(radianes)).astype(np.int64)
+        perfil = np.bincount(proyeccion - proyeccion.min())
+        puntuacion = float(np.sum(np.diff(perfil.astype(np.float64)) ** 2))
+        if puntuacion > mejor_puntuacion:
+            mejor, mejor_puntuacion = float(angulo), puntuacion
+    return mejor
+
+
+def sauvola(niveles, ventana=41, k=0.2, rango=128.0):
+    """Binarización adaptativa: True para la tinta
+
+    Media y desviación local en O(1) por píxel con imágenes integrales, así el
+    papel amarillento o con manchas no se confunde con el texto.
+    """
+    radio = ventana // 2
+    relleno = np.pad(niveles.astype(np.float64), radio + 1, mode='edge')
+    integral = relleno.cumsum(0).cumsum(1)
+    integral_cuadrados = (relleno ** 2).cumsum(0).cumsum(1)
+
+    alto, ancho = niveles.shape
+    lado = 2 * radio + 1
+    y0, x0 = 0, 0
+    y1, x1 = lado, lado
+
+    def suma_ventana(tabla):
+        return (tabla[y1:y1 + alto, x1:x1 + ancho] - tabla[y0:y0 + alto, x1:x1 + ancho]
+                - tabla[y1:y1 + alto, x0:x0 + ancho] + tabla[y0:y0 + alto, x0:x0 + ancho])
+
+    area = float(lado * lado)
+    media = suma_ventana(integral) / area
+    varianza = np.maximum(suma_ventana(integral_cuadrados) / area - media ** 2, 0)
+    umbral = media * (1 + k * (np.sqrt(varianza) / rango - 1))
+    return niveles < umbral
+
+
+def limites_contenido(tinta, margen=20):
+    """(arriba, abajo, izquierda, derecha) sin los bordes oscuros del escaneo ni el margen vacío"""
+    alto, ancho = tinta.shape
+
+    def recorte(fraccion, longitud):
+        # Fuera: filas/columnas casi negras (borde del escáner) en los extremos
+        inicio, fin = 0, longitud
+        while inicio < fin and fraccion[inicio] > 0.5:
+            inicio += 1
+        while fin > inicio and fraccion[fin - 1] > 0.5:
+            fin -= 1
+        # Dentro: primera y última con algo de tinta
+        con_tinta = np.nonzero(fraccion[inicio:fin] > 0.002)[0]
+        if len(con_tinta) == 0:
+            return 0, longitud
+        return max(0, inicio + con_tinta[0] - margen), min(longitud, inicio + con_tinta[-1] + 1 + margen)
+
+    arriba, abajo = recorte(tinta.mean(axis=1), alto)
+    izquierda, derecha = recorte(tinta.mean(axis=0), ancho)
+    return arriba, abajo, izquierda, derecha
+
+
+def preprocesar(imagen, **parametros):
+    """Imagen PIL preparada para el OCR (modo '1', texto negro sobre blanco)"""
+    p = dict(PARAMETROS_POR_DEFECTO, **parametros)
+    niveles = gris(imagen)
+
+    if p['enderezar']:
+        angulo = angulo_inclinacion(niveles, p['max_angulo'], p['paso_angulo'])
+        if angulo:
+            # La rotación de Pillow (en C) es mucho más rápida que interpolar en NumPy
+            girada = Image.fromarray(np.clip(niveles, 0, 255).astype(np.uint8)).rotate(
+                angulo, resample=Image.BICUBIC, fillcolor=255)
+            niveles = np.asarray(girada, dtype=np.float32)
+
+    tinta = sauvola(niveles, p['ventana'], p['k'])
+
+    if p['recortar']:
+        arriba, abajo, izquierda, derecha = limites_contenido(tinta, p['margen'])
+        tinta = tinta[arriba:abajo, izquierda:derecha]
+
+    return Image.fromarray(~tinta)
+
+
+def huella_pdf(ruta_pdf):
+    """Huella del PDF, calculada una vez por archivo y modificación"""
+    estado = os.stat(ruta_pdf)
+    clave = (os.path.abspath(ruta_pdf), estado.st_size, estado.st_mtime)
+    if clave not in _huellas:
+        _huellas[clave] = huella_archivo(ruta_pdf)
+    return _huellas[clave]
+
+
+def clave_cache(ruta_pdf, numero, parametros):
+    """Clave de una página preparada: contenido del PDF, página, parámetros y versión"""
+    descripcion = json.dumps([VERSION, huella_pdf(ruta_pdf), numero, parametros], sort_keys=True)
+    return hashlib.sha1(descripcion.encode('utf-8')).hexdigest()
+
+
+def imagen_preparada(ruta_pdf, numero, directorio_cache=CACHE_POR_DEFECTO, **parametros):
+    """Página `numero` (desde 1) lista para Tesseract, desde la caché si ya existe"""
+    p = dict(PARAMETROS_POR_DEFECTO, **parametros)
+    clave = clave_cache(ruta_pdf, numero, p)
+    ruta = os.path.join(directorio_cache, clave[:2], clave + '.png')
+    if os.path.exists(ruta):
+        return Image.open(ruta)
+
+    imagen = convert_from_path(ruta_pdf, dpi=p['dpi'], first_page=numero, last_page=numero)[0]
+    preparada = preprocesar(imagen, **p)
+
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + '.tmp'
+    preparada.save(temporal, format='PNG', optimize=True)
+    os.replace(temporal, ruta)
+    return preparada
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python3 preprocesar_imagenes.py <archivo.pdf> [página ...]")
+        return
+    ruta_pdf = sys.argv[1]
+    paginas = [int(n) for n in sys.argv[2:]] or [1]
+    for numero in paginas:
+        imagen = imagen_preparada(ruta_pdf, numero)
+        print(f"✅ Página {numero}: {imagen.size[0]}x{imagen.size[1]} → caché {CACHE_POR_DEFECTO}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rasterización de páginas de PDF en paralelo con PyMuPDF
+Sustituye la conversión mediante Vista Previa/AppleScript: funciona sin
+interfaz gráfica (también en Linux), reparte las páginas entre procesos y
+omite las páginas cuya imagen ya existe. Opcionalmente genera pirámides de
+teselas Deep Zoom (DZI) renderizadas directamente desde PyMuPDF
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import sys
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+
+FORMATOS_NATIVOS = ('jpg', 'png', 'pnm', 'psd')
+
+PLANTILLA_DZI = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" Format="{formato}" '
+    'Overlap="{solapamiento}" TileSize="{tam}">\n'
+    '  <Size Width="{ancho}" Height="{alto}"/>\n'
+    '</Image>\n'
+)
+
+
+def nombre_pagina(base_name, numero, formato):
+    """Nombre de archivo de una página: <base>_pagina_NNN.<formato>"""
+    return f"{base_name}_pagina_{numero:03d}.{formato}"
+
+
+def nombre_dzi(base_name, numero):
+    """Descriptor Deep Zoom de una página (las teselas van en <base>_pagina_NNN_files/)"""
+    return f"{base_name}_pagina_{numero:03d}.dzi"
+
+
+def guardar_pixmap(pix, ruta, formato, calidad_jpeg):
+    """Guarda el pixmap de forma atómica (un corte no deja imágenes a medias)"""
+    temporal = ruta + '.tmp'
+    if formato == 'jpg':
+        pix.save(temporal, output='jpg', jpg_quality=calidad_jpeg)
+    elif formato in FORMATOS_NATIVOS:
+        pix.save(temporal, output=formato)
+    else:  # webp, tiff...: a través de Pillow
+        pix.pil_save(temporal, format=formato.upper(), quality=calidad_jpeg)
+    os.replace(temporal, ruta)
+
+
+def generar_teselas(lista, rect, escala, ruta_dzi, formato='jpg', calidad_jpeg=85,
+                    tam=256, solapamiento=1):
+    """Pirámide Deep Zoom de una página a partir de su lista de visualización
+
+    Cada tesela se renderiza recortando la página a su rectángulo, también en los
+    niveles reducidos, así que nunca se crea la imagen completa en memoria ni en disco.
+    El descriptor .dzi se escribe al final y marca la pirámide como completa.
+    """
+    ancho = max(1, round(rect.width * escala))
+    alto = max(1, round(rect.height * escala))
+    nivel_max = math.ceil(math.log2(max(ancho, alto)))
+    dir_teselas = ruta_dzi[:-len('.dzi')] + '_files'
+
+    for nivel in range(nivel_max + 1):
+        factor = 2 ** (nivel_max - nivel)
+        ancho_nivel = math.ceil(ancho / factor)
+        alto_nivel = math.ceil(alto / factor)
+        escala_nivel = escala * ancho_nivel / ancho
+        matriz = fitz.Matrix(escala_nivel, escala_nivel)
+        dir_nivel = os.path.join(dir_teselas, str(nivel))
+        os.makedirs(dir_nivel, exist_ok=True)
+
+        for fila in range(math.ceil(alto_nivel / tam)):
+            for columna in range(math.ceil(ancho_nivel / tam)):
+                x0 = max(0, columna * tam - solapamiento)
+                y0 = max(0, fila * tam - solapamiento)
+                x1 = min(ancho_nivel, (columna + 1) * tam + solapamiento)
+                y1 = min(alto_nivel, (fila + 1) * tam + solapamiento)
+                recorte = fitz.Rect(rect.x0 + x0 / escala_nivel, rect.y0 + y0 / escala_nivel,
+                                    rect.x0 + x1 / escala_nivel, rect.y0 + y1 / escala_nivel)
+                pix = lista.get_pixmap(matrix=matriz, alpha=False, clip=recorte)
+                guardar_pixmap(pix, os.path.join(dir_nivel, f"{columna}_{fila}.{formato}"),
+                               formato, calidad_jpeg)
+
+    with open(ruta_dzi, 'w', encoding='utf-8') as f:
+        f.write(PLANTILLA_DZI.format(formato=formato, solapamiento=solapamiento, tam=tam,
+                                     ancho=ancho, alto=alto))
+
+
+def _renderizar_paginas(args):
+    """Renderiza una lista de páginas de un PDF (se ejecuta en un proceso aparte)"""
+    pdf_path, output_dir, base_name, numeros, opciones = args
+    escala = opciones['dpi'] / 72
+    generadas = []
+    doc = fitz.open(pdf_path)
+    try:
+        for numero in numeros:
+            page = doc.load_page(numero - 1)
+            # La página se interpreta una sola vez para la imagen y todas las teselas
+            lista = page.get_displaylist()
+            if opciones['imagen_completa']:
+                ruta = os.path.join(output_dir, nombre_pagina(base_name, numero, opciones['formato']))
+                if opciones['sobrescribir'] or not os.path.exists(ruta):
+                    pix = lista.get_pixmap(matrix=fitz.Matrix(escala, escala), alpha=False)
+                    guardar_pixmap(pix, ruta, opciones['formato'], opciones['calidad_jpeg'])
+            if opciones['teselas']:
+                ruta_dzi = os.path.join(output_dir, nombre_dzi(base_name, numero))
+                if opciones['sobrescribir'] or not os.path.exists(ruta_dzi):
+                    generar_teselas(lista, page.rect, escala, ruta_dzi,
+                                    formato='png' if opciones['formato'] == 'png' else 'jpg',
+                                    calidad_jpeg=opciones['calidad_jpeg'], tam=opciones['tam_tesela'])
+            generadas.append(numero)
+    finally:
+        doc.close()
+    return generadas
+
+
+def repartir(numeros, partes):
+    """Divide las páginas en `partes` tramos contiguos (cada proceso abre el PDF una vez)"""
+    partes = max(1, min(partes, len(numeros)))
+    tam, resto = divmod(len(numeros), partes)
+    tramos = []
+    inicio = 0
+    for i in range(partes):
+        fin = inicio + tam + (1 if i < resto else 0)
+        tramos.append(numeros[inicio:fin])
+        inicio = fin
+    return [tramo for tramo in tramos if tramo]
+
+
+def rasterizar_pdf(pdf_path, output_dir=None, base_name=None, dpi=300, formato='jpg',
+                   calidad_jpeg=90, procesos=None, paginas=None, sobrescribir=False,
+                   imagen_completa=True, teselas=False, tam_tesela=256):
+    """Convierte las páginas de un PDF en imágenes <base>_pagina_NNN.<formato>
+
+    paginas: números de página (desde 1) a convertir; por defecto todas.
+    teselas: genera también la pirámide Deep Zoom <base>_pagina_NNN.dzi (+ _files/).
+    imagen_completa: False para generar solo las teselas.
+    Devuelve la lista de rutas de todas las páginas pedidas (nuevas o existentes).
+    """
+    output_dir = output_dir or os.path.dirname(pdf_path)
+    base_name = base_name or os.path.splitext(os.path.basename(pdf_path))[0]
+    formato = formato.lower().replace('jpeg', 'jpg')
+    os.makedirs(output_dir, exist_ok=True)
+
+    with fitz.open(pdf_path) as doc:
+        total = len(doc)
+    numeros = sorted(paginas) if paginas else list(range(1, total + 1))
+
+    rutas = [os.path.join(output_dir, nombre_pagina(base_name, n, formato)) for n in numeros]
+    pendientes = [
+        n for n, ruta in zip(numeros, rutas)
+        if sobrescribir
+        or (imagen_completa and not os.path.exists(ruta))
+        or (teselas and not os.path.exists(os.path.join(output_dir, nombre_dzi(base_name, n))))
+    ]
+
+    print(f"Procesando: {os.path.basename(pdf_path)}")
+    print(f"Páginas: {total} ({len(numeros) - len(pendientes)} ya convertidas, {len(pendientes)} pendientes)")
+    if not pendientes:
+        return rutas
+
+    opciones = {'dpi': dpi, 'formato': formato, 'calidad_jpeg': calidad_jpeg, 'sobrescribir': sobrescribir,
+                'imagen_completa': imagen_completa, 'teselas': teselas, 'tam_tesela': tam_tesela}
+    procesos = procesos or os.cpu_count() or 1
+    # Varios tramos por proceso para equilibrar páginas de coste desigual
+    tramos = repartir(pendientes, procesos * 4)
+    trabajos = [(pdf_path, output_dir, base_name, tramo, opciones) for tramo in tramos]
+
+    hechas = 0
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        for generadas in ejecutor.map(_renderizar_paginas, trabajos):
+            hechas += len(generadas)
+            print(f"  {hechas}/{len(pendientes)} páginas")
+
+    print(f"Completado: {hechas} páginas convertidas en {output_dir}")
+    return rutas
+
+
+def rasterizar_directorio(directorio, **opciones):
+    """Convierte todos los PDF de un directorio (p. ej. un año completo de una revista)"""
+    rutas = {}
+    for nombre in sorted(os.listdir(directorio)):
+        if nombre.lower().endswith('.pdf'):
+            rutas[nombre] = rasterizar_pdf(os.path.join(directorio, nombre), **opciones)
+    return rutas
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Uso: python3 rasterizar_paginas.py <archivo.pdf | directorio> [dpi] [--teselas]")
+        return
+    ruta = sys.argv[1]
+    dpi = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2].isdigit() else 300
+    teselas = '--teselas' in sys.argv
+    if os.path.isdir(ruta):
+        rasterizar_directorio(ruta, dpi=dpi, teselas=teselas)
+    else:
+        rasterizar_pdf(ruta, dpi=dpi, teselas=teselas)
+
+
+if __name__ == "__main__":
+    main()
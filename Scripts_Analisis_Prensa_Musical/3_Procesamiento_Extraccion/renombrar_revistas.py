@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
 import os
 import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from catalogo_corpus import CatalogoCorpus, CATALOGO_POR_DEFECTO
 
 directorio = "/Users/maria/Desktop/Revista Musical de Bilbao"
 
+# Si existe el catálogo del corpus, el renombrado también actualiza sus filas
+catalogo = CatalogoCorpus() if os.path.exists(CATALOGO_POR_DEFECTO) else None
+
 # Mapeo de archivos con sus nuevos nombres
 renombrados = {
     "Revista-musical-Bilbao-1-1910-n-o-13.pdf": "1910_13_Revista-Musical-Bilbao.pdf",
@@ -55,7 +62,10 @@ for nombre_actual, nombre_nuevo in renombrados.items():
     
     if os.path.exists(ruta_actual):
         try:
-            os.rename(ruta_actual, ruta_nueva)
+            if catalogo:
+                catalogo.renombrar(ruta_actual, ruta_nueva)
+            else:
+                os.rename(ruta_actual, ruta_nueva)
             print(f"✅ {nombre_actual} → {nombre_nuevo}")
             exitosos += 1
         except Exception as e:
@@ -64,4 +74,7 @@ for nombre_actual, nombre_nuevo in renombrados.items():
     else:
         print(f"⚠️  No encontrado: {nombre_actual}")
 
+if catalogo:
+    catalogo.cerrar()
+
 print(f"\n📊 Resumen: {exitosos} archivos renombrados, {errores} errores")
\ No newline at end of file
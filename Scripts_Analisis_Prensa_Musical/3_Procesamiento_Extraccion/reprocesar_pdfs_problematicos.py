@@ -7,6 +7,11 @@ from pdfminer.converter import TextConverter
 from pdfminer.layout import LAParams
 from io import StringIO
 
+try:
+    from clasificar_paginas import clasificar_pdf, paginas_para_ocr, resumen
+except ImportError:  # Sin PyMuPDF se prueban directamente los métodos de pdfminer
+    clasificar_pdf = None
+
 def extraer_con_metodo_alternativo(ruta_pdf):
     """Método alternativo para PDFs problemáticos"""
     try:
@@ -32,6 +37,19 @@ def extraer_texto_robusto(ruta_pdf):
     """Extracción robusta con múltiples métodos"""
     print(f"Intentando extraer: {os.path.basename(ruta_pdf)}")
 
+    # Clasificación previa: si ninguna página tiene capa de texto no vale la pena
+    # pasar pdfminer tres veces; el PDF va directamente a OCR
+    if clasificar_pdf:
+        try:
+            clasificacion = clasificar_pdf(ruta_pdf)
+            ocr = paginas_para_ocr(clasificacion)
+            print(f"  Páginas: {resumen(clasificacion)}")
+            if not any(pagina['tipo'] == 'texto' for pagina in clasificacion):
+                print(f"  ⚠ Sin capa de texto: {len(ocr)} páginas para OCR")
+                return None
+        except Exception as e:
+            print(f"  ⚠ No se pudo clasificar: {e}")
+
     # Método 1: extract_text básico
     try:
         texto = extract_text(ruta_pdf, check_extractable=False)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Construcción incremental para los generadores web
+Plantillas precompiladas y caché de secciones por huella de contenido:
+solo se regeneran las páginas o secciones cuyos datos o plantilla cambiaron
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import json
+import os
+import hashlib
+from string import Formatter
+
+ARCHIVO_ESTADO = '.estado_construccion.json'
+
+
+def huella(datos):
+    """Huella estable de cualquier dato serializable en JSON (o bytes)"""
+    if not isinstance(datos, bytes):
+        datos = json.dumps(datos, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha1(datos).hexdigest()
+
+
+def huella_archivo(ruta, tam_bloque=1 << 20):
+    """Huella del contenido de un archivo leído por bloques (sin parsearlo)"""
+    sha = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+class Fragmento:
+    """Plantilla con la sintaxis de str.format analizada una sola vez
+
+    Las llaves literales se escriben dobles ({{ }}), como en los f-strings
+    que ya usaban los generadores.
+    """
+
+    def __init__(self, texto):
+        self.texto = texto
+        self.huella = huella(texto.encode('utf-8'))
+        self.partes = []
+        self.campos = set()
+        for literal, campo, formato, conversion in Formatter().parse(texto):
+            if conversion:
+                raise ValueError(f"Conversión !{conversion} no soportada en el campo {campo}")
+            self.partes.append((literal, campo, formato or ''))
+            if campo is not None:
+                self.campos.add(campo)
+
+    def render(self, **valores):
+        """Rellena la plantilla con los valores dados"""
+        salida = []
+        for literal, campo, formato in self.partes:
+            salida.append(literal)
+            if campo is not None:
+                salida.append(format(valores[campo], formato))
+        return ''.join(salida)
+
+
+class ConstructorIncremental:
+    """Registra huellas de entradas y secciones entre ejecuciones"""
+
+    def __init__(self, directorio, archivo_estado=ARCHIVO_ESTADO):
+        self.ruta_estado = os.path.join(directorio, archivo_estado)
+        self.estado = {'paginas': {}}
+        if os.path.exists(self.ruta_estado):
+            try:
+                with open(self.ruta_estado, 'r', encoding='utf-8') as f:
+                    self.estado = json.load(f)
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"⚠️  Estado de construcción ilegible, se reconstruye todo: {e}")
+        self.regeneradas = []
+        self.reutilizadas = []
+
+    def _pagina(self, salida):
+        return self.estado['paginas'].setdefault(os.path.abspath(salida), {'entradas': {}, 'secciones': {}})
+
+    def pagina_vigente(self, salida, entradas):
+        """True si la página existe y ninguna entrada ({nombre: huella}) cambió"""
+        pagina = self._pagina(salida)
+        return os.path.exists(salida) and pagina['entradas'] == entradas
+
+    def registrar_entradas(self, salida, entradas):
+        """Guarda las huellas de entrada con las que se generó la página"""
+        self._pagina(salida)['entradas'] = entradas
+
+    def seccion(self, salida, nombre, fragmento, datos, render=None):
+        """HTML de una sección: reutiliza el guardado si datos y plantilla no cambiaron
+
+        render(fragmento, datos) genera el HTML; por defecto fragmento.render(**datos).
+        """
+        secciones = self._pagina(salida)['secciones']
+        clave = huella([fragmento.huella, datos])
+        guardada = secciones.get(nombre)
+        if guardada and guardada['huella'] == clave:
+            self.reutilizadas.append(nombre)
+            return guardada['html']
+
+        html = render(fragmento, datos) if render else fragmento.render(**datos)
+        secciones[nombre] = {'huella': clave, 'html': html}
+        self.regeneradas.append(nombre)
+        return html
+
+    def escribir_si_cambia(self, ruta, contenido):
+        """Escribe solo si el contenido difiere del archivo actual; devuelve si escribió"""
+        if isinstance(contenido, str):
+            contenido = contenido.encode('utf-8')
+        if os.path.exists(ruta) and os.path.getsize(ruta) == len(contenido):
+            with open(ruta, 'rb') as f:
+                if f.read() == contenido:
+                    return False
+        with open(ruta, 'wb') as f:
+            f.write(contenido)
+        return True
+
+    def guardar(self):
+        """Persiste el estado para la próxima ejecución"""
+        with open(self.ruta_estado, 'w', encoding='utf-8') as f:
+            json.dump(self.estado, f, ensure_ascii=False)
+
+    def resumen(self):
+        return f"{len(self.regeneradas)} secciones regeneradas, {len(self.reutilizadas)} reutilizadas"
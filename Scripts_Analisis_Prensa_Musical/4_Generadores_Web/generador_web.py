@@ -7,10 +7,15 @@ import json
 import os
 from pathlib import Path
 
+from construccion_incremental import ConstructorIncremental, Fragmento, huella, huella_archivo
+
+ARCHIVO_DATOS = 'resultados_el_sol.json'
+ARCHIVO_HTML = 'analisis_musical_el_sol.html'
+
 def cargar_datos():
     """Carga los datos del análisis"""
     try:
-        with open('resultados_el_sol.json', 'r', encoding='utf-8') as f:
+        with open(ARCHIVO_DATOS, 'r', encoding='utf-8') as f:
             return json.load(f)
     except FileNotFoundError:
         print("Error: No se encontró el archivo resultados_el_sol.json")
@@ -68,28 +73,8 @@ def generar_insights_avanzados(datos):
     
     return insights
 
-def generar_html_avanzado(datos):
-    """Genera el HTML con los datos reales"""
-    
-    stats = datos.get('estadisticas', {})
-    insights = generar_insights_avanzados(datos)
-    
-    # Preparar datos para gráficos
-    compositores = datos.get('compositores', {})
-    compositores_top = sorted(compositores.items(), key=lambda x: len(x[1]), reverse=True)[:10]
-    
-    generos = datos.get('generos_musicales', {})
-    generos_top = sorted(generos.items(), key=lambda x: x[1], reverse=True)[:10]
-    
-    diversidad = datos.get('diversidad_racial', {})
-    diversidad_sorted = sorted(diversidad.items(), key=lambda x: len(x[1]), reverse=True)
-    
-    # Datos de género
-    ratio_genero = stats.get('ratio_genero', {})
-    hombres = ratio_genero.get('hombres', 0)
-    mujeres = ratio_genero.get('mujeres', 0)
-    
-    html = f'''<!DOCTYPE html>
+# Plantillas precompiladas una sola vez al importar el módulo
+PLANTILLA_CABECERA = Fragmento('''<!DOCTYPE html>
 <html lang="es">
 <head>
     <meta charset="UTF-8">
@@ -322,17 +307,19 @@ def generar_html_avanzado(datos):
             <p class="subtitle">Panorama de la vida musical española (1918-1935)</p>
         </header>
 
-        <div class="stats-grid">
+''')
+
+PLANTILLA_RESUMEN = Fragmento('''        <div class="stats-grid">
             <div class="stat-card">
                 <span class="stat-number">1,427</span>
                 <span class="stat-label">Artículos Analizados</span>
             </div>
             <div class="stat-card">
-                <span class="stat-number">{stats.get('total_compositores', 0)}</span>
+                <span class="stat-number">{total_compositores}</span>
                 <span class="stat-label">Compositores Identificados</span>
             </div>
             <div class="stat-card">
-                <span class="stat-number">{stats.get('total_interpretes', 0)}</span>
+                <span class="stat-number">{total_interpretes}</span>
                 <span class="stat-label">Intérpretes Mencionados</span>
             </div>
             <div class="stat-card">
@@ -346,7 +333,7 @@ def generar_html_avanzado(datos):
                 <h3>👨‍🎼 Representación Masculina</h3>
                 <div class="stat-number" style="color: #3498db;">{hombres:,}</div>
                 <p>Hombres identificados en las crónicas musicales</p>
-                <p><strong>Ratio:</strong> {(hombres/mujeres if mujeres > 0 else 0):.1f}:1 respecto a mujeres</p>
+                <p><strong>Ratio:</strong> {ratio:.1f}:1 respecto a mujeres</p>
             </div>
             <div class="gender-card female">
                 <h3>👩‍🎼 Representación Femenina</h3>
@@ -361,22 +348,11 @@ def generar_html_avanzado(datos):
             <canvas id="genderChart" width="400" height="200"></canvas>
         </div>
 
-        <div class="composers-section">
+''')
+
+PLANTILLA_COMPOSITORES = Fragmento('''        <div class="composers-section">
             <h3 class="chart-title">🎵 Top 10 Compositores Más Mencionados</h3>
-            <div class="composer-list">'''
-    
-    # Agregar compositores top
-    for i, (compositor, menciones) in enumerate(compositores_top):
-        html += f'''
-                <div class="composer-item">
-                    <div>
-                        <strong>{compositor}</strong>
-                        <div style="font-size: 0.9em; color: #7f8c8d;">{len(menciones)} menciones</div>
-                    </div>
-                    <div class="composer-rank">{i+1}</div>
-                </div>'''
-    
-    html += '''
+            <div class="composer-list">{elementos}
             </div>
         </div>
 
@@ -385,47 +361,56 @@ def generar_html_avanzado(datos):
             <canvas id="genresChart" width="400" height="200"></canvas>
         </div>
 
-        <div class="diversity-section">
+''')
+
+ELEMENTO_COMPOSITOR = Fragmento('''
+                <div class="composer-item">
+                    <div>
+                        <strong>{compositor}</strong>
+                        <div style="font-size: 0.9em; color: #7f8c8d;">{menciones} menciones</div>
+                    </div>
+                    <div class="composer-rank">{posicion}</div>
+                </div>''')
+
+PLANTILLA_DIVERSIDAD = Fragmento('''        <div class="diversity-section">
             <h3 class="chart-title">🌍 Diversidad Cultural y Racial en la Música</h3>
             <p>El análisis revela menciones significativas de diversidad cultural:</p>
-            <div class="diversity-grid">'''
-    
-    # Agregar elementos de diversidad
-    for termino, menciones in diversidad_sorted[:12]:  # Top 12
-        html += f'''
-                <div class="diversity-item">
-                    <strong>{termino.title()}</strong>
-                    <div>{len(menciones)} menciones</div>
-                </div>'''
-    
-    html += '''
+            <div class="diversity-grid">{elementos}
             </div>
         </div>
 
-        <div class="insights">
-            <h3 class="chart-title">💡 Hallazgos Significativos</h3>'''
-    
-    # Agregar insights
-    for insight in insights:
-        html += f'''
-            <div class="insight">
-                <h4>{insight['titulo']}</h4>
-                <p>{insight['texto']}</p>
-            </div>'''
-    
-    html += f'''
+''')
+
+ELEMENTO_DIVERSIDAD = Fragmento('''
+                <div class="diversity-item">
+                    <strong>{termino}</strong>
+                    <div>{menciones} menciones</div>
+                </div>''')
+
+PLANTILLA_HALLAZGOS = Fragmento('''        <div class="insights">
+            <h3 class="chart-title">💡 Hallazgos Significativos</h3>{elementos}
         </div>
 
-        <footer>
+''')
+
+ELEMENTO_HALLAZGO = Fragmento('''
+            <div class="insight">
+                <h4>{titulo}</h4>
+                <p>{texto}</p>
+            </div>''')
+
+PLANTILLA_PIE = Fragmento('''        <footer>
             <p>📊 Análisis realizado sobre 1,427 artículos del periódico "El Sol" (1918-1935)</p>
             <p>🔍 Metodología: Procesamiento de lenguaje natural y análisis de patrones textuales</p>
             <p>📅 Período analizado: 17 años de crónicas musicales españolas</p>
-            <p>🎯 Compositor más mencionado: {stats.get('compositor_mas_mencionado', 'N/A')}</p>
-            <p>🎼 Género más popular: {stats.get('genero_mas_mencionado', 'N/A')}</p>
+            <p>🎯 Compositor más mencionado: {compositor_mas_mencionado}</p>
+            <p>🎼 Género más popular: {genero_mas_mencionado}</p>
         </footer>
     </div>
 
-    <script>
+''')
+
+PLANTILLA_GRAFICOS = Fragmento('''    <script>
         // Gráfico de representación de género
         const ctx1 = document.getElementById('genderChart').getContext('2d');
         new Chart(ctx1, {{
@@ -468,10 +453,10 @@ def generar_html_avanzado(datos):
         new Chart(ctx2, {{
             type: 'bar',
             data: {{
-                labels: {[g[0].title() for g in generos_top]},
+                labels: {etiquetas_generos},
                 datasets: [{{
                     label: 'Menciones',
-                    data: {[g[1] for g in generos_top]},
+                    data: {valores_generos},
                     backgroundColor: [
                         '#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6',
                         '#1abc9c', '#e67e22', '#34495e', '#f1c40f', '#e84393'
@@ -511,29 +496,108 @@ def generar_html_avanzado(datos):
         }});
     </script>
 </body>
-</html>'''
+</html>''')
+
+HUELLA_PLANTILLAS = huella([f.huella for f in (
+    PLANTILLA_CABECERA, PLANTILLA_RESUMEN, PLANTILLA_COMPOSITORES, ELEMENTO_COMPOSITOR,
+    PLANTILLA_DIVERSIDAD, ELEMENTO_DIVERSIDAD, PLANTILLA_HALLAZGOS, ELEMENTO_HALLAZGO,
+    PLANTILLA_PIE, PLANTILLA_GRAFICOS)])
+
+def renderizar_lista(elemento):
+    """Render de una sección que repite un fragmento por cada elemento de la lista"""
+    def render(fragmento, datos):
+        return fragmento.render(elementos=''.join(elemento.render(**e) for e in datos['elementos']))
+    return render
 
-    return html
+def generar_html_avanzado(datos, constructor=None, salida=ARCHIVO_HTML):
+    """Genera el HTML con los datos reales (reutilizando secciones sin cambios si hay constructor)"""
+    
+    stats = datos.get('estadisticas', {})
+    insights = generar_insights_avanzados(datos)
+    
+    # Preparar datos para gráficos
+    compositores = datos.get('compositores', {})
+    compositores_top = sorted(compositores.items(), key=lambda x: len(x[1]), reverse=True)[:10]
+    
+    generos = datos.get('generos_musicales', {})
+    generos_top = sorted(generos.items(), key=lambda x: x[1], reverse=True)[:10]
+    
+    diversidad = datos.get('diversidad_racial', {})
+    diversidad_sorted = sorted(diversidad.items(), key=lambda x: len(x[1]), reverse=True)
+    
+    # Datos de género
+    ratio_genero = stats.get('ratio_genero', {})
+    hombres = ratio_genero.get('hombres', 0)
+    mujeres = ratio_genero.get('mujeres', 0)
+    
+    # Cada sección declara solo los datos de los que depende
+    secciones = [
+        ('cabecera', PLANTILLA_CABECERA, {}, None),
+        ('resumen', PLANTILLA_RESUMEN, {
+            'total_compositores': stats.get('total_compositores', 0),
+            'total_interpretes': stats.get('total_interpretes', 0),
+            'hombres': hombres,
+            'mujeres': mujeres,
+            'ratio': hombres/mujeres if mujeres > 0 else 0
+        }, None),
+        ('compositores', PLANTILLA_COMPOSITORES, {'elementos': [
+            {'compositor': compositor, 'menciones': len(menciones), 'posicion': i+1}
+            for i, (compositor, menciones) in enumerate(compositores_top)
+        ]}, renderizar_lista(ELEMENTO_COMPOSITOR)),
+        ('diversidad', PLANTILLA_DIVERSIDAD, {'elementos': [
+            {'termino': termino.title(), 'menciones': len(menciones)}
+            for termino, menciones in diversidad_sorted[:12]  # Top 12
+        ]}, renderizar_lista(ELEMENTO_DIVERSIDAD)),
+        ('hallazgos', PLANTILLA_HALLAZGOS, {'elementos': insights}, renderizar_lista(ELEMENTO_HALLAZGO)),
+        ('pie', PLANTILLA_PIE, {
+            'compositor_mas_mencionado': stats.get('compositor_mas_mencionado', 'N/A'),
+            'genero_mas_mencionado': stats.get('genero_mas_mencionado', 'N/A')
+        }, None),
+        ('graficos', PLANTILLA_GRAFICOS, {
+            'hombres': hombres,
+            'mujeres': mujeres,
+            'etiquetas_generos': [g[0].title() for g in generos_top],
+            'valores_generos': [g[1] for g in generos_top]
+        }, None)
+    ]
+    
+    partes = []
+    for nombre, fragmento, datos_seccion, render in secciones:
+        if constructor:
+            partes.append(constructor.seccion(salida, nombre, fragmento, datos_seccion, render))
+        else:
+            partes.append(render(fragmento, datos_seccion) if render else fragmento.render(**datos_seccion))
+    
+    return ''.join(partes)
 
 def main():
     """Función principal"""
     print("Generando página web interactiva...")
     
+    # Si ni los datos ni las plantillas cambiaron no hace falta ni leer el JSON
+    constructor = ConstructorIncremental(os.path.dirname(os.path.abspath(ARCHIVO_HTML)))
+    if os.path.exists(ARCHIVO_DATOS):
+        entradas = {'datos': huella_archivo(ARCHIVO_DATOS), 'plantillas': HUELLA_PLANTILLAS}
+        if constructor.pagina_vigente(ARCHIVO_HTML, entradas):
+            print(f"✅ {ARCHIVO_HTML} ya está al día (sin cambios en datos ni plantillas)")
+            return
+    
     datos = cargar_datos()
     if not datos:
         return
     
-    html = generar_html_avanzado(datos)
+    html = generar_html_avanzado(datos, constructor, ARCHIVO_HTML)
     
-    # Guardar la página web
-    with open('analisis_musical_el_sol.html', 'w', encoding='utf-8') as f:
-        f.write(html)
+    # Guardar la página web (solo si cambió, para no generar diffs vacíos)
+    escrito = constructor.escribir_si_cambia(ARCHIVO_HTML, html)
+    constructor.registrar_entradas(ARCHIVO_HTML, entradas)
+    constructor.guardar()
     
     # Obtener ruta absoluta
-    ruta_completa = os.path.abspath('analisis_musical_el_sol.html')
+    ruta_completa = os.path.abspath(ARCHIVO_HTML)
     
-    print(f"✅ Página web generada exitosamente!")
-    print(f"📁 Archivo: analisis_musical_el_sol.html")
+    print(f"✅ Página web {'generada' if escrito else 'sin cambios'} ({constructor.resumen()})")
+    print(f"📁 Archivo: {ARCHIVO_HTML}")
     print(f"🌐 Ruta completa: {ruta_completa}")
     print(f"🔗 Para abrir: file://{ruta_completa}")
     print()
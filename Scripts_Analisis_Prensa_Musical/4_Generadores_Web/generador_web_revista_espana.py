@@ -11,33 +11,105 @@ Universidad de Salamanca
 
 import json
 import os
+import re
+import sys
+import hashlib
 from datetime import datetime
 
-def generar_web_revista_espana():
-    # Cargar datos del análisis
-    with open('/Users/maria/datos_revista_espana_musical.json', 'r', encoding='utf-8') as f:
-        datos = json.load(f)
+from construccion_incremental import ConstructorIncremental, Fragmento, huella_archivo
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '0_Utilidades_Comunes'))
+from almacen_corpus import AlmacenContenidos
+
+RUTA_DATOS = '/Users/maria/datos_revista_espana_musical.json'
+RUTA_HTML = '/Users/maria/revista_espana_musical.html'
+# Recursos cacheables (índice de búsqueda y bloques de contenido) junto al HTML
+DIR_RECURSOS = 'revista_espana_datos'
+
+ARTICULOS_POR_BLOQUE = 50
+LONGITUD_PREFIJO = 2
+PATRON_TERMINO = re.compile(r'[^\W_]+')
+PATRON_NUMERO_LINEA = re.compile(r'^\s*\d+→', re.MULTILINE)
+
+
+def terminos_texto(texto):
+    """Términos indexables de un texto (minúsculas, sin números de línea)"""
+    return PATRON_TERMINO.findall(PATRON_NUMERO_LINEA.sub('', texto).lower())
+
+
+def construir_indice_busqueda(articulos):
+    """Índice invertido compacto: términos ordenados, listas de posiciones
+    codificadas por diferencias y cubos de prefijo como rangos [inicio, fin)"""
+    postings = {}
+    for posicion, articulo in enumerate(articulos):
+        texto = ' '.join((articulo['titulo'], articulo['autores'], articulo['contenido']))
+        for termino in set(terminos_texto(texto)):
+            postings.setdefault(termino, []).append(posicion)
     
-    # Preparar datos para JavaScript embebido
-    articulos_js = []
-    for articulo in datos['articulos']:
-        articulo_web = {
-            'id': articulo['numero'],
-            'numero': articulo['numero'],
-            'titulo': articulo['titulo'][:100] + '...' if len(articulo['titulo']) > 100 else articulo['titulo'],
-            'fecha': articulo['fecha'],
-            'autores': ', '.join(articulo['autores']) if articulo['autores'] else 'Autor no identificado',
-            'periodo': articulo['periodo'],
-            'num_palabras': articulo['num_palabras'],
-            'total_menciones_musicales': articulo['total_menciones_musicales'],
-            'contenido': articulo['contenido']
-        }
-        articulos_js.append(articulo_web)
+    terminos = sorted(postings)
+    listas = []
+    for termino in terminos:
+        anterior = 0
+        deltas = []
+        for posicion in postings[termino]:
+            deltas.append(posicion - anterior)
+            anterior = posicion
+        listas.append(deltas)
     
-    # Estadísticas para la página
-    estadisticas = datos['estadisticas']['resumen_general']
+    # Al estar ordenados, los términos con un mismo prefijo son contiguos
+    prefijos = {}
+    for i, termino in enumerate(terminos):
+        prefijo = termino[:LONGITUD_PREFIJO]
+        if prefijo in prefijos:
+            prefijos[prefijo][1] = i + 1
+        else:
+            prefijos[prefijo] = [i, i + 1]
     
-    html_content = f'''<!DOCTYPE html>
+    return {
+        'longitud_prefijo': LONGITUD_PREFIJO,
+        'terminos': terminos,
+        'postings': listas,
+        'prefijos': prefijos
+    }
+
+
+def lector_contenidos(datos, ruta_datos):
+    """Función que devuelve el texto completo de un artículo
+
+    Los datos nuevos solo traen la huella y el texto está en el almacén de
+    contenidos junto al JSON; los antiguos aún lo llevan embebido.
+    """
+    nombre_almacen = datos['metadatos'].get('almacen_contenidos')
+    if not nombre_almacen:
+        return lambda articulo: articulo['contenido']
+    almacen = AlmacenContenidos(os.path.join(os.path.dirname(ruta_datos), nombre_almacen))
+    return lambda articulo: almacen.leer(articulo['huella_contenido'])
+
+
+def escribir_recurso(directorio, nombre, datos):
+    """Guarda un JSON compacto con el hash del contenido en el nombre (caché indefinida)
+
+    Si ya existe un archivo con ese nombre su contenido es idéntico y no se reescribe.
+    """
+    contenido = json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    huella = hashlib.sha1(contenido).hexdigest()[:10]
+    nombre_archivo = f"{nombre}.{huella}.json"
+    ruta = os.path.join(directorio, nombre_archivo)
+    if not os.path.exists(ruta):
+        with open(ruta, 'wb') as f:
+            f.write(contenido)
+    return nombre_archivo
+
+
+def eliminar_recursos_obsoletos(directorio, vigentes):
+    """Borra los recursos de construcciones anteriores que ya no se referencian"""
+    for nombre in os.listdir(directorio):
+        if nombre.endswith('.json') and nombre not in vigentes:
+            os.remove(os.path.join(directorio, nombre))
+
+
+# Plantilla de la página, precompilada una sola vez al importar el módulo
+PLANTILLA_PAGINA = Fragmento('''<!DOCTYPE html>
 <html lang="es">
 <head>
     <meta charset="UTF-8">
@@ -449,15 +521,15 @@ def generar_web_revista_espana():
             
             <div class="stats-grid">
                 <div class="stat-card">
-                    <span class="stat-number">{estadisticas['total_numeros']}</span>
+                    <span class="stat-number">{total_numeros}</span>
                     <span class="stat-label">Números de revista con referencias musicales</span>
                 </div>
                 <div class="stat-card">
-                    <span class="stat-number">{estadisticas['total_palabras']:,}</span>
+                    <span class="stat-number">{total_palabras:,}</span>
                     <span class="stat-label">Total de palabras</span>
                 </div>
                 <div class="stat-card">
-                    <span class="stat-number">{estadisticas['palabras_unicas']:,}</span>
+                    <span class="stat-number">{palabras_unicas:,}</span>
                     <span class="stat-label">Palabras únicas</span>
                 </div>
             </div>
@@ -498,7 +570,7 @@ def generar_web_revista_espana():
             <div class="results-section">
                 <div class="results-header">
                     <div class="results-count" id="resultsCount">
-                        Mostrando {len(articulos_js)} artículos
+                        Mostrando {num_articulos} artículos
                     </div>
                     <select id="sortSelect" class="sort-select">
                         <option value="numero">Ordenar por número</option>
@@ -532,8 +604,12 @@ def generar_web_revista_espana():
     </div>
 
     <script>
-        // Datos embebidos
-        const articulos = {json.dumps(articulos_js, ensure_ascii=False, indent=2)};
+        // Metadatos embebidos; índice de búsqueda y contenido se cargan bajo demanda
+        const articulos = {articulos_json};
+        const recursos = {recursos_json};
+        const bloquesCargados = {{}};
+        let indiceBusqueda = null;
+        let promesaIndice = null;
         
         let filteredArticles = [...articulos];
         let currentPage = 1;
@@ -561,46 +637,91 @@ def generar_web_revista_espana():
             if (e.target === modal) closeModal();
         }});
         
-        // Funciones de filtrado y búsqueda
-        function handleSearch() {{
-            const searchTerm = searchInput.value.toLowerCase();
-            filteredArticles = articulos.filter(article =>
-                article.titulo.toLowerCase().includes(searchTerm) ||
-                article.contenido.toLowerCase().includes(searchTerm) ||
-                article.autores.toLowerCase().includes(searchTerm)
-            );
-            currentPage = 1;
-            updateDisplay();
+        // Índice de búsqueda: se descarga una vez y se decodifica en memoria
+        function cargarIndice() {{
+            if (!promesaIndice) {{
+                promesaIndice = fetch(recursos.indice)
+                    .then(response => response.json())
+                    .then(datos => {{
+                        // Decodificar las listas de posiciones (diferencias -> posiciones)
+                        datos.postings = datos.postings.map(deltas => {{
+                            let posicion = 0;
+                            return deltas.map(delta => (posicion += delta));
+                        }});
+                        indiceBusqueda = datos;
+                        return datos;
+                    }});
+            }}
+            return promesaIndice;
         }}
         
-        function handleYearFilter(e) {{
-            periodBtns.forEach(btn => btn.classList.remove('active'));
-            e.target.classList.add('active');
+        function terminosConsulta(texto) {{
+            return texto.toLowerCase().match(/[\\p{{L}}\\p{{N}}]+/gu) || [];
+        }}
+        
+        // Artículos cuyos términos empiezan por cada palabra de la consulta (intersección)
+        function buscarEnIndice(consulta) {{
+            const palabras = terminosConsulta(consulta);
+            if (!palabras.length) return null;
             
-            const selectedYear = e.target.dataset.year;
-            if (selectedYear === 'all') {{
-                filteredArticles = [...articulos];
-            }} else {{
-                filteredArticles = articulos.filter(article => {{
-                    const articleYear = article.fecha.match(/\\d{{4}}/)
-                    return articleYear && articleYear[0] === selectedYear;
-                }});
+            let resultado = null;
+            for (const palabra of palabras) {{
+                const coincidentes = new Set();
+                const prefijo = palabra.substring(0, indiceBusqueda.longitud_prefijo);
+                // Palabras más cortas que el prefijo: recorrer los cubos que empiezan por ellas
+                const cubos = palabra.length >= indiceBusqueda.longitud_prefijo ?
+                    [indiceBusqueda.prefijos[prefijo]] :
+                    Object.keys(indiceBusqueda.prefijos)
+                        .filter(p => p.startsWith(palabra))
+                        .map(p => indiceBusqueda.prefijos[p]);
+                for (const cubo of cubos) {{
+                    if (!cubo) continue;
+                    for (let i = cubo[0]; i < cubo[1]; i++) {{
+                        if (indiceBusqueda.terminos[i].startsWith(palabra)) {{
+                            indiceBusqueda.postings[i].forEach(posicion => coincidentes.add(posicion));
+                        }}
+                    }}
+                }}
+                resultado = resultado === null ? coincidentes :
+                    new Set([...resultado].filter(posicion => coincidentes.has(posicion)));
+                if (!resultado.size) break;
             }}
+            return resultado;
+        }}
+        
+        // Funciones de filtrado y búsqueda
+        function applyFilters() {{
+            const activeBtn = document.querySelector('.period-btn.active');
+            const selectedYear = activeBtn ? activeBtn.dataset.year : 'all';
+            const searchTerm = searchInput.value;
+            const coincidencias = searchTerm.trim() && indiceBusqueda ? buscarEnIndice(searchTerm) : null;
             
-            // Aplicar búsqueda actual si existe
-            const searchTerm = searchInput.value.toLowerCase();
-            if (searchTerm) {{
-                filteredArticles = filteredArticles.filter(article =>
-                    article.titulo.toLowerCase().includes(searchTerm) ||
-                    article.contenido.toLowerCase().includes(searchTerm) ||
-                    article.autores.toLowerCase().includes(searchTerm)
-                );
-            }}
+            filteredArticles = articulos.filter((article, posicion) => {{
+                if (selectedYear !== 'all') {{
+                    const articleYear = article.fecha.match(/\\d{{4}}/);
+                    if (!articleYear || articleYear[0] !== selectedYear) return false;
+                }}
+                return coincidencias === null || coincidencias.has(posicion);
+            }});
             
             currentPage = 1;
             updateDisplay();
         }}
         
+        function handleSearch() {{
+            if (indiceBusqueda || !searchInput.value.trim()) {{
+                applyFilters();
+            }} else {{
+                cargarIndice().then(applyFilters);
+            }}
+        }}
+        
+        function handleYearFilter(e) {{
+            periodBtns.forEach(btn => btn.classList.remove('active'));
+            e.target.classList.add('active');
+            handleSearch();
+        }}
+        
         function handleSort() {{
             const sortBy = sortSelect.value;
             filteredArticles.sort((a, b) => {{
@@ -631,7 +752,7 @@ def generar_web_revista_espana():
             const pageArticles = filteredArticles.slice(startIndex, endIndex);
             
             articlesList.innerHTML = pageArticles.map(article => {{
-                const preview = article.contenido.substring(0, 200).replace(/\\d+→/g, '') + '...';
+                const preview = article.vista_previa + '...';
                 const searchTerm = searchInput.value.toLowerCase();
                 const highlightedTitle = searchTerm ? 
                     highlightText(article.titulo, searchTerm) : article.titulo;
@@ -709,9 +830,18 @@ def generar_web_revista_espana():
             return text.replace(regex, '<span class="highlight">$1</span>');
         }}
         
+        // Bloques de contenido: se descargan la primera vez que se abre uno de sus artículos
+        function cargarBloque(bloque) {{
+            if (!bloquesCargados[bloque]) {{
+                bloquesCargados[bloque] = fetch(recursos.bloques[bloque]).then(response => response.json());
+            }}
+            return bloquesCargados[bloque];
+        }}
+        
         function openModal(articleId) {{
-            const article = articulos.find(a => a.numero === articleId);
-            if (!article) return;
+            const posicion = articulos.findIndex(a => a.numero === articleId);
+            if (posicion === -1) return;
+            const article = articulos[posicion];
             
             modalTitle.textContent = article.titulo;
             modalMeta.innerHTML = `
@@ -726,16 +856,23 @@ def generar_web_revista_espana():
                 </div>
             `;
             
-            // Formatear contenido eliminando números de línea y mejorando presentación
-            const formattedContent = article.contenido
-                .replace(/^\\s*\\d+→/gm, '')
-                .replace(/\\n\\s*\\n/g, '</p><p>')
-                .replace(/^/, '<p>')
-                .replace(/$/, '</p>');
-            
-            modalBody.innerHTML = formattedContent;
+            modalBody.innerHTML = '<p>Cargando artículo...</p>';
             modal.style.display = 'block';
             document.body.style.overflow = 'hidden';
+            
+            cargarBloque(article.bloque).then(contenidos => {{
+                const contenido = contenidos[posicion % {articulos_por_bloque}];
+                // Formatear contenido eliminando números de línea y mejorando presentación
+                const formattedContent = contenido
+                    .replace(/^\\s*\\d+→/gm, '')
+                    .replace(/\\n\\s*\\n/g, '</p><p>')
+                    .replace(/^/, '<p>')
+                    .replace(/$/, '</p>');
+                
+                modalBody.innerHTML = formattedContent;
+            }}).catch(() => {{
+                modalBody.innerHTML = '<p>No se pudo cargar el contenido del artículo.</p>';
+            }});
         }}
         
         function closeModal() {{
@@ -746,6 +883,8 @@ def generar_web_revista_espana():
         // Inicialización
         document.addEventListener('DOMContentLoaded', function() {{
             updateDisplay();
+            // Precargar el índice de búsqueda en segundo plano tras el primer pintado
+            setTimeout(cargarIndice, 0);
         }});
         
         // Keyboard shortcuts
@@ -756,16 +895,84 @@ def generar_web_revista_espana():
         }});
     </script>
 </body>
-</html>'''
+</html>''')
+
+
+def generar_web_revista_espana():
+    # Si ni los datos ni la plantilla cambiaron no hace falta ni leer el JSON
+    constructor = ConstructorIncremental(os.path.dirname(RUTA_HTML))
+    entradas = {'datos': huella_archivo(RUTA_DATOS), 'plantilla': PLANTILLA_PAGINA.huella}
+    if constructor.pagina_vigente(RUTA_HTML, entradas):
+        print(f"Interfaz web al día, sin cambios: {RUTA_HTML}")
+        return
+    
+    # Cargar datos del análisis
+    with open(RUTA_DATOS, 'r', encoding='utf-8') as f:
+        datos = json.load(f)
+    
+    # Preparar metadatos para JavaScript embebido (el contenido va en bloques aparte)
+    contenido = lector_contenidos(datos, RUTA_DATOS)
+    articulos_js = []
+    for posicion, articulo in enumerate(datos['articulos']):
+        autores = ', '.join(articulo['autores']) if articulo['autores'] else 'Autor no identificado'
+        articulo_web = {
+            'id': articulo['numero'],
+            'numero': articulo['numero'],
+            'titulo': articulo['titulo'][:100] + '...' if len(articulo['titulo']) > 100 else articulo['titulo'],
+            'fecha': articulo['fecha'],
+            'autores': autores,
+            'periodo': articulo['periodo'],
+            'num_palabras': articulo['num_palabras'],
+            'total_menciones_musicales': articulo['total_menciones_musicales'],
+            'vista_previa': None,  # Se completa al leer el bloque de contenido
+            'bloque': posicion // ARTICULOS_POR_BLOQUE
+        }
+        articulos_js.append(articulo_web)
+    
+    # Recursos separados: índice invertido y bloques de contenido. Los textos se
+    # leen bloque a bloque, así nunca está todo el corpus en memoria
+    dir_recursos = os.path.join(os.path.dirname(RUTA_HTML), DIR_RECURSOS)
+    os.makedirs(dir_recursos, exist_ok=True)
+    indice = construir_indice_busqueda(
+        {'titulo': articulo['titulo'], 'autores': a['autores'], 'contenido': contenido(articulo)}
+        for articulo, a in zip(datos['articulos'], articulos_js)
+    )
+    bloques = []
+    for i in range(0, len(articulos_js), ARTICULOS_POR_BLOQUE):
+        contenidos = [contenido(articulo) for articulo in datos['articulos'][i:i + ARTICULOS_POR_BLOQUE]]
+        for articulo_web, texto in zip(articulos_js[i:i + ARTICULOS_POR_BLOQUE], contenidos):
+            articulo_web['vista_previa'] = re.sub(r'\d+→', '', texto[:200])
+        bloques.append(f"{DIR_RECURSOS}/" + escribir_recurso(dir_recursos, f'contenido_{i // ARTICULOS_POR_BLOQUE:03d}',
+                                                             contenidos))
+    recursos = {
+        'indice': f"{DIR_RECURSOS}/" + escribir_recurso(dir_recursos, 'indice_busqueda', indice),
+        'bloques': bloques
+    }
+    eliminar_recursos_obsoletos(dir_recursos, {os.path.basename(r) for r in [recursos['indice']] + recursos['bloques']})
+    
+    # Estadísticas para la página
+    estadisticas = datos['estadisticas']['resumen_general']
+    
+    html_content = PLANTILLA_PAGINA.render(
+        total_numeros=estadisticas['total_numeros'],
+        total_palabras=estadisticas['total_palabras'],
+        palabras_unicas=estadisticas['palabras_unicas'],
+        num_articulos=len(articulos_js),
+        articulos_json=json.dumps(articulos_js, ensure_ascii=False, separators=(',', ':')),
+        recursos_json=json.dumps(recursos, ensure_ascii=False),
+        articulos_por_bloque=ARTICULOS_POR_BLOQUE
+    )
     
     # Guardar el archivo HTML
-    with open('/Users/maria/revista_espana_musical.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    escrito = constructor.escribir_si_cambia(RUTA_HTML, html_content)
+    constructor.registrar_entradas(RUTA_HTML, entradas)
+    constructor.guardar()
     
-    print(f"Interfaz web generada: /Users/maria/revista_espana_musical.html")
+    print(f"Interfaz web {'generada' if escrito else 'sin cambios'}: {RUTA_HTML}")
     print(f"Datos procesados: {len(articulos_js)} artículos")
+    print(f"Recursos: {recursos['indice']} y {len(recursos['bloques'])} bloques de contenido en {dir_recursos}")
     print("La interfaz incluye:")
-    print("- Búsqueda en tiempo real")
+    print("- Búsqueda en tiempo real con índice invertido precalculado")
     print("- Filtros por período histórico")
     print("- Ordenación múltiple")
     print("- Visualización modal de artículos completos")
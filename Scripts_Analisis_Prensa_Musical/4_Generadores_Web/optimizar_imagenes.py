@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Optimización de imágenes para las páginas del proyecto
+Genera variantes WebP/AVIF a varios anchos en paralelo (retratos de
+biografias/ y logos), omite las fuentes sin cambios por su huella y
+reescribe las etiquetas <img> como <picture> con srcset y carga diferida
+
+Proyecto LexiMus: Léxico y ontología de la música en español (PID2022-139589NB-C33)
+Universidad de Salamanca
+"""
+
+import os
+import re
+import json
+import hashlib
+import unicodedata
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+try:
+    import pillow_avif  # noqa: F401  (registra AVIF en versiones de Pillow sin soporte nativo)
+except ImportError:
+    pass
+
+RAIZ_WEB = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+PAGINAS = ['index.html', 'equipo.html', 'intro.html']
+FUENTES = ['biografias', 'Logo USAL.png', 'Logo CIE.png', 'Logo MINISTERIO.png']
+DIR_SALIDA = 'img'
+ARCHIVO_MANIFIESTO = 'manifest.json'
+
+EXTENSIONES = ('.png', '.jpg', '.jpeg')
+ANCHOS = (160, 320, 480, 800, 1200)
+CALIDAD = {'avif': 50, 'webp': 80}
+
+# Tamaño con el que el CSS de las páginas muestra las imágenes, por selector ('.clase'
+# de la imagen o '.clase img' de un contenedor), para el atributo sizes. Solo estas
+# imágenes reciben width/height: su CSS fija las dos medidas o una y 'auto' la otra
+ANCHO_CSS = {'.member-photo': 150}
+ALTO_CSS = {'.footer-logo': 80, '.logo-img': 80, '.logos-section img': 60}
+ETIQUETAS_VACIAS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                    'source', 'track', 'wbr'}
+
+PATRON_IMG = re.compile(r'<picture data-optimizada>.*?(<img\b[^>]*>)\s*</picture>|<img\b[^>]*>', re.DOTALL)
+PATRON_ATRIBUTO = re.compile(r'([\w-]+)="([^"]*)"')
+
+
+def huella_archivo(ruta):
+    """SHA-1 del contenido de la imagen fuente"""
+    sha = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def nombre_seguro(ruta_relativa):
+    """Ruta de salida en ASCII y sin espacios a partir de la ruta de la fuente"""
+    base = os.path.splitext(ruta_relativa)[0]
+    base = unicodedata.normalize('NFKD', base).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^\w/.-]+', '_', base.replace(os.sep, '/')).lower()
+
+
+def formatos_disponibles():
+    """Formatos de salida que admite el Pillow instalado"""
+    formatos = []
+    if features.check('avif') or 'AVIF' in Image.SAVE:
+        formatos.append('avif')
+    if features.check('webp'):
+        formatos.append('webp')
+    return formatos
+
+
+def listar_fuentes(raiz=RAIZ_WEB):
+    """Imágenes raster a optimizar, como rutas relativas a la raíz web"""
+    fuentes = []
+    for entrada in FUENTES:
+        ruta = os.path.join(raiz, entrada)
+        if os.path.isdir(ruta):
+            fuentes.extend(f"{entrada}/{nombre}" for nombre in sorted(os.listdir(ruta))
+                           if nombre.lower().endswith(EXTENSIONES))
+        elif os.path.exists(ruta):
+            fuentes.append(entrada)
+    # macOS devuelve nombres en NFD; el HTML los escribe en NFC
+    return [unicodedata.normalize('NFC', fuente) for fuente in fuentes]
+
+
+def _procesar_imagen(args):
+    """Genera todas las variantes de una imagen (se ejecuta en un proceso aparte)"""
+    raiz, fuente, huella, formatos = args
+    with Image.open(os.path.join(raiz, fuente)) as imagen:
+        imagen = ImageOps.exif_transpose(imagen)
+        if imagen.mode not in ('RGB', 'RGBA'):
+            imagen = imagen.convert('RGBA' if 'transparency' in imagen.info or imagen.mode in ('LA', 'PA') else 'RGB')
+        ancho, alto = imagen.size
+
+        # Nunca se amplía: el ancho original es la variante mayor
+        anchos = sorted({a for a in ANCHOS if a < ancho} | {min(ancho, max(ANCHOS))})
+        base = os.path.join(DIR_SALIDA, nombre_seguro(fuente))
+        os.makedirs(os.path.join(raiz, os.path.dirname(base)), exist_ok=True)
+
+        variantes = {formato: [] for formato in formatos}
+        for a in anchos:
+            copia = imagen if a == ancho else imagen.resize((a, round(alto * a / ancho)), Image.LANCZOS)
+            for formato in formatos:
+                destino = f"{base}-{a}.{formato}"
+                copia.save(os.path.join(raiz, destino), formato.upper(), quality=CALIDAD[formato])
+                variantes[formato].append([a, destino.replace(os.sep, '/')])
+
+    return fuente, {'huella': huella, 'ancho': ancho, 'alto': alto, 'variantes': variantes}
+
+
+def cargar_manifiesto(raiz=RAIZ_WEB):
+    ruta = os.path.join(raiz, DIR_SALIDA, ARCHIVO_MANIFIESTO)
+    if os.path.exists(ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def variantes_completas(raiz, entrada):
+    """True si todas las variantes registradas siguen en disco"""
+    return all(os.path.exists(os.path.join(raiz, ruta))
+               for lista in entrada['variantes'].values() for _, ruta in lista)
+
+
+def generar_variantes(raiz=RAIZ_WEB, procesos=None):
+    """Genera las variantes que falten o estén desfasadas y devuelve el manifiesto"""
+    if Image is None:
+        raise RuntimeError("Se necesita Pillow para generar las variantes: pip install Pillow")
+    formatos = formatos_disponibles()
+    if not formatos:
+        raise RuntimeError("El Pillow instalado no admite WebP ni AVIF")
+
+    os.makedirs(os.path.join(raiz, DIR_SALIDA), exist_ok=True)
+    manifiesto = cargar_manifiesto(raiz)
+    fuentes = listar_fuentes(raiz)
+    pendientes = []
+    for fuente in fuentes:
+        huella = huella_archivo(os.path.join(raiz, fuente))
+        entrada = manifiesto.get(fuente)
+        if (entrada and entrada['huella'] == huella and sorted(entrada['variantes']) == sorted(formatos)
+                and variantes_completas(raiz, entrada)):
+            continue
+        pendientes.append((raiz, fuente, huella, formatos))
+
+    print(f"🖼️  {len(fuentes)} imágenes, {len(pendientes)} con cambios ({', '.join(formatos)})")
+    if pendientes:
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            for fuente, entrada in ejecutor.map(_procesar_imagen, pendientes):
+                manifiesto[fuente] = entrada
+                print(f"  ✅ {fuente}: {sum(len(v) for v in entrada['variantes'].values())} variantes")
+
+    # Las fuentes eliminadas salen del manifiesto
+    manifiesto = {fuente: manifiesto[fuente] for fuente in fuentes if fuente in manifiesto}
+    with open(os.path.join(raiz, DIR_SALIDA, ARCHIVO_MANIFIESTO), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+    return manifiesto
+
+
+class _ClasesContenedoras(HTMLParser):
+    """Clases de los elementos que contienen cada <img>, por su posición en el HTML"""
+
+    def __init__(self, html):
+        super().__init__(convert_charrefs=True)
+        self.inicios_linea = [0] + [m.end() for m in re.finditer('\n', html)]
+        self.pila = []
+        self.por_posicion = {}
+        self.feed(html)
+        self.close()
+
+    def handle_starttag(self, etiqueta, atributos):
+        if etiqueta == 'img':
+            linea, columna = self.getpos()
+            self.por_posicion[self.inicios_linea[linea - 1] + columna] = [
+                clase for _, clases in self.pila for clase in clases]
+        elif etiqueta not in ETIQUETAS_VACIAS:
+            self.pila.append((etiqueta, (dict(atributos).get('class') or '').split()))
+
+    def handle_endtag(self, etiqueta):
+        for i in range(len(self.pila) - 1, -1, -1):
+            if self.pila[i][0] == etiqueta:
+                del self.pila[i:]
+                break
+
+
+def atributo_sizes(clases, entrada, contenedores=()):
+    """Ancho de presentación según el CSS de la imagen o de su contenedor más cercano
+
+    None si ningún selector conocido la dimensiona (queda el ancho de pantalla).
+    """
+    selectores = [f".{clase}" for clase in clases] + [f".{clase} img" for clase in reversed(contenedores)]
+    for selector in selectores:
+        if selector in ANCHO_CSS:
+            return f"{ANCHO_CSS[selector]}px"
+        if selector in ALTO_CSS:
+            return f"{round(ALTO_CSS[selector] * entrada['ancho'] / entrada['alto'])}px"
+    return None
+
+
+def etiqueta_picture(img, manifiesto, contenedores=()):
+    """<picture> con fuentes AVIF/WebP para una etiqueta <img>, o None si no hay variantes"""
+    atributos = dict(PATRON_ATRIBUTO.findall(img))
+    entrada = manifiesto.get(unicodedata.normalize('NFC', atributos.get('src', '')))
+    if not entrada:
+        return None
+
+    ancho_css = atributo_sizes(atributos.get('class', '').split(), entrada, contenedores)
+    sizes = ancho_css or '100vw'
+    fuentes = ''.join(
+        f'<source type="image/{formato}" srcset="{", ".join(f"{ruta} {a}w" for a, ruta in lista)}" sizes="{sizes}">'
+        for formato, lista in sorted(entrada['variantes'].items())  # avif antes que webp
+    )
+
+    # La <img> original queda como reserva; se completan solo los atributos ausentes
+    extra = {'loading': 'lazy', 'decoding': 'async'}
+    if ancho_css:
+        extra.update(width=str(entrada['ancho']), height=str(entrada['alto']))
+    faltan = ''.join(f' {k}="{v}"' for k, v in extra.items() if k not in atributos)
+    img = re.sub(r'\s*/?>$', faltan + '>', img)
+    return f'<picture data-optimizada>{fuentes}{img}</picture>'
+
+
+def reescribir_html(html, manifiesto):
+    """Sustituye las <img> con variantes por <picture>; es idempotente"""
+    contenedores = _ClasesContenedoras(html).por_posicion
+
+    def reemplazar(coincidencia):
+        grupo = 1 if coincidencia.group(1) else 0
+        img = coincidencia.group(grupo)
+        return (etiqueta_picture(img, manifiesto, contenedores.get(coincidencia.start(grupo), ()))
+                or coincidencia.group(0))
+    return PATRON_IMG.sub(reemplazar, html)
+
+
+def reescribir_paginas(manifiesto, raiz=RAIZ_WEB, paginas=PAGINAS):
+    """Aplica la reescritura a las páginas y guarda solo las que cambian"""
+    for pagina in paginas:
+        ruta = os.path.join(raiz, pagina)
+        with open(ruta, 'r', encoding='utf-8') as f:
+            html = f.read()
+        nuevo = reescribir_html(html, manifiesto)
+        if nuevo != html:
+            with open(ruta, 'w', encoding='utf-8') as f:
+                f.write(nuevo)
+            print(f"  📝 {pagina} actualizada")
+
+
+def main():
+    print("Optimizando imágenes de la web...")
+    manifiesto = generar_variantes()
+    reescribir_paginas(manifiesto)
+    print(f"Variantes en {os.path.join(RAIZ_WEB, DIR_SALIDA)}")
+
+
+if __name__ == "__main__":
+    main()